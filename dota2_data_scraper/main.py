@@ -3,13 +3,18 @@
 """
 
 import argparse
+import os
 import sys
 import logging
+from contextlib import nullcontext
 from typing import Optional
 
-from modules.scrapers.hero_scraper import HeroScraper
-from modules.core.data_manager import DataManager
-from modules.core.config_processor import ConfigProcessor
+# Тяжелые модули (selenium, webdriver_manager, bs4, pandas) импортируются
+# внутри функций режимов, чтобы каждый режим загружал только то, что использует
+from modules.utils.tracing import reset_tracer, span
+
+# Режимы, которым нужен браузер
+SCRAPING_MODES = {"scrape", "scrape_no_facets", "scrape_all", "all", "daemon", "matrix"}
 
 
 def setup_logging(quiet_mode: bool = False, debug_mode: bool = False):
@@ -118,10 +123,16 @@ def run_full_scraping() -> tuple[bool, bool]:
         tuple: (успех_с_фасетами, успех_без_фасетов)
     """
     try:
+        from modules.scrapers.hero_scraper import HeroScraper
+        from modules.core.data_manager import DataManager
+
         user_print("Запуск сбора данных с dota2protracker.com...")
         scraper = HeroScraper(
             headless=getattr(run_full_scraping, "_headless", True),
             debug_dotabuff=getattr(run_full_scraping, "_debug_dotabuff", False),
+            snapshot_dir=getattr(run_full_scraping, "_snapshot_dir", None),
+            dotabuff_profile=getattr(run_full_scraping, "_dotabuff_profile", None),
+            shared_browser=getattr(run_full_scraping, "_single_browser", False),
         )
         data_manager = DataManager()
 
@@ -171,10 +182,15 @@ def run_full_scraping() -> tuple[bool, bool]:
 def run_heroes_scraping() -> bool:
     """Запуск скрапинга героев с фасетами"""
     try:
+        from modules.scrapers.hero_scraper import HeroScraper
+        from modules.core.data_manager import DataManager
+
         user_print("Запуск сбора данных с фасетами...")
         scraper = HeroScraper(
             headless=getattr(run_heroes_scraping, "_headless", True),
             debug_dotabuff=getattr(run_heroes_scraping, "_debug_dotabuff", False),
+            dotabuff_profile=getattr(run_heroes_scraping, "_dotabuff_profile", None),
+            shared_browser=getattr(run_heroes_scraping, "_single_browser", False),
         )
         data_manager = DataManager()
 
@@ -203,10 +219,15 @@ def run_heroes_scraping() -> bool:
 def run_heroes_no_facets_scraping() -> bool:
     """Запуск скрапинга героев без фасетов"""
     try:
+        from modules.scrapers.hero_scraper import HeroScraper
+        from modules.core.data_manager import DataManager
+
         logger.info("Запуск скрапинга данных без фасетов...")
         scraper = HeroScraper(
             headless=getattr(run_heroes_scraping, "_headless", True),
             debug_dotabuff=getattr(run_heroes_scraping, "_debug_dotabuff", False),
+            dotabuff_profile=getattr(run_heroes_scraping, "_dotabuff_profile", None),
+            shared_browser=getattr(run_heroes_scraping, "_single_browser", False),
         )
         data_manager = DataManager()
 
@@ -233,14 +254,18 @@ def run_heroes_no_facets_scraping() -> bool:
         return False
 
 
-def run_config_processing() -> bool:
+def run_config_processing(screens: Optional[list[str]] = None) -> bool:
     """Запуск обработки конфигураций"""
     try:
+        from modules.core.config_processor import ConfigProcessor
+        from modules.config.screen_profiles import load_screen_profiles
+
         user_print("Обрабатываем данные и создаем конфигурации...")
         processor = ConfigProcessor()
+        profiles = load_screen_profiles(names=screens)
 
         # Обработка данных
-        success = processor.process_all_data()
+        success = processor.process_all_data(profiles=profiles)
         if success:
             user_print("OK - Конфигурации созданы и скопированы в Steam")
             return True
@@ -253,6 +278,124 @@ def run_config_processing() -> bool:
         return False
 
 
+def run_matrix_scraping(periods: list[int], brackets: Optional[list[str]], headless: bool) -> bool:
+    """Сбор матрицы периодов и рангов за одну сессию браузера"""
+    try:
+        from modules.scrapers.hero_scraper import HeroScraper
+        from modules.core.data_manager import DataManager
+
+        user_print(
+            f"Сбор матрицы: периоды {periods}, ранги {brackets or ['текущий']}..."
+        )
+        scraper = HeroScraper(
+            headless=headless,
+            debug_dotabuff=getattr(run_full_scraping, "_debug_dotabuff", False),
+            snapshot_dir=getattr(run_full_scraping, "_snapshot_dir", None),
+            dotabuff_profile=getattr(run_full_scraping, "_dotabuff_profile", None),
+            shared_browser=getattr(run_full_scraping, "_single_browser", False),
+        )
+        matrix_df = scraper.scrape_matrix(
+            periods, brackets, show_progress=QUIET_MODE
+        )
+        if matrix_df.empty:
+            user_print("ERROR - Не удалось собрать матрицу")
+            return False
+        to_save = matrix_df.drop(columns=["facet_number"], errors="ignore")
+        if DataManager().save_dataframe(to_save, "heroes_matrix.csv"):
+            user_print(f"OK - Матрица сохранена: {len(matrix_df)} строк")
+            return True
+        user_print("ERROR - Ошибка при сохранении матрицы")
+        return False
+    except Exception as e:
+        user_print(f"ERROR - Ошибка при сборе матрицы: {e}")
+        return False
+
+
+def run_snapshot_reprocessing(snapshot_dir: str, workers: Optional[int]) -> bool:
+    """Повторный разбор архивных снимков HTML текущей логикой извлечения"""
+    try:
+        from modules.core.snapshot_reprocessor import reprocess_snapshots
+
+        user_print(f"Повторный разбор снимков из {snapshot_dir}...")
+        path = reprocess_snapshots(snapshot_dir, workers=workers)
+        if path:
+            user_print(f"OK - Результат сохранен: {path}")
+            return True
+        user_print("ERROR - Не удалось разобрать снимки")
+        return False
+    except Exception as e:
+        user_print(f"ERROR - Ошибка при разборе снимков: {e}")
+        return False
+
+
+def run_daemon(
+    interval_minutes: float, headless: bool, screens: Optional[list[str]] = None
+) -> bool:
+    """Запуск режима демона: периодический опрос и обновление конфигураций"""
+    try:
+        from modules.core.daemon import MetaDaemon
+        from modules.config.screen_profiles import load_screen_profiles
+
+        user_print(
+            f"Режим демона: опрос каждые {interval_minutes:g} мин (Ctrl+C для остановки)"
+        )
+        MetaDaemon(
+            interval_minutes=interval_minutes,
+            headless=headless,
+            profiles=load_screen_profiles(names=screens) if screens else None,
+            debug_dotabuff=getattr(run_full_scraping, "_debug_dotabuff", False),
+            snapshot_dir=getattr(run_full_scraping, "_snapshot_dir", None),
+            dotabuff_profile=getattr(run_full_scraping, "_dotabuff_profile", None),
+            single_browser=getattr(run_full_scraping, "_single_browser", False),
+        ).run_forever()
+        return True
+    except Exception as e:
+        user_print(f"ERROR - Ошибка в режиме демона: {e}")
+        return False
+
+
+def _selected_mode(args) -> str:
+    """Имя выбранного режима запуска (для отчётов)"""
+    if args.daemon:
+        return "daemon"
+    if args.matrix:
+        return "matrix"
+    if args.reprocess_snapshots:
+        return "reprocess"
+    if args.scrape:
+        return "scrape"
+    if args.scrape_no_facets:
+        return "scrape_no_facets"
+    if args.scrape_all:
+        return "scrape_all"
+    if args.config:
+        return "config"
+    return "all"
+
+
+# Входные файлы режимов, хэши которых попадают в метку профиля
+PROFILE_INPUTS = {
+    "config": [
+        os.path.join("configs", "heroes_data.csv"),
+        os.path.join("configs", "heroes_no_facets.csv"),
+    ],
+}
+
+
+def _make_profiler(args, mode: str):
+    """Создает профилировщик для режима, если передан --profile"""
+    if not args.profile:
+        return None
+    from modules.utils.profiler import RunProfiler
+
+    return RunProfiler(
+        mode,
+        input_paths=PROFILE_INPUTS.get(mode, []),
+        output_dir=os.path.join("configs", "profiles"),
+        top_n=args.profile_top,
+    )
+
+
 def main():
     """Основная функция"""
     global QUIET_MODE
@@ -271,10 +414,6 @@ def main():
         QUIET_MODE = False
     setup_logging(QUIET_MODE, DEBUG_MODE)
 
-    # Проверка зависимостей
-    if not check_dependencies():
-        sys.exit(1)
-
     # Настройка аргументов командной строки
     parser = argparse.ArgumentParser(
         description="Dota 2 Data Scraper - автоматизированный сбор данных о героях с dota2protracker.com",
@@ -286,6 +425,11 @@ def main():
   python main.py --scrape-all       # Только оптимизированный скрапинг
   python main.py --config           # Только обработка конфигураций
   python main.py --no-headless      # Видимый режим браузера для отладки
+  python main.py --config --profile # Профилирование режима (configs/profiles/)
+  python main.py --daemon --interval 30  # Демон: обновление при изменении меты
+  python main.py --matrix --periods 8 30 # Несколько периодов за одну сессию
+  python main.py --scrape-all --archive-snapshots      # Сохранять HTML таблиц
+  python main.py --reprocess-snapshots configs/snapshots  # Повторный разбор снимков
         """,
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
@@ -314,6 +458,52 @@ def main():
         action="store_true",
         help="Полный процесс: оптимизированный скрапинг + обработка конфигураций",
     )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Режим демона: держать браузер, опрашивать мету и обновлять конфигурации только при изменениях",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=60.0,
+        help="Интервал опроса в режиме демона, минуты (по умолчанию 60)",
+    )
+    parser.add_argument(
+        "--matrix",
+        action="store_true",
+        help="Сбор таблиц для нескольких периодов/рангов в configs/heroes_matrix.csv",
+    )
+    parser.add_argument(
+        "--periods",
+        type=int,
+        nargs="+",
+        default=[8],
+        help="Периоды в днях для --matrix (по умолчанию 8)",
+    )
+    parser.add_argument(
+        "--brackets",
+        nargs="+",
+        default=None,
+        help="Фильтры по рангу для --matrix (value или текст опции селектора)",
+    )
+    parser.add_argument(
+        "--archive-snapshots",
+        action="store_true",
+        help="Сохранять HTML каждой таблицы в configs/snapshots/ для повторного разбора",
+    )
+    parser.add_argument(
+        "--reprocess-snapshots",
+        metavar="DIR",
+        default=None,
+        help="Повторно разобрать снимки из DIR в пуле процессов (результат в configs/)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Число процессов для --reprocess-snapshots (по умолчанию по числу ядер)",
+    )
     parser.add_argument(
         "--no-headless",
         action="store_true",
@@ -334,60 +524,128 @@ def main():
         action="store_true",
         help="DEBUG: Попытка получения фасетов через Dotabuff с Selenium",
     )
+    parser.add_argument(
+        "--dotabuff-profile",
+        metavar="DIR",
+        nargs="?",
+        const=os.path.join("configs", "browser_profile"),
+        default=None,
+        help="Постоянный профиль браузера для Dotabuff: проверка Cloudflare проходится "
+        "один раз, дальше фасеты загружаются по HTTP (по умолчанию configs/browser_profile)",
+    )
+    parser.add_argument(
+        "--screens",
+        metavar="NAME",
+        nargs="+",
+        default=None,
+        help="Профили экранов из configs/screen_profiles.json, для которых создаются "
+        "конфигурации (по умолчанию все)",
+    )
+    parser.add_argument(
+        "--single-browser",
+        action="store_true",
+        help="Один видимый браузер с профилем Dotabuff и для dota2protracker, и для "
+        "фасетов (вторая вкладка) — когда headless блокируется Cloudflare",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Профилирование выбранного режима (cProfile + tracemalloc) в configs/profiles/",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=25,
+        help="Сколько строк выводить в отчетах профилирования (по умолчанию 25)",
+    )
 
     args = parser.parse_args()
+    mode = _selected_mode(args)
+    tracer = reset_tracer()
+
+    # Проверка зависимостей (Selenium нужен только режимам со скрапингом)
+    if mode in SCRAPING_MODES and not check_dependencies():
+        sys.exit(1)
 
     # Протаскиваем настройки для скрапинга
     setattr(run_heroes_scraping, "_headless", not args.no_headless)
     setattr(run_full_scraping, "_headless", not args.no_headless)
     setattr(run_heroes_scraping, "_debug_dotabuff", args.debug_dotabuff)
     setattr(run_full_scraping, "_debug_dotabuff", args.debug_dotabuff)
+    setattr(run_heroes_scraping, "_dotabuff_profile", args.dotabuff_profile)
+    setattr(run_full_scraping, "_dotabuff_profile", args.dotabuff_profile)
+    setattr(run_heroes_scraping, "_single_browser", args.single_browser)
+    setattr(run_full_scraping, "_single_browser", args.single_browser)
+    if args.archive_snapshots:
+        setattr(run_full_scraping, "_snapshot_dir", os.path.join("configs", "snapshots"))
 
     success_count = 0
     total_count = 0
 
-    # Определяем, какие процессы запускать
-    if args.scrape:
-        total_count += 1
-        if run_heroes_scraping():
-            success_count += 1
-    elif args.scrape_no_facets:
-        total_count += 1
-        if run_heroes_no_facets_scraping():
-            success_count += 1
-    elif args.scrape_all:
-        # Оптимизированный скрапинг - оба типа данных за один проход
-        if not QUIET_MODE:
-            logger.info("Запуск оптимизированного скрапинга...")
-        total_count += 2  # Считаем как 2 процесса
-        success_with_facets, success_no_facets = run_full_scraping()
-        if success_with_facets:
-            success_count += 1
-        if success_no_facets:
-            success_count += 1
-    elif args.config:
-        total_count += 1
-        if run_config_processing():
-            success_count += 1
-    elif args.all or not any(
-        [args.scrape, args.scrape_no_facets, args.scrape_all, args.config]
-    ):
-        # Запуск всех процессов с оптимизацией
-        if not QUIET_MODE:
-            logger.info("Запуск всех процессов (оптимизированный)...")
-
-        # Оптимизированный скрапинг
-        total_count += 2  # Скрапинг считаем как 2 процесса
-        success_with_facets, success_no_facets = run_full_scraping()
-        if success_with_facets:
-            success_count += 1
-        if success_no_facets:
-            success_count += 1
-
-        # Обработка конфигураций
-        total_count += 1
-        if run_config_processing():
-            success_count += 1
+    profiler = _make_profiler(args, mode)
+    with profiler or nullcontext(), span("run", mode=mode):
+        # Определяем, какие процессы запускать
+        if args.daemon:
+            total_count += 1
+            if run_daemon(args.interval, headless=not args.no_headless, screens=args.screens):
+                success_count += 1
+        elif args.reprocess_snapshots:
+            total_count += 1
+            if run_snapshot_reprocessing(args.reprocess_snapshots, args.workers):
+                success_count += 1
+        elif args.matrix:
+            total_count += 1
+            if run_matrix_scraping(
+                args.periods, args.brackets, headless=not args.no_headless
+            ):
+                success_count += 1
+        elif args.scrape:
+            total_count += 1
+            if run_heroes_scraping():
+                success_count += 1
+        elif args.scrape_no_facets:
+            total_count += 1
+            if run_heroes_no_facets_scraping():
+                success_count += 1
+        elif args.scrape_all:
+            # Оптимизированный скрапинг - оба типа данных за один проход
+            if not QUIET_MODE:
+                logger.info("Запуск оптимизированного скрапинга...")
+            total_count += 2  # Считаем как 2 процесса
+            success_with_facets, success_no_facets = run_full_scraping()
+            if success_with_facets:
+                success_count += 1
+            if success_no_facets:
+                success_count += 1
+        elif args.config:
+            total_count += 1
+            if run_config_processing(args.screens):
+                success_count += 1
+        elif args.all or not any(
+            [args.scrape, args.scrape_no_facets, args.scrape_all, args.config]
+        ):
+            # Запуск всех процессов с оптимизацией
+            if not QUIET_MODE:
+                logger.info("Запуск всех процессов (оптимизированный)...")
+
+            # Оптимизированный скрапинг
+            total_count += 2  # Скрапинг считаем как 2 процесса
+            success_with_facets, success_no_facets = run_full_scraping()
+            if success_with_facets:
+                success_count += 1
+            if success_no_facets:
+                success_count += 1
+
+            # Обработка конфигураций
+            total_count += 1
+            if run_config_processing(args.screens):
+                success_count += 1
+
+    report_path = tracer.write_report()
+    if report_path and not QUIET_MODE:
+        logger.info(f"Отчёт о таймингах: {report_path}")
+    if profiler is not None:
+        user_print(f"Профиль запуска сохранен: configs/profiles/{profiler.label}.*")
 
     # Итоговый отчет
     if QUIET_MODE:
@@ -2,14 +2,33 @@
 Модуль для оптимизации расположения элементов конфигурации
 """
 
+import logging
 import math
+import re
+import threading
+import time
+from collections import OrderedDict
 from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+# Вес видимой иконки по приоритету категории (1 - высокий ... 3 - низкий)
+PRIORITY_WEIGHTS = {1: 3, 2: 2, 3: 1}
+# Бюджет времени решателя по умолчанию (секунды)
+SOLVER_TIME_BUDGET = 0.05
+# Отступ по вертикали между категориями одной колонки (место под надпись)
+VERTICAL_GAP = 30
+# Сколько решений solve_layout хранить (в режиме демона каждая смена меты
+# дает новую сигнатуру; вытесняются давно не использованные)
+SOLUTION_CACHE_SIZE = 64
+
+_POSITION_CATEGORY = re.compile(r"^POS (\d+)\b(?: F (\d+)(\+)?)?")
+
+
+@dataclass(frozen=True)
 class ScreenDimensions:
-    """Размеры экрана"""
+    """Размеры экрана (неизменяемые — ключ кеша макетов)"""
 
     width: float = 1176.52
     height: float = 504.35
@@ -29,36 +48,104 @@ class CategoryLayout:
     priority: int = 1  # 1 - высокий, 2 - средний, 3 - низкий
 
 
-class LayoutOptimizer:
-    """Оптимизатор расположения элементов"""
+@dataclass(frozen=True)
+class IconSize:
+    """Размер ячейки иконки героя в координатах сетки"""
 
-    def __init__(self, screen: ScreenDimensions = None):
-        self.screen = screen or ScreenDimensions()
+    width: float = 48.0
+    height: float = 64.0
 
-    def calculate_optimal_layouts(self) -> Dict[str, List[CategoryLayout]]:
-        """Вычисляет несколько оптимальных вариантов расположения"""
 
-        layouts = {}
+def column_key(name: str) -> str:
+    """
+    Колонка категории: "POS n F 1/2" и "POS n Top ..." — колонка позиции n,
+    "POS n F 3+" — общая боковая колонка редких фасетов, прочие — своя колонка
+    """
+    m = _POSITION_CATEGORY.match(name)
+    if not m:
+        return name
+    if m.group(3) or (m.group(2) and int(m.group(2)) >= 3):
+        return "rare"
+    return f"pos {m.group(1)}"
 
-        # Вариант 1: Классическая сетка с оптимизированными размерами
-        layouts["classic_optimized"] = self._create_classic_optimized_layout()
 
-        # Вариант 2: Адаптивная сетка (больше места для популярных фасетов)
-        layouts["adaptive_grid"] = self._create_adaptive_grid_layout()
+def category_priority(name: str) -> int:
+    """Приоритет категории по имени: редкие фасеты (3+) — низкий"""
+    return 3 if column_key(name) == "rare" else 1
 
-        # Вариант 3: Компактное расположение с приоритетами
-        layouts["compact_priority"] = self._create_compact_priority_layout()
 
-        # Вариант 4: Горизонтальное расположение
-        layouts["horizontal_flow"] = self._create_horizontal_flow_layout()
+class LayoutOptimizer:
+    """Оптимизатор расположения элементов"""
 
-        # Вариант 5: Максимальное использование пространства
-        layouts["space_maximized"] = self._create_space_maximized_layout()
+    def __init__(self, screen: ScreenDimensions = None):
+        self.screen = screen or ScreenDimensions()
 
-        # Вариант 6: Полное использование пространства (100%)
-        layouts["full_space_usage"] = self._create_full_space_layout()
+    # Реестр шаблонных макетов: имя -> метод построения (в порядке сравнения)
+    LAYOUT_BUILDERS = {
+        # Классическая сетка с оптимизированными размерами
+        "classic_optimized": "_create_classic_optimized_layout",
+        # Адаптивная сетка (больше места для популярных фасетов)
+        "adaptive_grid": "_create_adaptive_grid_layout",
+        # Компактное расположение с приоритетами
+        "compact_priority": "_create_compact_priority_layout",
+        # Горизонтальное расположение
+        "horizontal_flow": "_create_horizontal_flow_layout",
+        # Максимальное использование пространства
+        "space_maximized": "_create_space_maximized_layout",
+        # Полное использование пространства (100%)
+        "full_space_usage": "_create_full_space_layout",
+    }
+
+    # Построенные макеты по (экран, имя) — общие для всех экземпляров
+    _layout_cache: Dict[Tuple[ScreenDimensions, str], List[CategoryLayout]] = {}
+    # Решения solve_layout по сигнатуре (экран, иконка, категории), LRU
+    _solution_cache: OrderedDict[tuple, List[CategoryLayout]] = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    def get_layout(self, name: str) -> List[CategoryLayout]:
+        """
+        Шаблонный макет по имени: строится при первом запросе для данного экрана
+
+        Raises:
+            KeyError: Неизвестное имя макета
+        """
+        if name not in self.LAYOUT_BUILDERS:
+            raise KeyError(f"Неизвестный макет: {name}")
+        key = (self.screen, name)
+        with self._cache_lock:
+            cached = self._layout_cache.get(key)
+        if cached is None:
+            cached = getattr(self, self.LAYOUT_BUILDERS[name])()
+            with self._cache_lock:
+                self._layout_cache[key] = cached
+        return [replace(c) for c in cached]
 
-        return layouts
+    def calculate_optimal_layouts(self) -> Dict[str, List[CategoryLayout]]:
+        """Вычисляет все варианты расположения (для сравнения макетов)"""
+        return {name: self.get_layout(name) for name in self.LAYOUT_BUILDERS}
+
+    @classmethod
+    def precompute_layouts(
+        cls,
+        screens: List[ScreenDimensions],
+        names: Optional[List[str]] = None,
+    ) -> Dict[ScreenDimensions, Dict[str, List[CategoryLayout]]]:
+        """
+        Строит макеты сразу для нескольких экранов (например, частых разрешений)
+
+        Args:
+            screens: Размеры экранов
+            names: Имена макетов; None — все из LAYOUT_BUILDERS
+
+        Returns:
+            {экран: {имя макета: категории}}
+        """
+        names = list(names or cls.LAYOUT_BUILDERS)
+        result = {}
+        for screen in dict.fromkeys(screens):
+            optimizer = cls(screen)
+            result[screen] = {name: optimizer.get_layout(name) for name in names}
+        return result
 
     def _create_classic_optimized_layout(self) -> List[CategoryLayout]:
         """Классическая сетка с оптимизированными размерами - учитывает место для надписей"""
@@ -440,6 +527,201 @@ class LayoutOptimizer:
 
         return layouts
 
+    def solve_layout(
+        self,
+        categories: List[CategoryLayout],
+        icon: IconSize = IconSize(),
+        vertical_gap: float = VERTICAL_GAP,
+        time_budget: float = SOLVER_TIME_BUDGET,
+    ) -> List[CategoryLayout]:
+        """
+        Расположение категорий по фактическому числу героев
+
+        Категории упаковываются в колонки (column_key): ширина колонки — целое
+        число иконок, высота категории — целое число рядов. Максимизируется
+        взвешенное приоритетом число видимых иконок, при равенстве — меньшая
+        занятая площадь. Распределение рядов внутри колонки — жадное (выигрыш
+        от ряда не возрастает, поэтому жадность точна), распределение ширины
+        между колонками — динамическое программирование (рюкзак с выбором).
+
+        Args:
+            categories: Категории с name, hero_count и priority (координаты не важны)
+            icon: Размер ячейки иконки
+            vertical_gap: Отступ между категориями в колонке (место под надпись)
+            time_budget: Бюджет времени (секунды); по истечении ширина делится
+                пропорционально потребности колонок
+
+        Returns:
+            Непересекающиеся CategoryLayout для категорий с героями
+
+        Raises:
+            ValueError: Категории не помещаются на экран даже по одному ряду
+        """
+        shown = [c for c in categories if c.hero_count > 0]
+        signature = (
+            (self.screen.width, self.screen.height, self.screen.margin),
+            (icon.width, icon.height, vertical_gap),
+            tuple((c.name, c.hero_count, c.priority) for c in shown),
+        )
+        with self._cache_lock:
+            cached = self._solution_cache.get(signature)
+            if cached is not None:
+                self._solution_cache.move_to_end(signature)
+        if cached is None:
+            cached = self._solve(shown, icon, vertical_gap, time_budget)
+            with self._cache_lock:
+                self._solution_cache[signature] = cached
+                while len(self._solution_cache) > SOLUTION_CACHE_SIZE:
+                    self._solution_cache.popitem(last=False)
+        return [replace(c) for c in cached]
+
+    def _solve(
+        self,
+        categories: List[CategoryLayout],
+        icon: IconSize,
+        vertical_gap: float,
+        time_budget: float,
+    ) -> List[CategoryLayout]:
+        deadline = time.perf_counter() + time_budget
+        columns: Dict[str, List[CategoryLayout]] = {}
+        for cat in categories:
+            columns.setdefault(column_key(cat.name), []).append(cat)
+        # Колонки позиций по порядку, боковая колонка редких фасетов — справа
+        order = sorted(columns, key=lambda k: (k == "rare", k))
+        if not order:
+            return []
+
+        top = self.screen.margin * 2
+        # Суммарная ширина колонок в иконках (между колонками — отступ margin)
+        budget = int(
+            (self.screen.width - self.screen.margin * (len(order) - 1)) // icon.width
+        )
+        if budget < len(order):
+            raise ValueError("Колонки не помещаются по ширине экрана")
+        max_icons = budget - (len(order) - 1)
+
+        # Для каждой колонки и ширины k: (ценность, площадь, ряды по категориям)
+        options: List[Dict[int, Tuple[int, int, List[int]]]] = []
+        for key in order:
+            cats = columns[key]
+            usable = self.screen.height - top - vertical_gap * (len(cats) - 1)
+            rows = int(usable // icon.height)
+            if rows < len(cats):
+                raise ValueError(f"Категории колонки {key} не помещаются по высоте")
+            # Колонка шире самой большой категории ничего не добавляет
+            need = max(c.hero_count for c in cats)
+            options.append(
+                {
+                    k: self._fill_column(cats, k, rows)
+                    for k in range(1, min(max_icons, need) + 1)
+                }
+            )
+
+        widths = self._allocate_widths(options, budget, deadline)
+        if widths is None:
+            logger.warning("Бюджет времени решателя исчерпан, ширина делится пропорционально")
+            widths = [
+                min(k, max(column_options))
+                for k, column_options in zip(
+                    self._proportional_widths(order, columns, budget), options
+                )
+            ]
+
+        layouts: List[CategoryLayout] = []
+        x = 0.0
+        for key, k, column_options in zip(order, widths, options):
+            _, _, rows = column_options[k]
+            y = top
+            for cat, n in zip(columns[key], rows):
+                layouts.append(
+                    CategoryLayout(
+                        name=cat.name,
+                        x=x,
+                        y=y,
+                        width=k * icon.width,
+                        height=n * icon.height,
+                        hero_count=cat.hero_count,
+                        priority=cat.priority,
+                    )
+                )
+                y += n * icon.height + vertical_gap
+            x += k * icon.width + self.screen.margin
+        return layouts
+
+    @staticmethod
+    def _fill_column(
+        cats: List[CategoryLayout], k: int, rows: int
+    ) -> Tuple[int, int, List[int]]:
+        """
+        Ряды категориям колонки шириной k иконок
+
+        Returns:
+            (взвешенное число видимых иконок, число занятых ячеек, ряды по категориям)
+        """
+        # Каждой категории хотя бы один ряд, остальные — по наибольшему выигрышу
+        given = [1] * len(cats)
+        needed = [math.ceil(c.hero_count / k) for c in cats]
+        for _ in range(rows - len(cats)):
+            gains = [
+                PRIORITY_WEIGHTS.get(c.priority, 1)
+                * min(k, c.hero_count - given[i] * k)
+                if given[i] < needed[i] else 0
+                for i, c in enumerate(cats)
+            ]
+            best = max(range(len(cats)), key=lambda i: gains[i])
+            if gains[best] <= 0:
+                break
+            given[best] += 1
+        value = sum(
+            PRIORITY_WEIGHTS.get(c.priority, 1) * min(c.hero_count, n * k)
+            for c, n in zip(cats, given)
+        )
+        return value, k * sum(given), given
+
+    @staticmethod
+    def _allocate_widths(
+        options: List[Dict[int, Tuple[int, int, List[int]]]],
+        budget: int,
+        deadline: float,
+    ) -> Optional[List[int]]:
+        """
+        Ширина колонок (в иконках) при суммарной ширине не больше budget
+
+        Returns:
+            Ширины по колонкам или None, если вышел бюджет времени
+        """
+        # best[b] — (ценность, -площадь) лучшего набора колонок шириной b
+        best: Dict[int, Tuple[Tuple[int, int], List[int]]] = {0: ((0, 0), [])}
+        for column in options:
+            if time.perf_counter() > deadline:
+                return None
+            nxt: Dict[int, Tuple[Tuple[int, int], List[int]]] = {}
+            for used, (score, picks) in best.items():
+                for k, (value, area, _) in column.items():
+                    total = used + k
+                    if total > budget:
+                        continue
+                    cand = (score[0] + value, score[1] - area)
+                    if total not in nxt or cand > nxt[total][0]:
+                        nxt[total] = (cand, picks + [k])
+            best = nxt
+        if not best:
+            return None
+        return max(best.values(), key=lambda item: item[0])[1]
+
+    @staticmethod
+    def _proportional_widths(
+        order: List[str], columns: Dict[str, List[CategoryLayout]], budget: int
+    ) -> List[int]:
+        """Запасное решение: ширина пропорционально взвешенному числу героев"""
+        demand = [
+            sum(PRIORITY_WEIGHTS.get(c.priority, 1) * c.hero_count for c in columns[k])
+            for k in order
+        ]
+        total = sum(demand) or 1
+        spare = budget - len(order)
+        return [1 + int(spare * d / total) for d in demand]
+
     def get_layout_stats(self, layout: List[CategoryLayout]) -> Dict[str, float]:
         """Получает статистику использования пространства для макета"""
         total_area = self.screen.width * self.screen.height
@@ -0,0 +1,216 @@
+"""
+Проверка расположения категорий конфигурации: выход за экран, наложения и
+неиспользуемая площадь.
+
+Обе проверки — заметающая прямая по x. Объединенная площадь считается с
+деревом отрезков по сжатым координатам y: O(n log n). Наложения ищутся
+сравнением с прямоугольниками, которые пересекает заметающая прямая (куча
+по правому краю): O(n log n + n·a), где a — наибольшее число прямоугольников
+на одной вертикали; для сетки категорий a не больше числа рядов.
+"""
+
+import heapq
+import logging
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple, Union
+
+from .layout_optimizer import CategoryLayout, ScreenDimensions
+
+logger = logging.getLogger(__name__)
+
+# Допуск для касающихся границ (координаты дробные)
+EPSILON = 1e-6
+
+
+@dataclass(frozen=True)
+class Rect:
+    """Прямоугольник категории в координатах сетки"""
+
+    name: str
+    x: float
+    y: float
+    width: float
+    height: float
+
+    @property
+    def right(self) -> float:
+        return self.x + self.width
+
+    @property
+    def bottom(self) -> float:
+        return self.y + self.height
+
+    @property
+    def area(self) -> float:
+        return max(self.width, 0.0) * max(self.height, 0.0)
+
+
+@dataclass
+class LayoutIssue:
+    """Найденная проблема: out_of_bounds, overlap или empty"""
+
+    kind: str
+    categories: Tuple[str, ...]
+    detail: str = ""
+
+
+@dataclass
+class LayoutReport:
+    """Результат проверки расположения и статистика площади"""
+
+    issues: List[LayoutIssue] = field(default_factory=list)
+    stats: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+
+def to_rect(item: Union[CategoryLayout, Dict]) -> Rect:
+    """Rect из CategoryLayout или категории конфигурации (x_position, y_position, ...)"""
+    if isinstance(item, CategoryLayout):
+        return Rect(item.name, item.x, item.y, item.width, item.height)
+    return Rect(
+        item.get("category_name", ""),
+        float(item.get("x_position", 0)),
+        float(item.get("y_position", 0)),
+        float(item.get("width", 0)),
+        float(item.get("height", 0)),
+    )
+
+
+def find_overlaps(rects: List[Rect]) -> List[Tuple[Rect, Rect, float]]:
+    """
+    Пары пересекающихся прямоугольников (касание границ не считается)
+
+    Каждый прямоугольник сравнивается только с пересекающими заметающую прямую,
+    а не со всеми: O(n log n + n·a), a — наибольшее число таких прямоугольников.
+
+    Returns:
+        [(a, b, площадь пересечения)]
+    """
+    order = sorted((r for r in rects if r.area > 0), key=lambda r: r.x)
+    active: List[Tuple[float, int, Rect]] = []
+    overlaps = []
+    for i, rect in enumerate(order):
+        # Снимаем прямоугольники, закончившиеся левее текущего
+        while active and active[0][0] <= rect.x + EPSILON:
+            heapq.heappop(active)
+        for right, _, other in active:
+            dx = min(right, rect.right) - rect.x
+            dy = min(other.bottom, rect.bottom) - max(other.y, rect.y)
+            if dx > EPSILON and dy > EPSILON:
+                overlaps.append((other, rect, dx * dy))
+        heapq.heappush(active, (rect.right, i, rect))
+    return overlaps
+
+
+class _CoverageTree:
+    """Дерево отрезков по сжатым координатам y: покрытая длина при добавлении/снятии интервалов"""
+
+    def __init__(self, ys: List[float]):
+        self.ys = ys
+        size = 4 * max(len(ys), 1)
+        self.count = [0] * size
+        self.covered = [0.0] * size
+
+    def update(self, lo: float, hi: float, delta: int) -> None:
+        left = bisect_left(self.ys, lo)
+        right = bisect_left(self.ys, hi)
+        if left < right:
+            self._update(1, 0, len(self.ys) - 1, left, right, delta)
+
+    def _update(self, node: int, start: int, end: int, left: int, right: int, delta: int) -> None:
+        # Узел отвечает за отрезок [ys[start], ys[end]]
+        if right <= start or end <= left:
+            return
+        if left <= start and end <= right:
+            self.count[node] += delta
+        else:
+            mid = (start + end) // 2
+            self._update(2 * node, start, mid, left, right, delta)
+            self._update(2 * node + 1, mid, end, left, right, delta)
+        if self.count[node] > 0:
+            self.covered[node] = self.ys[end] - self.ys[start]
+        elif end - start == 1:
+            self.covered[node] = 0.0
+        else:
+            self.covered[node] = self.covered[2 * node] + self.covered[2 * node + 1]
+
+    @property
+    def length(self) -> float:
+        return self.covered[1]
+
+
+def union_area(rects: Iterable[Rect]) -> float:
+    """Площадь объединения прямоугольников (наложения считаются один раз), O(n log n)"""
+    events = []
+    ys = set()
+    for r in rects:
+        if r.area > 0:
+            events.append((r.x, 1, r.y, r.bottom))
+            events.append((r.right, -1, r.y, r.bottom))
+            ys.update((r.y, r.bottom))
+    if not events:
+        return 0.0
+    events.sort(key=lambda e: e[0])
+    tree = _CoverageTree(sorted(ys))
+    area = 0.0
+    prev_x = events[0][0]
+    for x, delta, y1, y2 in events:
+        area += tree.length * (x - prev_x)
+        prev_x = x
+        tree.update(y1, y2, delta)
+    return area
+
+
+def validate_layout(
+    items: Iterable[Union[CategoryLayout, Dict]], screen: ScreenDimensions
+) -> LayoutReport:
+    """
+    Проверяет расположение категорий на экране screen
+
+    Returns:
+        LayoutReport с проблемами и статистикой в духе get_layout_stats
+        (доля занятой площади, потери, площадь наложений)
+    """
+    rects = [to_rect(item) for item in items]
+    report = LayoutReport()
+
+    for r in rects:
+        if r.width <= 0 or r.height <= 0:
+            report.issues.append(LayoutIssue("empty", (r.name,), f"{r.width}x{r.height}"))
+        elif (
+            r.x < -EPSILON or r.y < -EPSILON
+            or r.right > screen.width + EPSILON or r.bottom > screen.height + EPSILON
+        ):
+            report.issues.append(
+                LayoutIssue(
+                    "out_of_bounds",
+                    (r.name,),
+                    f"({r.x:.1f}, {r.y:.1f})-({r.right:.1f}, {r.bottom:.1f}) "
+                    f"вне {screen.width}x{screen.height}",
+                )
+            )
+
+    overlaps = find_overlaps(rects)
+    for a, b, area in overlaps:
+        report.issues.append(LayoutIssue("overlap", (a.name, b.name), f"{area:.0f} пикселей"))
+
+    total_area = screen.width * screen.height
+    # Учитывается только часть внутри экрана
+    clipped = [
+        Rect(r.name, max(r.x, 0.0), max(r.y, 0.0),
+             min(r.right, screen.width) - max(r.x, 0.0),
+             min(r.bottom, screen.height) - max(r.y, 0.0))
+        for r in rects
+    ]
+    used_area = union_area(clipped)
+    report.stats = {
+        "total_usage_percent": used_area / total_area * 100,
+        "wasted_space_percent": (total_area - used_area) / total_area * 100,
+        "overlap_area": sum((area for _, _, area in overlaps), 0.0),
+        "categories": float(len(rects)),
+    }
+    return report
@@ -0,0 +1,99 @@
+"""
+Профили экранов для генерации конфигураций под несколько мониторов.
+
+Профиль — размеры сетки героев (ScreenDimensions), файл конфигурации и
+Steam-аккаунты (ID папок userdata), в которые она копируется. Профили
+читаются из configs/screen_profiles.json:
+
+    {"profiles": [
+        {"name": "default", "width": 1176.52, "height": 504.35, "accounts": []},
+        {"name": "ultrawide", "width": 1580, "height": 504.35, "accounts": ["123456"]}
+    ]}
+
+Профиль без accounts копируется во все аккаунты, не занятые другими профилями.
+"""
+
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .layout_optimizer import ScreenDimensions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILES_PATH = os.path.join("configs", "screen_profiles.json")
+DEFAULT_PROFILE_NAME = "default"
+
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+@dataclass
+class ScreenProfile:
+    """Профиль экрана: размеры сетки и Steam-аккаунты"""
+
+    name: str
+    screen: ScreenDimensions = field(default_factory=ScreenDimensions)
+    accounts: List[str] = field(default_factory=list)
+
+    @property
+    def config_path(self) -> str:
+        """Файл конфигурации профиля (у профиля по умолчанию — hero_configs.json)"""
+        if self.name == DEFAULT_PROFILE_NAME:
+            return os.path.join("configs", "hero_configs.json")
+        return os.path.join("configs", f"hero_configs_{_SAFE_NAME.sub('_', self.name)}.json")
+
+
+def load_screen_profiles(
+    path: str = DEFAULT_PROFILES_PATH, names: Optional[List[str]] = None
+) -> List[ScreenProfile]:
+    """
+    Профили экранов из JSON
+
+    Args:
+        path: Файл профилей; если его нет — один профиль по умолчанию
+        names: Выбрать только эти профили (None — все)
+
+    Returns:
+        Список профилей (всегда непустой)
+
+    Raises:
+        ValueError: Запрошенного профиля нет в файле
+    """
+    profiles = [ScreenProfile(DEFAULT_PROFILE_NAME)]
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            default = ScreenDimensions()
+            loaded = [
+                ScreenProfile(
+                    name=str(item["name"]),
+                    screen=ScreenDimensions(
+                        width=float(item.get("width", default.width)),
+                        height=float(item.get("height", default.height)),
+                        margin=float(item.get("margin", default.margin)),
+                    ),
+                    accounts=[str(a) for a in item.get("accounts") or []],
+                )
+                for item in data.get("profiles", [])
+            ]
+            if loaded:
+                profiles = loaded
+        except Exception as e:
+            logger.warning(f"Не удалось прочитать профили экранов {path}: {e}")
+
+    if names:
+        known = {p.name: p for p in profiles}
+        missing = [n for n in names if n not in known]
+        if missing:
+            raise ValueError(f"Неизвестные профили экранов: {', '.join(missing)}")
+        profiles = [known[n] for n in dict.fromkeys(names)]
+    return profiles
+
+
+def claimed_accounts(profiles: List[ScreenProfile]) -> List[str]:
+    """Аккаунты, явно закрепленные за профилями"""
+    return sorted({a for p in profiles for a in p.accounts})
@@ -3,10 +3,12 @@
 """
 
 import pandas as pd
+import copy
 import json
 import logging
 import re
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 import os
 
@@ -15,6 +17,8 @@ from ..utils.steam_manager import SteamManager
 from ..utils.facet_api_parser import FacetAPIParser
 from ..config.hero_config import HeroConfigProcessor
 from ..config.layout_optimizer import LayoutOptimizer, ScreenDimensions
+from ..config.screen_profiles import ScreenProfile, claimed_accounts, load_screen_profiles
+from ..utils.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -27,10 +31,21 @@ class ConfigProcessor:
         self.data_manager = DataManager()
         self.steam_manager = SteamManager()  # Добавляем Steam Manager
 
-    def process_all_data(self) -> bool:
+    def process_all_data(
+        self,
+        deploy_to_steam: bool = True,
+        profiles: Optional[List[ScreenProfile]] = None,
+    ) -> bool:
         """
         Обработка всех данных и создание конфигураций
 
+        Рейтинг героев и состав категорий считаются один раз, расположение —
+        отдельно для каждого профиля экрана.
+
+        Args:
+            deploy_to_steam: Копировать результат в Steam (демон копирует сам, с повторами)
+            profiles: Профили экранов; None — из configs/screen_profiles.json
+
         Returns:
             True если обработка успешна, False в противном случае
         """
@@ -58,7 +73,8 @@ class ConfigProcessor:
             self.logger.info(f"Маппинг фасетов загружен для {len(mapping)} героев (будет использован для всех обработок)")
 
             # Обработка данных героев
-            processed_heroes = self._process_heroes_data(heroes_df, mapping)
+            with span("config.process_heroes", rows=len(heroes_df)):
+                processed_heroes = self._process_heroes_data(heroes_df, mapping)
             if processed_heroes.empty:
                 self.logger.error("Ошибка при обработке данных героев")
                 return False
@@ -66,40 +82,48 @@ class ConfigProcessor:
             # Сохранение обработанных данных
             self.data_manager.save_dataframe(processed_heroes, "processed_heroes.csv")
 
-            # Создание стандартных конфигураций
-            config = self._create_configs(processed_heroes)
-
-            # Если есть данные без фасетов, добавляем конфигурацию для них
-            if has_no_facets_data:
-                processed_no_facets = self._process_heroes_data(heroes_no_facets_df, mapping)
-                base_threshold, _, _ = self._calculate_dynamic_match_thresholds(processed_no_facets)
-                no_facets_config = self._create_no_facets_config(processed_no_facets, base_threshold, max_heroes_per_position=30)
-                if no_facets_config:
-                    config["configs"].append(no_facets_config)
-                    self.logger.info("✅ Добавлена конфигурация без фасетов")
-
-            # Применяем оптимизированное расположение к основным конфигурациям
-            self._apply_optimized_layout_to_configs(config)
-
-            # Сохранение стандартной конфигурации
-            config_success = self._save_config(config)
-            if not config_success:
-                self.logger.error("Ошибка при сохранении стандартной конфигурации")
+            with span("config.build"):
+                # Создание стандартных конфигураций
+                config = self._create_configs(processed_heroes)
+
+                # Если есть данные без фасетов, добавляем конфигурацию для них
+                if has_no_facets_data:
+                    processed_no_facets = self._process_heroes_data(heroes_no_facets_df, mapping)
+                    base_threshold, _, _ = self._calculate_dynamic_match_thresholds(processed_no_facets)
+                    no_facets_config = self._create_no_facets_config(processed_no_facets, base_threshold, max_heroes_per_position=30)
+                    if no_facets_config:
+                        config["configs"].append(no_facets_config)
+                        self.logger.info("✅ Добавлена конфигурация без фасетов")
+
+            # Расположение под каждый профиль экрана поверх общего состава категорий
+            profiles = profiles or load_screen_profiles()
+            variants = []
+            for profile in profiles:
+                with span("config.profile", profile=profile.name):
+                    variant = copy.deepcopy(config)
+                    self._apply_optimized_layout_to_configs(variant, profile.screen)
+                    self._validate_config_layouts(variant, profile.screen)
+                variants.append((variant, profile.config_path))
+
+            # Сохранение конфигураций всех профилей
+            if not self._save_configs(variants):
+                self.logger.error("Ошибка при сохранении конфигураций")
                 return False
 
             self.logger.info(
-                "✅ Применено оптимизированное расположение Classic Optimized"
+                f"✅ Применено оптимизированное расположение по числу героев "
+                f"({len(profiles)} профилей экрана)"
             )
 
-            # Копируем конфигурацию в Steam
-            config_file_path = os.path.join("configs", "hero_configs.json")
-            steam_success = self.steam_manager.copy_config_to_steam(config_file_path)
-            if steam_success:
-                self.logger.info("✅ Конфигурация скопирована в Steam")
-            else:
-                self.logger.warning(
-                    "⚠️ Не удалось скопировать в Steam (файл сохранен локально)"
-                )
+            # Копируем конфигурации в Steam
+            if deploy_to_steam:
+                steam_success = self.deploy_to_steam(profiles)
+                if steam_success:
+                    self.logger.info("✅ Конфигурация скопирована в Steam")
+                else:
+                    self.logger.warning(
+                        "⚠️ Не удалось скопировать в Steam (файл сохранен локально)"
+                    )
 
             self.logger.info("Обработка всех данных завершена успешно")
             return True
@@ -398,24 +422,83 @@ class ConfigProcessor:
 
         return mapped_ids.fillna(0)
 
-    def _apply_optimized_layout_to_configs(self, config: Dict) -> None:
+    def deploy_to_steam(self, profiles: Optional[List[ScreenProfile]] = None) -> bool:
         """
-        Применяет оптимизированное расположение Classic Optimized к существующим конфигурациям
+        Копирует конфигурацию каждого профиля в его Steam-аккаунты
+
+        Профиль без аккаунтов получает все аккаунты, не занятые другими профилями
+        файла профилей (в том числе не выбранными в этом запуске).
+
+        Returns:
+            True если скопированы конфигурации всех профилей
+        """
+        all_profiles = load_screen_profiles()
+        profiles = profiles or all_profiles
+        claimed = claimed_accounts(all_profiles + profiles)
+        catch_all = [p.name for p in profiles if not p.accounts]
+        if len(catch_all) > 1:
+            self.logger.warning(
+                f"Профили без аккаунтов ({', '.join(catch_all)}) копируются в одни и те же "
+                f"аккаунты — останется конфигурация '{catch_all[-1]}'"
+            )
+        success = True
+        for profile in profiles:
+            copied = self.steam_manager.copy_config_to_steam(
+                profile.config_path,
+                accounts=profile.accounts or None,
+                exclude=None if profile.accounts else claimed,
+            )
+            if not copied:
+                self.logger.warning(f"Профиль '{profile.name}' не скопирован в Steam")
+            success = success and copied
+        return success
+
+    def _apply_optimized_layout_to_configs(
+        self, config: Dict, screen: Optional[ScreenDimensions] = None
+    ) -> None:
+        """
+        Применяет к каждой конфигурации расположение, рассчитанное решателем по
+        фактическому числу героев в категориях (Classic Optimized — запасной вариант)
 
         Args:
             config: Конфигурация с категориями для обновления
+            screen: Размеры экрана профиля (None — по умолчанию)
         """
         try:
-            from ..config.layout_optimizer import LayoutOptimizer
+            from ..config.layout_optimizer import (
+                CategoryLayout,
+                LayoutOptimizer,
+                category_priority,
+            )
 
-            # Получаем оптимизированное расположение
-            optimizer = LayoutOptimizer()
-            layouts = optimizer.calculate_optimal_layouts()
-            classic_layout = layouts["classic_optimized"]
+            optimizer = LayoutOptimizer(screen)
+            classic_layout = None
 
-            # Применяем к каждой конфигурации
             for cfg in config.get("configs", []):
-                self._update_config_layout(cfg, classic_layout)
+                categories = [
+                    CategoryLayout(
+                        name=cat.get("category_name", ""),
+                        x=0,
+                        y=0,
+                        width=0,
+                        height=0,
+                        hero_count=len(cat.get("hero_ids") or []),
+                        priority=category_priority(cat.get("category_name", "")),
+                    )
+                    for cat in cfg.get("categories", [])
+                ]
+                try:
+                    with span("config.layout", categories=len(categories)):
+                        layout = optimizer.solve_layout(categories)
+                except ValueError as e:
+                    self.logger.warning(
+                        f"Решатель не разместил '{cfg.get('config_name')}' ({e}), "
+                        "используем Classic Optimized"
+                    )
+                    if classic_layout is None:
+                        classic_layout = optimizer.get_layout("classic_optimized")
+                    layout = classic_layout
+                self._update_config_layout(cfg, layout)
 
             self.logger.info(
                 "Применено оптимизированное расположение ко всем конфигурациям"
@@ -426,6 +509,36 @@ class ConfigProcessor:
                 f"Ошибка при применении оптимизированного расположения: {e}"
             )
 
+    def _validate_config_layouts(
+        self, config: Dict, screen: Optional[ScreenDimensions] = None
+    ) -> bool:
+        """
+        Проверяет расположение категорий всех конфигураций: выход за экран и
+        наложения — предупреждения, статистика площади — в лог
+
+        Returns:
+            True если проблем не найдено
+        """
+        from ..config.layout_validator import validate_layout
+
+        screen = screen or ScreenDimensions()
+        valid = True
+        for cfg in config.get("configs", []):
+            name = cfg.get("config_name", "")
+            with span("config.validate_layout", config=name):
+                report = validate_layout(cfg.get("categories", []), screen)
+            for issue in report.issues:
+                self.logger.warning(
+                    f"Расположение '{name}': {issue.kind} {', '.join(issue.categories)} {issue.detail}"
+                )
+            valid = valid and report.ok
+            self.logger.info(
+                f"Расположение '{name}': занято {report.stats['total_usage_percent']:.1f}%, "
+                f"потери {report.stats['wasted_space_percent']:.1f}%, "
+                f"наложения {report.stats['overlap_area']:.0f} пикселей"
+            )
+        return valid
+
     def _update_config_layout(self, config: Dict, layout_template) -> None:
         """
         Обновляет расположение категорий в конфигурации согласно шаблону
@@ -721,20 +834,38 @@ class ConfigProcessor:
             self.logger.error(f"Ошибка при создании конфигурации '{config_name}': {e}")
             return None
 
-    def _save_config(self, config: Dict) -> bool:
+    def _save_configs(self, variants: List[tuple]) -> bool:
+        """
+        Сохраняет конфигурации профилей параллельно
+
+        Args:
+            variants: [(конфигурация, путь к файлу)]
+
+        Returns:
+            True если сохранены все
+        """
+        if len(variants) == 1:
+            return self._save_config(*variants[0])
+        with ThreadPoolExecutor(max_workers=len(variants)) as executor:
+            results = list(executor.map(lambda v: self._save_config(*v), variants))
+        return all(results)
+
+    def _save_config(
+        self, config: Dict, target_path: str = os.path.join("configs", "hero_configs.json")
+    ) -> bool:
         """
         Сохранение конфигурации в файл
 
         Args:
             config: Словарь с конфигурацией
+            target_path: Файл конфигурации
 
         Returns:
             True если сохранение успешно, False в противном случае
         """
         try:
             # Гарантируем наличие директории configs/
-            os.makedirs("configs", exist_ok=True)
-            target_path = os.path.join("configs", "hero_configs.json")
+            os.makedirs(os.path.dirname(target_path) or ".", exist_ok=True)
             with open(target_path, "w") as config_file:
                 json.dump(config, config_file, indent=4, default=str)
 
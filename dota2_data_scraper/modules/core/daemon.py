@@ -0,0 +1,230 @@
+"""
+Режим демона: периодический опрос dota2protracker с "теплым" браузером,
+пересборка hero_configs.json только при существенных изменениях и доставка в Steam
+"""
+
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .scraping_manager import ScrapingManager
+from .data_manager import DataManager
+from ..config.screen_profiles import ScreenProfile
+from ..scrapers.hero_scraper import HeroScraper
+from ..utils.table_fingerprint import dataframe_fingerprints, changed_keys
+from ..utils.tracing import span, reset_tracer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BackoffPolicy:
+    """Экспоненциальная задержка повторов после ошибок"""
+
+    initial: float = 60.0  # Первая задержка, секунды
+    factor: float = 2.0
+    maximum: float = 3600.0
+
+    def delay(self, failures: int) -> float:
+        """Задержка перед следующей попыткой после failures подряд неудач"""
+        if failures <= 0:
+            return 0.0
+        return min(self.maximum, self.initial * self.factor ** (failures - 1))
+
+
+class MetaDaemon:
+    """Долгоживущий цикл опроса меты и обновления конфигураций"""
+
+    # Результаты одного опроса
+    UNCHANGED = "unchanged"
+    UPDATED = "updated"
+    FAILED = "failed"
+
+    def __init__(
+        self,
+        interval_minutes: float = 60.0,
+        headless: bool = True,
+        url: str = "https://dota2protracker.com/meta",
+        backoff: Optional[BackoffPolicy] = None,
+        state_path: str = os.path.join("configs", "daemon_state.json"),
+        profiles: Optional[List[ScreenProfile]] = None,
+        debug_dotabuff: bool = False,
+        snapshot_dir: Optional[str] = None,
+        dotabuff_profile: Optional[str] = None,
+        single_browser: bool = False,
+    ):
+        """
+        Args:
+            interval_minutes: Интервал опроса, минуты
+            headless: Запускать браузер скрапинга без окна
+            url: Страница меты dota2protracker
+            backoff: Задержка повторов после ошибок
+            state_path: Файл состояния (отпечатки, незавершенная доставка)
+            profiles: Профили экранов (None — из configs/screen_profiles.json)
+            debug_dotabuff, snapshot_dir, dotabuff_profile, single_browser:
+                Передаются в HeroScraper (как --debug-dotabuff, --archive-snapshots,
+                --dotabuff-profile и --single-browser в остальных режимах)
+        """
+        self.interval = interval_minutes * 60
+        self.headless = headless
+        self.url = url
+        self.backoff = backoff or BackoffPolicy()
+        self.state_path = state_path
+        # Профили экранов (None — из configs/screen_profiles.json при каждой сборке)
+        self.profiles = profiles
+        self.scraper = HeroScraper(
+            headless=headless,
+            debug_dotabuff=debug_dotabuff,
+            snapshot_dir=snapshot_dir,
+            dotabuff_profile=dotabuff_profile,
+            shared_browser=single_browser,
+        )
+        self.data_manager = DataManager()
+        self.manager: Optional[ScrapingManager] = None
+        self.failures = 0
+        self.state = self._load_state()
+
+    def _load_state(self) -> Dict:
+        """Состояние прошлых запусков: отпечатки таблиц и незавершенная доставка"""
+        try:
+            if os.path.exists(self.state_path):
+                with open(self.state_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"Не удалось прочитать состояние демона: {e}")
+        return {"fingerprints": {}, "pending_deploy": False}
+
+    def _save_state(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+            with open(self.state_path, "w", encoding="utf-8") as f:
+                json.dump(self.state, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить состояние демона: {e}")
+
+    def _ensure_browser(self) -> ScrapingManager:
+        """Запускает браузер один раз и переиспользует его между опросами"""
+        if self.manager is None or self.manager.driver is None:
+            # В режиме single_browser — видимый браузер с профилем Dotabuff
+            self.manager = self.scraper._new_manager()
+            self.manager.start_driver()
+        return self.manager
+
+    def _close_browser(self) -> None:
+        if self.manager is not None:
+            self.manager.close_driver()
+        self.manager = None
+
+    def poll_once(self) -> str:
+        """
+        Один цикл: скрапинг, сравнение отпечатков, пересборка и доставка в Steam
+
+        Returns:
+            UNCHANGED, UPDATED или FAILED
+        """
+        with span("daemon.poll"):
+            try:
+                manager = self._ensure_browser()
+                heroes_df, no_facets_df = self.scraper.scrape_both_data_types(
+                    url=self.url, manager=manager
+                )
+            except Exception as e:
+                logger.error(f"Ошибка скрапинга в режиме демона: {e}")
+                self._close_browser()
+                return self.FAILED
+
+            if heroes_df.empty:
+                logger.error("Демон: не удалось собрать данные с фасетами")
+                self._close_browser()
+                return self.FAILED
+
+            # Все таблицы совпали по отпечатку в браузере — сравнивать нечего
+            # (если прошлая пересборка не удалась, таблицы из кэша сравниваются заново)
+            if (
+                not self.scraper.has_changes
+                and not self.state.get("pending_deploy")
+                and not self.state.get("rebuild_pending")
+            ):
+                logger.info("Демон: таблицы в браузере не изменились с прошлого опроса")
+                return self.UNCHANGED
+
+            fingerprints = dataframe_fingerprints(heroes_df, "facets")
+            fingerprints.update(dataframe_fingerprints(no_facets_df, "no_facets"))
+            changed = changed_keys(self.state.get("fingerprints", {}), fingerprints)
+
+            if not changed and not self.state.get("pending_deploy"):
+                logger.info("Демон: мета не изменилась, пересборка не требуется")
+                return self.UNCHANGED
+
+            if changed:
+                logger.info(f"Демон: изменились таблицы {changed}")
+                self.state["rebuild_pending"] = True
+                if not self._rebuild_configs(heroes_df, no_facets_df):
+                    return self.FAILED
+                self.state["rebuild_pending"] = False
+                self.state["fingerprints"] = fingerprints
+                self.state["pending_deploy"] = True
+                self.state["last_rebuild"] = datetime.now().isoformat(timespec="seconds")
+                self._save_state()
+
+            if not self._deploy():
+                return self.FAILED
+            self.state["pending_deploy"] = False
+            self.state["last_deploy"] = datetime.now().isoformat(timespec="seconds")
+            self._save_state()
+            return self.UPDATED
+
+    def _rebuild_configs(self, heroes_df, no_facets_df) -> bool:
+        """Сохраняет CSV и пересобирает конфигурации профилей без копирования в Steam"""
+        from .config_processor import ConfigProcessor
+
+        to_save = heroes_df.drop(columns=["facet_number"], errors="ignore")
+        if not self.data_manager.save_dataframe(to_save, "heroes_data.csv"):
+            return False
+        if not no_facets_df.empty:
+            self.data_manager.save_dataframe(no_facets_df, "heroes_no_facets.csv")
+        return ConfigProcessor().process_all_data(
+            deploy_to_steam=False, profiles=self.profiles
+        )
+
+    def _deploy(self) -> bool:
+        """Копирует конфигурации всех профилей экранов в их директории Steam"""
+        from .config_processor import ConfigProcessor
+
+        return ConfigProcessor().deploy_to_steam(self.profiles)
+
+    def next_delay(self, result: str) -> float:
+        """Пауза до следующего опроса: интервал при успехе, backoff после ошибок"""
+        if result == self.FAILED:
+            self.failures += 1
+            delay = self.backoff.delay(self.failures)
+            logger.warning(
+                f"Демон: ошибка №{self.failures} подряд, повтор через {delay:.0f}с"
+            )
+            return delay
+        self.failures = 0
+        return self.interval
+
+    def run_forever(self, max_polls: Optional[int] = None) -> None:
+        """Цикл опроса до Ctrl+C (или max_polls опросов)"""
+        polls = 0
+        logger.info(f"Демон запущен, интервал опроса {self.interval / 60:.0f} мин")
+        try:
+            while max_polls is None or polls < max_polls:
+                # Отдельный отчет о таймингах на каждый опрос
+                tracer = reset_tracer()
+                result = self.poll_once()
+                tracer.write_report()
+                polls += 1
+                logger.info(f"Демон: результат опроса — {result}")
+                if max_polls is not None and polls >= max_polls:
+                    break
+                time.sleep(self.next_delay(result))
+        except KeyboardInterrupt:
+            logger.info("Демон остановлен пользователем")
+        finally:
+            self._close_browser()
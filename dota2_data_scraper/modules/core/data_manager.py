@@ -3,6 +3,7 @@
 """
 
 import pandas as pd
+import json
 import logging
 from typing import Optional
 import os
@@ -10,6 +11,25 @@ import os
 logger = logging.getLogger(__name__)
 
 
+def _as_text(value: object) -> Optional[str]:
+    """Значение object-колонки в виде строки (словари и списки — JSON), пропуск — None"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    if pd.isna(value):
+        return None
+    return str(value)
+
+
+def _columnar_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Копия с однородными типами: смешанные object-колонки приводятся к строкам"""
+    out = df.copy()
+    for column in out.columns[out.dtypes == object]:
+        out[column] = out[column].map(_as_text)
+    return out
+
+
 class DataManager:
     """Менеджер для работы с данными"""
 
@@ -44,6 +64,49 @@ class DataManager:
             self.logger.error(f"Ошибка при сохранении {filename}: {e}")
             return False
 
+    def save_columnar(self, df: pd.DataFrame, name: str) -> Optional[str]:
+        """
+        Сохранение DataFrame в колоночный формат (Parquet), иначе в CSV
+
+        Основной формат — CSV: pyarrow/fastparquet не входят в requirements.txt.
+        Parquet пишется, только если движок установлен; смешанные object-колонки
+        (например, словари из _clean_data) перед записью приводятся к строкам.
+        Если движка нет или таблицу не удалось преобразовать, данные сохраняются
+        в CSV, чтобы результат не потерялся.
+
+        Args:
+            df: DataFrame для сохранения
+            name: Имя файла без расширения
+
+        Returns:
+            Путь к сохраненному файлу или None при ошибке
+        """
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            filepath = os.path.join(self.output_dir, f"{name}.parquet")
+            try:
+                _columnar_frame(df).to_parquet(filepath, index=False)
+            except ImportError:
+                self.logger.info("Parquet недоступен (нет pyarrow/fastparquet), сохраняем в CSV")
+                filepath = self._save_csv_fallback(df, name)
+            except Exception as e:
+                # ArrowTypeError/ArrowInvalid — подклассы TypeError/ValueError,
+                # но ошибки движков не сводятся к ним, поэтому ловим все
+                self.logger.warning(f"Не удалось записать Parquet ({e}), сохраняем в CSV")
+                if os.path.exists(filepath):
+                    os.remove(filepath)
+                filepath = self._save_csv_fallback(df, name)
+            self.logger.info(f"Данные сохранены в {filepath}")
+            return filepath
+        except Exception as e:
+            self.logger.error(f"Ошибка при сохранении {name}: {e}")
+            return None
+
+    def _save_csv_fallback(self, df: pd.DataFrame, name: str) -> str:
+        filepath = os.path.join(self.output_dir, f"{name}.csv")
+        df.to_csv(filepath, index=False)
+        return filepath
+
     def load_dataframe(self, filename: str) -> Optional[pd.DataFrame]:
         """
         Загрузка DataFrame из CSV файла
@@ -3,7 +3,9 @@
 """
 
 import logging
-from typing import Optional, Dict, Any
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional, Dict, Any, List, Tuple
 from selenium.webdriver import Chrome
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
@@ -19,6 +21,47 @@ import os
 
 from ..utils.period_selector import select_period_8_days
 from ..utils.dialog_handler import handle_dialog_overlay
+from ..utils.tracing import span, instrument_driver
+
+# outerHTML только области таблицы (thead + tbody) вместо всей страницы.
+# null, если tbody со строками grid-cols-14 не найден (старая вёрстка).
+TABLE_HTML_JS = """
+const thead = document.querySelector('div[class*="thead"]');
+const tbody = document.querySelector('div[class*="tbody"]');
+if (!tbody || !tbody.querySelector('div[class*="grid-cols-14"]')) return null;
+return (thead ? thead.outerHTML : '') + tbody.outerHTML;
+"""
+
+# Ограниченный фрагмент разметки: элемент по селектору или вся страница
+HTML_SNIPPET_JS = """
+const el = arguments[0] ? document.querySelector(arguments[0]) : document.documentElement;
+return el ? el.outerHTML.substring(0, arguments[1]) : null;
+"""
+
+
+def fetch_table_html(driver) -> Optional[str]:
+    """
+    HTML области таблицы (thead + tbody) из браузера
+
+    Returns:
+        Строка HTML или None, если таблица новой вёрстки не найдена
+    """
+    try:
+        html = driver.execute_script(TABLE_HTML_JS)
+    except Exception:
+        return None
+    return html if isinstance(html, str) and html else None
+
+
+class _LazySnippet:
+    """Фрагмент страницы для логов: запрашивается у браузера, только если запись выводится"""
+
+    def __init__(self, manager: "ScrapingManager", limit: int):
+        self.manager = manager
+        self.limit = limit
+
+    def __str__(self) -> str:
+        return self.manager.get_html_snippet(limit=self.limit)
 
 
 class ScrapingManager:
@@ -26,17 +69,28 @@ class ScrapingManager:
     Основной класс для управления процессом скрапинга
     """
 
-    def __init__(self, headless: bool = True, minimize_window: bool = False):
+    def __init__(
+        self,
+        headless: bool = True,
+        minimize_window: bool = False,
+        profile_dir: Optional[str] = None,
+    ):
         """
         Инициализация менеджера скрапинга
 
         Args:
             headless: Запускать браузер в headless режиме
             minimize_window: Минимизировать окно браузера (работает только если headless=False)
+            profile_dir: Постоянный профиль Chrome (cookies сохраняются между запусками);
+                None — временный профиль в режиме инкогнито
         """
         self.headless = headless
         self.minimize_window = minimize_window
+        self.profile_dir = profile_dir
         self.driver: Optional[Chrome] = None
+        # Вкладки одного браузера делят сессию WebDriver: команды из разных
+        # потоков идут под этой блокировкой (см. in_tab)
+        self.tab_lock = threading.RLock()
         self.logger = self._setup_logging()
         # Регистрируем аварийное закрытие драйвера на случай внезапного завершения процесса
         try:
@@ -64,9 +118,13 @@ class ScrapingManager:
         import uuid
 
         port = random.randint(9000, 9999)
-        unique_profile = os.path.join(
-            tempfile.gettempdir(), f"chrome_profile_{uuid.uuid4().hex[:8]}"
-        )
+        if self.profile_dir:
+            profile = os.path.abspath(self.profile_dir)
+            os.makedirs(profile, exist_ok=True)
+        else:
+            profile = os.path.join(
+                tempfile.gettempdir(), f"chrome_profile_{uuid.uuid4().hex[:8]}"
+            )
 
         # Базовые опции для стабильной работы
         if self.headless:
@@ -88,8 +146,10 @@ class ScrapingManager:
         chrome_options.add_argument("--disable-features=VizDisplayCompositor")
         chrome_options.add_argument("--no-first-run")
         chrome_options.add_argument("--no-default-browser-check")
-        chrome_options.add_argument("--incognito")
-        chrome_options.add_argument(f"--user-data-dir={unique_profile}")
+        if not self.profile_dir:
+            # В инкогнито cookies не попадают в профиль — постоянному профилю он не нужен
+            chrome_options.add_argument("--incognito")
+        chrome_options.add_argument(f"--user-data-dir={profile}")
 
         # Экспериментальные опции
         chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
@@ -106,10 +166,14 @@ class ScrapingManager:
         try:
             self.logger.info("Запуск Chrome драйвера...")
 
-            chrome_options = self._create_chrome_options()
-            service = Service(ChromeDriverManager().install())
-            self.driver = Chrome(service=service, options=chrome_options)
-            self.driver.implicitly_wait(3)
+            with span("driver.start", headless=self.headless):
+                chrome_options = self._create_chrome_options()
+                service = Service(ChromeDriverManager().install())
+                self.driver = Chrome(service=service, options=chrome_options)
+                instrument_driver(self.driver)
+                # Без implicit wait: пустой find_elements возвращается сразу,
+                # ожидание — только явное (WebDriverWait / element_lookup)
+                self.driver.implicitly_wait(0)
             
             # Дополнительные способы скрытия окна (если не headless)
             if not self.headless and self.minimize_window:
@@ -144,14 +208,16 @@ class ScrapingManager:
         """Переход на страницу"""
         try:
             self.logger.info(f"Переход на страницу: {url}")
-            self.driver.get(url)
-            self.driver.implicitly_wait(10)
+            with span("page.navigate", url=url):
+                self.driver.get(url)
 
             # Обработка диалогового окна
-            handle_dialog_overlay(self.driver)
+            with span("page.dialog"):
+                handle_dialog_overlay(self.driver)
 
             # Выбор периода "8 days"
-            select_period_8_days(self.driver)
+            with span("page.period"):
+                select_period_8_days(self.driver)
 
             self.logger.info("Страница успешно загружена")
         except Exception as e:
@@ -162,8 +228,8 @@ class ScrapingManager:
         """Базовый переход без специфичных действий (для сторонних сайтов)"""
         try:
             self.logger.info(f"Базовый переход на страницу: {url}")
-            self.driver.get(url)
-            self.driver.implicitly_wait(10)
+            with span("page.navigate", url=url):
+                self.driver.get(url)
             self.logger.info("Страница успешно загружена (basic)")
         except Exception as e:
             self.logger.error(f"Ошибка при базовой загрузке страницы: {e}")
@@ -186,19 +252,85 @@ class ScrapingManager:
             time.sleep(2)  # Даем время на загрузку данных
             return True
         except Exception as e:
-            # Сохраняем часть HTML для диагностики
-            try:
-                html_snippet = (self.driver.page_source or "")[:2000]
-            except Exception:
-                html_snippet = "<no page source>"
+            # Фрагмент HTML для диагностики снимается лениво и ограниченного размера
             self.logger.error(
-                f"Ошибка при клике по элементу {xpath}: {e}. Фрагмент страницы: {html_snippet}"
+                "Ошибка при клике по элементу %s: %s. Фрагмент страницы: %s",
+                xpath,
+                e,
+                _LazySnippet(self, 2000),
             )
             return False
 
     def get_page_source(self) -> str:
         """Получение исходного кода страницы"""
-        return self.driver.page_source
+        with span("page.source"):
+            return self.driver.page_source
+
+    def get_table_html(self) -> Optional[str]:
+        """HTML только области таблицы (thead + tbody); None — если таблица не найдена"""
+        with span("page.table_html"):
+            return fetch_table_html(self.driver)
+
+    def get_html_snippet(self, selector: Optional[str] = None, limit: int = 2000) -> str:
+        """
+        Ограниченный фрагмент outerHTML для диагностики: обрезка выполняется в
+        браузере, поэтому по WebDriver передаются не более limit символов
+
+        Args:
+            selector: CSS-селектор элемента (None — вся страница)
+            limit: Максимальная длина фрагмента
+        """
+        try:
+            snippet = self.driver.execute_script(HTML_SNIPPET_JS, selector, limit)
+        except Exception:
+            return "<no page source>"
+        return snippet if isinstance(snippet, str) else "<no page source>"
+
+    @contextmanager
+    def in_tab(self, handle: Optional[str] = None) -> Iterator[str]:
+        """
+        Работа в другой вкладке того же браузера
+
+        Блокировка tab_lock держится весь блок, а по выходу активной снова
+        становится исходная вкладка. Поток, работающий с основной вкладкой,
+        должен держать tab_lock во время своих команд.
+
+        Args:
+            handle: Существующая вкладка; None — новая вкладка, закрываемая по выходу
+
+        Yields:
+            handle вкладки
+        """
+        with self.tab_lock:
+            original = self.driver.current_window_handle
+            created = handle is None
+            if created:
+                self.driver.switch_to.new_window("tab")
+                handle = self.driver.current_window_handle
+            else:
+                self.driver.switch_to.window(handle)
+            try:
+                yield handle
+            finally:
+                try:
+                    if created:
+                        self.driver.close()
+                finally:
+                    self.driver.switch_to.window(original)
+
+    def export_cookies(self) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Cookies текущей сессии браузера и его User-Agent (для HTTP-сессии)
+
+        Returns:
+            (cookies в формате Selenium, User-Agent или None)
+        """
+        cookies = self.driver.get_cookies() or []
+        try:
+            user_agent = self.driver.execute_script("return navigator.userAgent;")
+        except Exception:
+            user_agent = None
+        return cookies, user_agent if isinstance(user_agent, str) else None
 
     def close_driver(self) -> None:
         """Закрытие драйвера"""
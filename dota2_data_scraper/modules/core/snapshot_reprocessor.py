@@ -0,0 +1,100 @@
+"""
+Массовый повторный разбор архивных снимков HTML в пуле процессов
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import pandas as pd
+
+from .data_manager import DataManager
+from ..utils.snapshot_archive import list_snapshots, parse_snapshot_filename, read_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Скрапер создается один раз на процесс пула (только ради логики разбора)
+_worker_scraper = None
+
+
+def _init_worker() -> None:
+    global _worker_scraper
+    from ..scrapers.hero_scraper import HeroScraper
+
+    _worker_scraper = HeroScraper(parse_workers=0)
+
+
+def _reprocess_snapshot(path: str) -> pd.DataFrame:
+    """Разбор одного снимка текущей логикой извлечения (выполняется в процессе пула)"""
+    if _worker_scraper is None:
+        _init_worker()
+    meta = parse_snapshot_filename(path)
+    try:
+        df = _worker_scraper._parse_and_clean(read_snapshot(path))
+    except Exception as e:
+        logger.warning(f"Не удалось разобрать снимок {path}: {e}")
+        return pd.DataFrame()
+    if df.empty:
+        return df
+    if meta["Grouping"] == "no_facets":
+        df["Facet"] = "No Facet"
+    df["Role"] = meta["Role"]
+    df.insert(0, "Grouping", meta["Grouping"])
+    df.insert(0, "Bracket", meta["Bracket"])
+    df.insert(0, "Period", meta["Period"])
+    df.insert(0, "Snapshot", os.path.basename(os.path.dirname(path)))
+    return df
+
+
+def reprocess_snapshots(
+    snapshot_dir: str,
+    output_name: str = "snapshots_reprocessed",
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    data_manager: Optional[DataManager] = None,
+) -> Optional[str]:
+    """
+    Повторно разбирает все снимки из snapshot_dir и пишет результат в колоночное хранилище
+
+    Args:
+        snapshot_dir: Директория со снимками (.html.gz/.html, рекурсивно)
+        output_name: Имя выходного файла без расширения
+        workers: Число процессов (None — по числу ядер)
+        chunksize: Снимков на одну отправку в процесс (None — подбирается автоматически)
+        data_manager: Куда сохранять (по умолчанию DataManager() -> configs/)
+
+    Returns:
+        Путь к сохраненному файлу или None, если снимков нет или ничего не разобрано
+    """
+    paths: List[str] = list_snapshots(snapshot_dir)
+    if not paths:
+        logger.error(f"В {snapshot_dir} не найдено снимков")
+        return None
+
+    workers = workers or os.cpu_count() or 1
+    # Несколько чанков на процесс: меньше накладных расходов на IPC,
+    # но без перекоса, если снимки сильно различаются по размеру
+    chunksize = chunksize or max(1, len(paths) // (workers * 4))
+    logger.info(
+        f"Повторный разбор {len(paths)} снимков: {workers} процессов, чанк {chunksize}"
+    )
+
+    started = time.perf_counter()
+    if workers == 1:
+        frames = [_reprocess_snapshot(p) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            frames = list(pool.map(_reprocess_snapshot, paths, chunksize=chunksize))
+    elapsed = time.perf_counter() - started
+
+    frames = [f for f in frames if not f.empty]
+    logger.info(
+        f"Разобрано {len(frames)}/{len(paths)} снимков за {elapsed:.1f}s "
+        f"({len(paths) / elapsed if elapsed else 0:.1f} снимков/с)"
+    )
+    if not frames:
+        return None
+    result = pd.concat(frames, axis=0, ignore_index=True)
+    return (data_manager or DataManager()).save_columnar(result, output_name)
@@ -5,21 +5,158 @@
 import pandas as pd
 import time
 import logging
-from typing import Dict, List
+import re
+import threading
+import importlib.util
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
 from bs4 import BeautifulSoup
 
-from ..core.scraping_manager import ScrapingManager
+from ..core.scraping_manager import ScrapingManager, fetch_table_html
 from ..utils.facet_api_parser import FacetAPIParser
+from ..utils.tracing import span
+from ..utils.period_selector import select_period, select_bracket
+from ..utils.snapshot_archive import SnapshotArchive
+from ..utils.element_lookup import find_first
+from ..utils.selector_registry import SelectorRegistry, layout_fingerprint
+from .pipeline import ParsePipeline, completed
+from .table_layout import (
+    TBODY_CLASS,
+    THEAD_CLASS,
+    TableExtractor,
+    UnknownTableLayoutError,
+    detect_table_layout,
+)
 
 logger = logging.getLogger(__name__)
 
+# Кандидаты для переключателя группировки фасетов (в порядке приоритета). Без
+# условий на aria-checked: сработавший селектор запоминается и должен находить
+# переключатель в любом состоянии
+FACET_TOGGLE_SELECTORS = [
+    'button[role="switch"]',
+    '[role="switch"]',
+    "button.svelte-9e5jyr",
+    ".svelte-9e5jyr",
+]
+# Сколько ждать появления переключателя и кнопок ролей, секунды
+FACET_TOGGLE_TIMEOUT = 5.0
+ROLE_BUTTON_TIMEOUT = 10.0
+# Минимальная уверенность сопоставления имени фасета с маппингом Dotabuff
+FACET_MATCH_MIN_CONFIDENCE = 0.5
+
+# Открывающий тег div с классом, содержащим thead/tbody, и любые теги div
+_REGION_START = {
+    name: re.compile(r"""<div\b[^>]*?\bclass\s*=\s*["'][^"']*%s""" % name, re.IGNORECASE)
+    for name in ("thead", "tbody")
+}
+_DIV_TAG = re.compile(r"<(/?)div\b[^>]*?(/?)>", re.IGNORECASE)
+
+
+def _html_parser_backend() -> str:
+    """lxml, если установлен (в разы быстрее), иначе встроенный html.parser"""
+    return "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+
+def _div_end(html: str, start: int) -> int:
+    """Позиция сразу после закрывающего тега div, открытого в start (баланс вложенности)"""
+    depth = 0
+    for m in _DIV_TAG.finditer(html, start):
+        if m.group(1):
+            depth -= 1
+        elif not m.group(2):
+            depth += 1
+        if depth == 0:
+            return m.end()
+    return -1
+
+
+def slice_table_region(page_source: str) -> Optional[str]:
+    """
+    Вырезает из страницы только область таблицы (thead + tbody), чтобы не строить
+    дерево всей Svelte-страницы. None — если tbody не найден или разметка не сбалансирована.
+    """
+    bounds = []
+    for name, pattern in _REGION_START.items():
+        m = pattern.search(page_source)
+        if m is None:
+            if name == "tbody":
+                return None
+            continue
+        end = _div_end(page_source, m.start())
+        if end == -1:
+            return None
+        bounds.append((m.start(), end))
+    start = min(b[0] for b in bounds)
+    end = max(b[1] for b in bounds)
+    return page_source[start:end]
+
+
+# Дешевый отпечаток таблицы роли прямо в браузере: число строк + FNV-1a хэш
+# столбцов Hero/Facet/Matches (индексы берутся из thead). Возвращает null,
+# если строки таблицы не найдены.
+TABLE_FINGERPRINT_JS = r"""
+const isRow = el => el.classList.contains('grid') && el.classList.contains('grid-cols-14');
+const thead = document.querySelector('div[class*="thead"]');
+const tbody = document.querySelector('div[class*="tbody"]');
+let rows = tbody ? Array.from(tbody.querySelectorAll('div[class*="grid-cols-14"]')).filter(isRow) : [];
+if (!rows.length) {
+    rows = Array.from(document.querySelectorAll('div[class*="grid-cols-14"][style]')).filter(isRow);
+}
+if (!rows.length) return null;
+const headers = thead ? Array.from(thead.children).filter(c => c.tagName === 'DIV').map(c => {
+    const btn = c.querySelector('button');
+    return (btn || c).textContent.trim();
+}) : [];
+const columns = ['Hero', 'Facet', 'Matches'].map(n => headers.indexOf(n)).filter(i => i >= 0);
+let h = 0x811c9dc5;
+const feed = s => {
+    for (let i = 0; i < s.length; i++) {
+        h ^= s.charCodeAt(i);
+        h = Math.imul(h, 16777619) >>> 0;
+    }
+};
+feed(headers.join('|') + '\n');
+for (const row of rows) {
+    const cells = Array.from(row.children);
+    for (const i of (columns.length ? columns : cells.keys())) {
+        const cell = cells[i];
+        if (!cell) continue;
+        const img = cell.querySelector('img[alt]');
+        feed((img ? img.alt : '') + '|' + cell.textContent.trim() + '\u0001');
+    }
+    feed('\n');
+}
+return {rows: rows.length, hash: (h >>> 0).toString(16)};
+"""
+
 
 class HeroScraper:
     """Скрапер для сбора данных о героях"""
 
-    def __init__(self, headless: bool = True, debug_dotabuff: bool = False):
+    def __init__(
+        self,
+        headless: bool = True,
+        debug_dotabuff: bool = False,
+        parse_workers: int = 2,
+        snapshot_dir: Optional[str] = None,
+        html_parser: Optional[str] = None,
+        selector_registry: Optional[SelectorRegistry] = None,
+        dotabuff_profile: Optional[str] = None,
+        shared_browser: bool = False,
+    ):
         self.headless = headless
+        # Один видимый браузер с постоянным профилем и для dota2protracker, и для
+        # Dotabuff (когда headless блокируется); отдельный браузер не запускается
+        self.shared_browser = shared_browser
+        self.dotabuff_profile = dotabuff_profile
         self.debug_dotabuff = debug_dotabuff
+        # Потоки разбора HTML в scrape_both_data_types (0 — разбор в потоке браузера)
+        self.parse_workers = parse_workers
+        # Бэкенд BeautifulSoup для разбора таблиц (None — lxml, если установлен)
+        self.html_parser = html_parser or _html_parser_backend()
+        # Архив сырого HTML таблиц для повторного разбора (--reprocess-snapshots)
+        self.snapshots = SnapshotArchive(snapshot_dir) if snapshot_dir else None
         self.positions = {
             "Carry (pos 1)": "//button[.//img[@alt='Carry']]",
             "Mid (pos 2)": "//button[.//img[@alt='Mid']]",
@@ -35,7 +172,62 @@ class HeroScraper:
             "Support (pos 4)": "pos 4",
             "Hard Support (pos 5)": "pos 5",
         }
-        self.facet_parser = FacetAPIParser()
+        # Запасные XPath кнопок ролей на случай смены вёрстки (alt иконки роли)
+        self.role_icon_alts = {
+            "Carry (pos 1)": "Carry",
+            "Mid (pos 2)": "Mid",
+            "Offlaner (pos 3)": "Off",
+            "Support (pos 4)": "Pos 4",
+            "Hard Support (pos 5)": "Pos 5",
+        }
+        # Постоянный профиль браузера для Dotabuff (clearance между запусками)
+        self.facet_parser = FacetAPIParser(profile_dir=dotabuff_profile)
+        # Сработавшие селекторы/эвристики по отпечатку вёрстки сайта
+        self.selectors = selector_registry or SelectorRegistry()
+        self._layout: Optional[str] = None
+        # Извлекатель под вёрстку таблицы текущей сессии (см. table_layout)
+        self._table_extractor: Optional[TableExtractor] = None
+        # Определение вёрстки идет в рабочих потоках конвейера — по одному за раз
+        self._extractor_lock = threading.Lock()
+        # Инкрементальный скрапинг: отпечатки и разобранные таблицы по ключу
+        # "<grouping>:<role>" живут между вызовами в рамках одного экземпляра
+        self._table_fingerprints: Dict[str, str] = {}
+        self._table_cache: Dict[str, pd.DataFrame] = {}
+        self._resolved_facets: Optional[pd.DataFrame] = None
+        # Изменилась ли таблица в последнем скрапинге (False — взята из кэша)
+        self.table_changes: Dict[str, bool] = {}
+        # Маппинг фасетов, запрошенный заранее в фоне (см. _prefetch_facet_mapping)
+        self._mapping_future: Optional[Future] = None
+        # Браузер текущего скрапинга: в нем же открывается вкладка Dotabuff
+        self._active_manager: Optional[ScrapingManager] = None
+
+    def _new_manager(self) -> ScrapingManager:
+        """Браузер для скрапинга (в режиме shared_browser — видимый, с профилем Dotabuff)"""
+        if self.shared_browser:
+            return ScrapingManager(
+                headless=False, minimize_window=True, profile_dir=self.dotabuff_profile
+            )
+        return ScrapingManager(headless=self.headless)
+
+    def _navigate(self, manager: ScrapingManager, url: str) -> None:
+        """Переход на страницу и определение вёрстки (один раз на загрузку)"""
+        manager.navigate_to_page(url)
+        self._active_manager = manager
+        self._layout = layout_fingerprint(manager.driver)
+        self._table_extractor = None
+        logger.debug(f"Отпечаток вёрстки: {self._layout}")
+
+    def _begin_scrape(self) -> None:
+        """Сброс состояния перед очередным скрапингом"""
+        self.table_changes = {}
+        self._active_manager = None
+        if self.snapshots is not None:
+            self.snapshots.start_run()
+
+    @property
+    def has_changes(self) -> bool:
+        """Была ли изменена хотя бы одна таблица в последнем скрапинге"""
+        return not self.table_changes or any(self.table_changes.values())
 
     def scrape_heroes_data(
         self, url: str = "https://dota2protracker.com/meta", show_progress: bool = False
@@ -51,9 +243,10 @@ class HeroScraper:
             DataFrame с данными о героях
         """
         logger.info("Начало сбора данных о героях...")
+        self._begin_scrape()
 
-        with ScrapingManager(headless=self.headless) as manager:
-            manager.navigate_to_page(url)
+        with self._new_manager() as manager:
+            self._navigate(manager, url)
 
             dfs = []
 
@@ -64,11 +257,8 @@ class HeroScraper:
                     print(f"   Позиция {i}/5: {position}")
                 logger.info(f"Сбор данных для {position}")
 
-                # Кликаем по позиции
-                if manager.click_element_safely(xpath):
-                    # Получаем данные таблицы
-                    df = self._extract_table_data(manager.driver)
-                    df["Role"] = self.role_mapping[position]
+                df = self._collect_role_table(manager, position, xpath, "facets")
+                if df is not None:
                     dfs.append(df)
                 else:
                     logger.error(f"Не удалось кликнуть по позиции {position}")
@@ -98,54 +288,25 @@ class HeroScraper:
             DataFrame с данными о героях без фасетов
         """
         logger.info("Начало сбора данных о героях без фасетов...")
+        self._begin_scrape()
 
-        with ScrapingManager(headless=self.headless) as manager:
-            manager.navigate_to_page(url)
+        with self._new_manager() as manager:
+            self._navigate(manager, url)
 
             # Сначала собираем данные с фасетами
             dfs_with_facets = []
             for position, xpath in self.positions.items():
                 logger.info(f"Сбор данных с фасетами для {position}")
 
-                if manager.click_element_safely(xpath):
-                    df = self._extract_table_data(manager.driver)
-                    df["Role"] = self.role_mapping[position]
+                df = self._collect_role_table(manager, position, xpath, "facets")
+                if df is not None:
                     dfs_with_facets.append(df)
 
             # После pos 5 включаем группировку фасетов
             logger.info("Переключение на группировку фасетов...")
 
             # Ищем кнопку переключения группировки фасетов
-            # Попробуем разные селекторы
-            possible_selectors = [
-                'button[role="switch"][aria-checked="false"]',
-                'button[role="switch"]',
-                '[role="switch"]',
-                "button.svelte-9e5jyr",
-                ".svelte-9e5jyr",
-            ]
-
-            facet_toggle = None
-            for selector in possible_selectors:
-                try:
-                    elements = manager.driver.find_elements("css selector", selector)
-                    logger.info(
-                        f"Найдено {len(elements)} элементов с селектором: {selector}"
-                    )
-
-                    for element in elements:
-                        # Проверяем, что это кнопка переключения фасетов
-                        if element.get_attribute("role") == "switch":
-                            facet_toggle = element
-                            logger.info(f"✅ Найдена кнопка переключения: {selector}")
-                            break
-
-                    if facet_toggle:
-                        break
-
-                except Exception as e:
-                    logger.debug(f"Селектор {selector} не сработал: {e}")
-                    continue
+            facet_toggle = self._find_facet_toggle(manager)
 
             if facet_toggle:
                 try:
@@ -177,10 +338,8 @@ class HeroScraper:
             for position, xpath in self.positions.items():
                 logger.info(f"Сбор данных без фасетов для {position}")
 
-                if manager.click_element_safely(xpath):
-                    df = self._extract_table_data(manager.driver)
-                    df["Role"] = self.role_mapping[position]
-                    df["Facet"] = "No Facet"  # Указываем что это данные без фасетов
+                df = self._collect_role_table(manager, position, xpath, "no_facets")
+                if df is not None:
                     dfs_no_facets.append(df)
 
             if dfs_no_facets:
@@ -192,7 +351,10 @@ class HeroScraper:
                 return pd.DataFrame()
 
     def scrape_both_data_types(
-        self, url: str = "https://dota2protracker.com/meta", show_progress: bool = False
+        self,
+        url: str = "https://dota2protracker.com/meta",
+        show_progress: bool = False,
+        manager: Optional[ScrapingManager] = None,
     ) -> tuple[pd.DataFrame, pd.DataFrame]:
         """
         Эффективный сбор обоих типов данных за один проход браузера
@@ -200,79 +362,74 @@ class HeroScraper:
         Args:
             url: URL страницы с данными
             show_progress: Показывать прогресс парсинга позиций
+            manager: Уже запущенный ScrapingManager (режим демона держит браузер
+                "теплым"); если None — браузер запускается и закрывается здесь
 
         Returns:
             tuple: (DataFrame с фасетами, DataFrame без фасетов)
         """
         logger.info("Начало эффективного сбора данных (оба типа)...")
+        # Dotabuff запрашивается параллельно со сбором таблиц dota2protracker
+        self._prefetch_facet_mapping()
 
-        with ScrapingManager(headless=self.headless) as manager:
-            manager.navigate_to_page(url)
+        if manager is not None:
+            return self._scrape_both_with_manager(manager, url, show_progress)
+        with self._new_manager() as manager:
+            return self._scrape_both_with_manager(manager, url, show_progress)
+
+    def _scrape_both_with_manager(
+        self, manager: ScrapingManager, url: str, show_progress: bool
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Тело scrape_both_data_types для уже запущенного браузера"""
+        if self.parse_workers <= 0:
+            return self._scrape_both_pipelined(manager, url, show_progress, None)
+        # Поток браузера только кликает и снимает HTML, разбор идет параллельно
+        with ParsePipeline(workers=self.parse_workers) as pipeline:
+            return self._scrape_both_pipelined(manager, url, show_progress, pipeline)
+
+    def _scrape_both_pipelined(
+        self,
+        manager: ScrapingManager,
+        url: str,
+        show_progress: bool,
+        pipeline: Optional[ParsePipeline],
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Сбор обоих типов данных; разбор таблиц уходит в pipeline (если задан)"""
+        self._begin_scrape()
+        # Пока браузер собирает таблицы dota2protracker, вкладки не открываются:
+        # команды WebDriver одной сессии все равно выполняются по очереди
+        with manager.tab_lock:
+            self._navigate(manager, url)
 
             # Сначала собираем данные с фасетами
             logger.info("Сбор данных с фасетами...")
-            dfs_with_facets = []
+            facet_futures: List[Future] = []
 
             positions_list = list(self.positions.items())
             for i, (position, xpath) in enumerate(positions_list, 1):
                 if show_progress:
                     print(f"   Позиция {i}/5: {position}")
                 logger.info(f"Сбор данных с фасетами для {position}")
-                start_click = time.time()
 
-                if manager.click_element_safely(xpath):
-                    logger.debug(f"Клик по {position} занял {time.time() - start_click:.2f}s")
-                    df = self._extract_table_data(manager.driver)
-                    logger.debug(f"Извлечено строк: {len(df)} для {position}")
-                    df["Role"] = self.role_mapping[position]
-                    dfs_with_facets.append(df)
+                future = self._submit_role_table(
+                    manager, position, xpath, "facets", pipeline=pipeline
+                )
+                if future is not None:
+                    facet_futures.append(future)
                 else:
                     logger.error(f"Не удалось кликнуть по позиции {position}")
 
-            # Обрабатываем данные с фасетами
-            df_with_facets = pd.DataFrame()
-            if dfs_with_facets:
-                df_with_facets = pd.concat(dfs_with_facets, axis=0, ignore_index=True)
-                df_with_facets = self._ensure_facet_names_and_numbers(df_with_facets)
-
-                logger.info("Сбор данных с фасетами завершен")
-            else:
+            if not facet_futures:
                 logger.error("Не удалось собрать данные с фасетами")
 
             # Теперь переключаемся на группировку фасетов и собираем данные без фасетов
             logger.info("Переключение на группировку фасетов...")
 
             # Ищем кнопку переключения группировки фасетов
-            possible_selectors = [
-                'button[role="switch"][aria-checked="false"]',
-                'button[role="switch"]',
-                '[role="switch"]',
-                "button.svelte-9e5jyr",
-                ".svelte-9e5jyr",
-            ]
-
-            facet_toggle = None
-            for selector in possible_selectors:
-                try:
-                    elements = manager.driver.find_elements("css selector", selector)
-                    logger.info(
-                        f"Найдено {len(elements)} элементов с селектором: {selector}"
-                    )
-
-                    for element in elements:
-                        if element.get_attribute("role") == "switch":
-                            facet_toggle = element
-                            logger.info(f"✅ Найдена кнопка переключения: {selector}")
-                            break
-
-                    if facet_toggle:
-                        break
-
-                except Exception as e:
-                    logger.debug(f"Селектор {selector} не сработал: {e}")
-                    continue
+            facet_toggle = self._find_facet_toggle(manager)
 
             df_no_facets = pd.DataFrame()
+            no_facet_futures: List[Future] = []
             if facet_toggle:
                 try:
                     # Проверяем текущее состояние
@@ -296,39 +453,441 @@ class HeroScraper:
                     logger.info("Сбор данных без фасетов...")
                     if show_progress:
                         print("   Переключились на группировку фасетов")
-                    dfs_no_facets = []
-
                     for i, (position, xpath) in enumerate(positions_list, 1):
                         if show_progress:
                             print(f"   Позиция {i}/5: {position} (без фасетов)")
                         logger.info(f"Сбор данных без фасетов для {position}")
-                        start_click2 = time.time()
-
-                        if manager.click_element_safely(xpath):
-                            logger.debug(f"Клик по {position} (no facets) занял {time.time() - start_click2:.2f}s")
-                            df = self._extract_table_data(manager.driver)
-                            logger.debug(f"Извлечено строк (no facets): {len(df)} для {position}")
-                            df["Role"] = self.role_mapping[position]
-                            df["Facet"] = (
-                                "No Facet"  # Указываем что это данные без фасетов
-                            )
-                            dfs_no_facets.append(df)
-
-                    if dfs_no_facets:
-                        df_no_facets = pd.concat(
-                            dfs_no_facets, axis=0, ignore_index=True
+
+                        future = self._submit_role_table(
+                            manager, position, xpath, "no_facets", pipeline=pipeline
                         )
-                        logger.info("Сбор данных без фасетов завершен")
-                    else:
-                        logger.error("Не удалось собрать данные без фасетов")
+                        if future is not None:
+                            no_facet_futures.append(future)
 
                 except Exception as e:
                     logger.warning(f"Ошибка при переключении группировки фасетов: {e}")
             else:
                 logger.warning("Не удалось найти кнопку группировки фасетов")
 
-            logger.info("Эффективный сбор данных завершен")
-            return df_with_facets, df_no_facets
+        # Фасеты разрешаются в потоке браузера после снятия tab_lock: если маппинга
+        # нет, Dotabuff открывается во вкладке этого же браузера. Рабочим потокам
+        # конвейера tab_lock брать нельзя — поток браузера ждет их в submit()
+        df_with_facets = (
+            self._combine_facet_tables(facet_futures) if facet_futures else pd.DataFrame()
+        )
+        if not df_with_facets.empty:
+            logger.info("Сбор данных с фасетами завершен")
+        if no_facet_futures:
+            try:
+                df_no_facets = pd.concat(
+                    [f.result() for f in no_facet_futures], axis=0, ignore_index=True
+                )
+                logger.info("Сбор данных без фасетов завершен")
+            except Exception as e:
+                logger.warning(f"Ошибка при разборе таблиц без фасетов: {e}")
+        elif facet_toggle:
+            logger.error("Не удалось собрать данные без фасетов")
+
+        logger.info("Эффективный сбор данных завершен")
+        return df_with_facets, df_no_facets
+
+    def _combine_facet_tables(self, futures: List[Future]) -> pd.DataFrame:
+        """Склеивает таблицы с фасетами и разрешает имена/номера фасетов"""
+        dfs = [f.result() for f in futures]
+        facet_keys = [
+            f"facets:{self.role_mapping[position]}" for position in self.positions
+        ]
+        facets_unchanged = self._resolved_facets is not None and not any(
+            self.table_changes.get(key, True) for key in facet_keys
+        )
+        if facets_unchanged:
+            # Ни одна таблица с фасетами не изменилась — разрешение фасетов не нужно
+            logger.info("Таблицы с фасетами не изменились, используем прошлый результат")
+            # Фоновый запрос маппинга не понадобился — следующий цикл запустит новый
+            self._mapping_future = None
+            return self._resolved_facets.copy()
+        df_with_facets = pd.concat(dfs, axis=0, ignore_index=True)
+        df_with_facets = self._ensure_facet_names_and_numbers(df_with_facets)
+        self._resolved_facets = df_with_facets.copy()
+        return df_with_facets
+
+    def scrape_matrix(
+        self,
+        periods: List[int],
+        brackets: Optional[List[str]] = None,
+        url: str = "https://dota2protracker.com/meta",
+        show_progress: bool = False,
+        manager: Optional[ScrapingManager] = None,
+    ) -> pd.DataFrame:
+        """
+        Сбор таблиц для всех комбинаций периодов и рангов за одну сессию браузера
+
+        Страница открывается один раз, дальше меняются только селекторы. Обход
+        идет "змейкой": соседние комбинации отличаются одним селектором, а
+        группировка фасетов переключается один раз на комбинацию.
+
+        Args:
+            periods: Периоды в днях (value опций селектора периода, например [8, 30])
+            brackets: Фильтры по рангу (value или текст опции); None — текущий ранг
+            url: URL страницы с данными
+            show_progress: Показывать прогресс по комбинациям
+            manager: Уже запущенный ScrapingManager; если None — запускается здесь
+
+        Returns:
+            Длинный DataFrame с колонками Period, Bracket, Role, Grouping и данными таблиц
+        """
+        logger.info("Начало сбора матрицы периодов и рангов...")
+        if manager is not None:
+            return self._scrape_matrix_with_manager(
+                manager, periods, brackets, url, show_progress
+            )
+        with self._new_manager() as manager:
+            return self._scrape_matrix_with_manager(
+                manager, periods, brackets, url, show_progress
+            )
+
+    def _matrix_schedule(
+        self, periods: List[int], brackets: List[Optional[str]]
+    ) -> List[tuple]:
+        """Порядок обхода комбинаций (ранг, период) змейкой по периодам"""
+        schedule = []
+        for i, bracket in enumerate(brackets):
+            ordered = periods if i % 2 == 0 else list(reversed(periods))
+            schedule.extend((bracket, period) for period in ordered)
+        return schedule
+
+    def _scrape_matrix_with_manager(
+        self,
+        manager: ScrapingManager,
+        periods: List[int],
+        brackets: Optional[List[str]],
+        url: str,
+        show_progress: bool,
+    ) -> pd.DataFrame:
+        """Тело scrape_matrix для уже запущенного браузера"""
+        self._begin_scrape()
+        self._navigate(manager, url)
+
+        schedule = self._matrix_schedule(list(periods), list(brackets or [None]))
+        frames: List[pd.DataFrame] = []
+        # Начинаем с того состояния группировки, в котором страница открылась
+        grouping_order = ["facets", "no_facets"]
+        if self._facet_grouping_enabled(manager):
+            grouping_order.reverse()
+
+        for n, (bracket, period) in enumerate(schedule, 1):
+            if show_progress:
+                print(f"   Комбинация {n}/{len(schedule)}: {period} days, ранг {bracket or '-'}")
+            with span("matrix.select", period=period, bracket=bracket):
+                if bracket is not None and not select_bracket(manager.driver, bracket):
+                    logger.error(f"Не удалось выбрать ранг {bracket}, комбинация пропущена")
+                    continue
+                if not select_period(manager.driver, period):
+                    logger.error(f"Не удалось выбрать период {period}, комбинация пропущена")
+                    continue
+
+            slice_key = f"{period}:{bracket or ''}:"
+            for grouping in grouping_order:
+                if not self._set_facet_grouping(manager, grouping == "no_facets"):
+                    logger.warning(f"Не удалось переключить группировку ({grouping})")
+                    continue
+                dfs = []
+                for position, xpath in self.positions.items():
+                    df = self._collect_role_table(
+                        manager, position, xpath, grouping, slice_key=slice_key
+                    )
+                    if df is not None:
+                        dfs.append(df)
+                if not dfs:
+                    continue
+                part = pd.concat(dfs, axis=0, ignore_index=True)
+                if grouping == "facets":
+                    # Порядковые номера фасетов считаются внутри (Hero, Role) одного среза
+                    part = self._ensure_facet_names_and_numbers(part)
+                part.insert(0, "Grouping", grouping)
+                part.insert(0, "Bracket", bracket)
+                part.insert(0, "Period", period)
+                frames.append(part)
+            # Следующая комбинация начинается с текущей группировки
+            grouping_order.reverse()
+
+        if not frames:
+            logger.error("Не удалось собрать ни одной комбинации матрицы")
+            return pd.DataFrame()
+        logger.info(f"Сбор матрицы завершен: {len(schedule)} комбинаций")
+        return pd.concat(frames, axis=0, ignore_index=True)
+
+    def _find_facet_toggle(self, manager: ScrapingManager):
+        """
+        Кнопка-переключатель группировки фасетов (role="switch") или None.
+        Все селекторы проверяются одним JS-вызовом с коротким явным ожиданием.
+        """
+        learned = self.selectors.get(self._layout, "facet_toggle")
+        if learned is not None:
+            found = find_first(
+                manager.driver,
+                [learned],
+                timeout=FACET_TOGGLE_TIMEOUT,
+                attribute=("role", "switch"),
+            )
+            if found is not None:
+                return found[1]
+            self.selectors.forget(self._layout, "facet_toggle")
+
+        found = find_first(
+            manager.driver,
+            FACET_TOGGLE_SELECTORS,
+            timeout=FACET_TOGGLE_TIMEOUT,
+            attribute=("role", "switch"),
+        )
+        if found is None:
+            return None
+        selector, element = found
+        logger.info(f"✅ Найдена кнопка переключения: {selector}")
+        self.selectors.record(self._layout, "facet_toggle", selector)
+        return element
+
+    def _role_xpath_candidates(self, position: str, default_xpath: str) -> List[str]:
+        """XPath кнопки роли: основной и запасные варианты"""
+        alt = self.role_icon_alts.get(position)
+        candidates = [default_xpath]
+        if alt:
+            candidates += [
+                f"//*[@role='button' or @role='tab'][.//img[@alt='{alt}']]",
+                f"//button[.//*[@title='{alt}']]",
+                f"//button[normalize-space()='{alt}']",
+            ]
+        return candidates
+
+    def _click_role(self, manager: ScrapingManager, position: str, default_xpath: str) -> bool:
+        """
+        Клик по кнопке роли. Для известной вёрстки сразу используется
+        запомненный XPath; перебор кандидатов — только если он не сработал.
+        """
+        element = f"role:{position}"
+        learned = self.selectors.get(self._layout, element)
+        if learned is not None:
+            if manager.click_element_safely(learned):
+                return True
+            self.selectors.forget(self._layout, element)
+        elif self._layout is None:
+            # Вёрстку определить не удалось — запоминать нечего
+            return manager.click_element_safely(default_xpath)
+
+        found = find_first(
+            manager.driver,
+            self._role_xpath_candidates(position, default_xpath),
+            timeout=ROLE_BUTTON_TIMEOUT,
+            xpath=True,
+        )
+        if found is None:
+            logger.error(f"Кнопка роли {position} не найдена ни по одному XPath")
+            return False
+        xpath = found[0]
+        if not manager.click_element_safely(xpath):
+            return False
+        self.selectors.record(self._layout, element, xpath)
+        return True
+
+    def _facet_grouping_enabled(self, manager: ScrapingManager) -> bool:
+        """Включена ли сейчас группировка фасетов"""
+        toggle = self._find_facet_toggle(manager)
+        return toggle is not None and toggle.get_attribute("aria-checked") == "true"
+
+    def _set_facet_grouping(self, manager: ScrapingManager, enabled: bool) -> bool:
+        """Приводит группировку фасетов к нужному состоянию, кликая только при необходимости"""
+        toggle = self._find_facet_toggle(manager)
+        if toggle is None:
+            return not enabled  # Без переключателя доступны только таблицы с фасетами
+        try:
+            if (toggle.get_attribute("aria-checked") == "true") != enabled:
+                with span("facets.toggle", enabled=enabled):
+                    manager.driver.execute_script("arguments[0].click();", toggle)
+                    time.sleep(3)  # Ждем обновления данных
+            return True
+        except Exception as e:
+            logger.warning(f"Ошибка при переключении группировки фасетов: {e}")
+            return False
+
+    def _collect_role_table(
+        self,
+        manager: ScrapingManager,
+        position: str,
+        xpath: str,
+        grouping: str,
+        slice_key: str = "",
+    ) -> Optional[pd.DataFrame]:
+        """
+        Клик по роли и получение ее таблицы. Если отпечаток таблицы в браузере
+        совпал с прошлым, переиспользуется ранее разобранный DataFrame.
+
+        Args:
+            manager: Запущенный ScrapingManager
+            position: Название позиции (ключ self.positions)
+            xpath: XPath кнопки роли
+            grouping: "facets" или "no_facets"
+            slice_key: Префикс ключа кэша для срезов матрицы (период/ранг)
+
+        Returns:
+            DataFrame таблицы роли или None, если клик не удался
+        """
+        future = self._submit_role_table(
+            manager, position, xpath, grouping, slice_key=slice_key
+        )
+        return future.result() if future is not None else None
+
+    def _submit_role_table(
+        self,
+        manager: ScrapingManager,
+        position: str,
+        xpath: str,
+        grouping: str,
+        slice_key: str = "",
+        pipeline: Optional[ParsePipeline] = None,
+    ) -> Optional[Future]:
+        """
+        То же, что _collect_role_table, но разбор HTML уходит в pipeline:
+        в потоке браузера остаются только клик, отпечаток и снятие HTML.
+
+        Returns:
+            Future с DataFrame таблицы роли или None, если клик не удался
+        """
+        role = self.role_mapping[position]
+        with span("role.click", role=role, grouping=grouping) as click_span:
+            clicked = self._click_role(manager, position, xpath)
+        if not clicked:
+            return None
+        logger.debug(f"Клик по {position} ({grouping}) занял {click_span.duration:.2f}s")
+
+        key = f"{slice_key}{grouping}:{role}"
+        fingerprint = self._table_fingerprint(manager.driver)
+        cached = self._table_cache.get(key)
+        if (
+            fingerprint is not None
+            and cached is not None
+            and self._table_fingerprints.get(key) == fingerprint
+        ):
+            logger.info(f"Таблица {key} не изменилась, используем разобранную ранее")
+            self.table_changes[key] = False
+            return completed(cached.copy())
+
+        self.table_changes[key] = True
+        if pipeline is None:
+            try:
+                df = self._extract_table_data(manager.driver, snapshot_key=key)
+            except UnknownTableLayoutError as e:
+                df = self._unrecognized_table(role, grouping, e)
+            future = completed(self._finish_role_table(df, role, grouping))
+        else:
+            page_source = self._capture_table_html(manager.driver)
+            future = pipeline.submit(
+                self._process_role_table, page_source, role, grouping, snapshot_key=key
+            )
+        if fingerprint is not None:
+            future.add_done_callback(
+                lambda f: self._remember_table(key, fingerprint, f)
+            )
+        return future
+
+    def _remember_table(self, key: str, fingerprint: str, future: Future) -> None:
+        """Сохраняет разобранную таблицу и ее отпечаток для повторного использования"""
+        if future.cancelled() or future.exception() is not None or future.result().empty:
+            return
+        self._table_fingerprints[key] = fingerprint
+        self._table_cache[key] = future.result().copy()
+
+    def _process_role_table(
+        self,
+        page_source: str,
+        role: str,
+        grouping: str,
+        snapshot_key: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Разбор снятого HTML в таблицу роли (выполняется в рабочем потоке).
+        Нераспознанная таблица одной роли (например, еще не отрисованная) дает
+        пустой DataFrame, а не обрывает весь скрапинг.
+        """
+        if snapshot_key and self.snapshots is not None:
+            self.snapshots.save(snapshot_key, page_source)
+        try:
+            df = self._parse_and_clean(page_source)
+        except UnknownTableLayoutError as e:
+            df = self._unrecognized_table(role, grouping, e)
+        logger.debug(f"Извлечено строк: {len(df)} для {role} ({grouping})")
+        return self._finish_role_table(df, role, grouping)
+
+    def _unrecognized_table(
+        self, role: str, grouping: str, error: UnknownTableLayoutError
+    ) -> pd.DataFrame:
+        """Пустая таблица роли вместо нераспознанной (остальные роли собираются)"""
+        logger.warning(f"Таблица {role} ({grouping}) не распознана, пропускаем: {error}")
+        return pd.DataFrame()
+
+    def _finish_role_table(self, df: pd.DataFrame, role: str, grouping: str) -> pd.DataFrame:
+        df["Role"] = role
+        if grouping == "no_facets":
+            df["Facet"] = "No Facet"  # Указываем что это данные без фасетов
+        return df
+
+    def _table_fingerprint(self, driver) -> Optional[str]:
+        """Отпечаток текущей таблицы, посчитанный в браузере (None — не удалось)"""
+        with span("table.fingerprint"):
+            try:
+                result = driver.execute_script(TABLE_FINGERPRINT_JS)
+            except Exception as e:
+                logger.debug(f"Не удалось посчитать отпечаток таблицы: {e}")
+                return None
+        if not isinstance(result, dict) or "hash" not in result:
+            return None
+        return f"{result.get('rows')}:{result['hash']}"
+
+    def _prefetch_facet_mapping(self) -> None:
+        """Запускает получение маппинга фасетов в фоновом потоке (результат ждет _facet_mapping)"""
+        if self._mapping_future is not None and not self._mapping_future.done():
+            return
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="facet-prefetch")
+        self._mapping_future = executor.submit(self._fetch_facet_mapping)
+        # Поток завершится сам после задачи — ждать его не нужно
+        executor.shutdown(wait=False)
+
+    def _fetch_facet_mapping(self) -> Dict[str, Dict[str, int]]:
+        with span("facets.prefetch"):
+            # Только HTTP: если он не сработал, Dotabuff открывается во вкладке
+            # браузера скрапинга (см. _facet_mapping), а не в отдельном браузере
+            return self.facet_parser.fetch_live_mapping(allow_browser=False)
+
+    def _facet_mapping(self) -> Dict[str, Dict[str, int]]:
+        """
+        Маппинг фасетов: дожидается фонового запроса к Dotabuff по HTTP, если он
+        был запущен. Если HTTP не сработал, Dotabuff открывается во второй вкладке
+        браузера текущего скрапинга; снимок берется, только если не удалось и это.
+        """
+        manager = self._active_manager
+        if manager is not None and getattr(manager, "driver", None) is None:
+            manager = None
+        allow_browser = not self.shared_browser
+        future, self._mapping_future = self._mapping_future, None
+        if future is not None:
+            with span("facets.await"):
+                try:
+                    return future.result()
+                except Exception as e:
+                    logger.warning(f"Фоновое получение маппинга фасетов не удалось: {e}")
+            if manager is not None:
+                logger.info("Получение фасетов во вкладке текущего браузера...")
+                try:
+                    return self.facet_parser.fetch_live_mapping(manager=manager, http=False)
+                except Exception as e:
+                    logger.warning(f"Фасеты во вкладке браузера не получены: {e}")
+                # Dotabuff уже недоступен и по HTTP, и в браузере — остается снимок
+                manager, allow_browser = None, False
+        # Общий кеш (уже полученный в этом запуске), снимок или Dotabuff
+        return self.facet_parser.get_hero_facets_mapping(
+            debug_dotabuff=self.debug_dotabuff,
+            manager=manager,
+            allow_browser=allow_browser,
+        )
 
     def _ensure_facet_names_and_numbers(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -336,12 +895,15 @@ class HeroScraper:
         пытаемся восстановить его по порядковому номеру и маппингу. Также
         вычисляем корректный 'facet_number' на основе имени, если возможно.
         """
+        with span("facets.resolve", rows=len(df)):
+            return self._resolve_facet_names_and_numbers(df)
+
+    def _resolve_facet_names_and_numbers(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Тело _ensure_facet_names_and_numbers (под спаном facets.resolve)"""
         logger.info("Обеспечение корректных имен и номеров фасетов...")
 
         # Получаем маппинг: hero_name -> {facet_name: order}
-        mapping = self.facet_parser.get_hero_facets_mapping(
-            debug_dotabuff=self.debug_dotabuff, manager=None
-        )
+        mapping = self._facet_mapping()
         logger.info(f"Получен маппинг фасетов для {len(mapping)} героев")
 
         facet_names: list[str] = []
@@ -410,17 +972,20 @@ class HeroScraper:
                     else:
                         name = f"Facet {fallback_order}"
 
-            # 3) Вычисляем номер фасета по имени, если это возможно
+            # 3) Вычисляем номер фасета по имени через индекс имен (точное,
+            #    нормализованное, алиас, "Facet N", нечеткое совпадение)
             number: int | None = None
             if isinstance(hero_name, str) and isinstance(name, str):
-                name_to_order = mapping.get(hero_name, {})
-                number = name_to_order.get(name)
-                # Если не нашли в общей карте — пробуем получить маппинг только для этого героя
-                if number is None:
-                    name_to_order = self.facet_parser.get_name_to_order_for_hero(
-                        hero_name
-                    )
-                    number = name_to_order.get(name)
+                match = self.facet_parser.match_facet(
+                    hero_name, name, min_confidence=FACET_MATCH_MIN_CONFIDENCE
+                )
+                if match is not None:
+                    number = match.number
+                    if match.tier not in ("exact", "ordinal"):
+                        logger.debug(
+                            f"Фасет '{name}' ({hero_name}) сопоставлен с '{match.name}': "
+                            f"{match.tier}, уверенность {match.confidence}"
+                        )
 
             # 4) Фолбек: если номер не найден, используем ранее вычисленный fallback_order
             if number is None:
@@ -449,179 +1014,99 @@ class HeroScraper:
         logger.info(f"Добавлены имена и номера фасетов для {len(df)} записей")
         return df
 
-    def _extract_table_data(self, driver) -> pd.DataFrame:
+    def _extract_table_data(self, driver, snapshot_key: Optional[str] = None) -> pd.DataFrame:
         """
         Извлечение данных из таблицы (поддержка новой вёрстки dota2protracker: thead/tbody, grid-cols-14).
         """
-        time.sleep(0.2)
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, "html.parser")
+        page_source = self._capture_table_html(driver)
+        if snapshot_key and self.snapshots is not None:
+            self.snapshots.save(snapshot_key, page_source)
+        return self._parse_and_clean(page_source)
 
-        def has_grid_row(cls):
-            if not cls:
-                return False
-            if isinstance(cls, str):
-                return "grid" in cls and "grid-cols-14" in cls
-            return "grid" in cls and "grid-cols-14" in cls
-
-        thead = soup.find("div", class_=lambda c: c and "thead" in c)
-        tbody = soup.find("div", class_=lambda c: c and "tbody" in c)
-        if not tbody:
-            table_rows = soup.find_all("div", class_=has_grid_row, style=True)
-        else:
-            table_rows = list(tbody.find_all("div", class_=has_grid_row))
-
-        if not table_rows:
-            table_rows = soup.find_all("div", class_=has_grid_row, style=True)
-
-        legacy_rows = False
-        if not table_rows:
-            table_rows = soup.find_all("div", class_="grid", style=True)
-            legacy_rows = bool(table_rows)
-
-        data = []
-        headers = []
-        facet_col_index = -1
-        hero_col_index = -1
-        facet_column_in_dom = False
-
-        if thead:
-            header_cols = thead.find_all("div", recursive=False)
-            for col in header_cols:
-                btn = col.find("button")
-                header_text = (btn.get_text(strip=True) if btn else col.get_text(strip=True)) or None
-                headers.append(header_text)
-            facet_column_in_dom = "Facet" in headers
-            try:
-                hero_col_index = headers.index("Hero")
-            except ValueError:
-                hero_col_index = -1
-            if hero_col_index != -1 and not facet_column_in_dom:
-                headers.insert(hero_col_index + 1, "Facet")
-                facet_col_index = hero_col_index + 1
-            else:
-                try:
-                    facet_col_index = headers.index("Facet")
-                except ValueError:
-                    facet_col_index = -1
-            start_row = 0
-        else:
-            start_row = 0
-            if table_rows:
-                first_row = table_rows[0]
-                header_cols = first_row.find_all("div", recursive=False)
-                for col in header_cols:
-                    headers.append(col.get_text(strip=True) or None)
-                facet_column_in_dom = "Facet" in headers
-                try:
-                    hero_col_index = headers.index("Hero")
-                except ValueError:
-                    hero_col_index = -1
-                if hero_col_index != -1 and not facet_column_in_dom:
-                    headers.insert(hero_col_index + 1, "Facet")
-                    facet_col_index = hero_col_index + 1
-                else:
-                    try:
-                        facet_col_index = headers.index("Facet")
-                    except ValueError:
-                        facet_col_index = -1
-                start_row = 1
-
-        for row in table_rows[start_row:]:
-            cols = row.find_all("div", recursive=False)
-            row_data = []
-            for col_idx, col in enumerate(cols):
-                if hero_col_index != -1 and col_idx == hero_col_index:
-                    hero_name = None
-                    hero_img = col.find("img", alt=True)
-                    if hero_img and isinstance(hero_img.get("alt"), str):
-                        hero_name = hero_img.get("alt").strip()
-                    if not hero_name:
-                        span = col.find("span", class_=lambda c: c != "group" if c else True)
-                        if span:
-                            hero_name = span.get_text(strip=True)
-                    if not hero_name:
-                        hero_name = col.get_text(strip=True) or None
-                    row_data.append(hero_name if hero_name else None)
-
-                    if not facet_column_in_dom:
-                        facet_name = None
-                        group_div = col.find("div", class_=lambda c: c and "group" in c)
-                        if group_div:
-                            bold_in_group = group_div.find(
-                                "div", class_=lambda c: c and "font-bold" in c
-                            )
-                            if bold_in_group:
-                                facet_name = bold_in_group.get_text(strip=True)
-                            if not facet_name:
-                                truncate = group_div.find(
-                                    "div", class_=lambda c: c and "truncate" in c
-                                )
-                                if truncate:
-                                    facet_name = truncate.get_text(strip=True)
-                            if not facet_name:
-                                facet_name = group_div.get_text(strip=True)
-                        if not facet_name:
-                            for d in col.find_all("div", class_=True):
-                                if "font-bold" in (d.get("class") or []):
-                                    t = d.get_text(strip=True)
-                                    if t and t != (hero_name or ""):
-                                        facet_name = t
-                                        break
-                        if not facet_name:
-                            tip = col.find(attrs={"data-tip": True})
-                            if tip and isinstance(tip.get("data-tip"), str):
-                                facet_name = tip.get("data-tip").strip()
-                        if not facet_name:
-                            title_el = col.find(attrs={"title": True})
-                            if title_el and isinstance(title_el.get("title"), str):
-                                facet_name = title_el.get("title").strip()
-                        row_data.append(facet_name if facet_name else None)
-                    continue
-
-                if facet_column_in_dom and facet_col_index != -1 and col_idx == facet_col_index:
-                    facet_name = None
-                    bold_el = col.find("div", class_=lambda c: c and "font-bold" in c)
-                    if bold_el:
-                        facet_name = bold_el.get_text(strip=True)
-                    if not facet_name:
-                        tip_el = col.find(attrs={"data-tip": True})
-                        if tip_el and isinstance(tip_el.get("data-tip"), str):
-                            facet_name = tip_el.get("data-tip").strip()
-                    if not facet_name:
-                        title_el = col.find(attrs={"title": True})
-                        if title_el and isinstance(title_el.get("title"), str):
-                            facet_name = title_el.get("title").strip()
-                    if not facet_name:
-                        facet_name = col.get_text(strip=True) or None
-                    row_data.append(facet_name)
-                    continue
+    def _capture_table_html(self, driver) -> str:
+        """
+        Снимает HTML таблицы (единственная часть извлечения, которой нужен браузер):
+        только thead + tbody, а для старой вёрстки — всю страницу
+        """
+        time.sleep(0.2)
+        with span("page.table_html"):
+            table_html = fetch_table_html(driver)
+        if table_html is not None:
+            return table_html
+        with span("page.source"):
+            return driver.page_source
+
+    def _parse_and_clean(self, page_source: str) -> pd.DataFrame:
+        """Разбор и очистка таблицы из HTML (без обращения к браузеру)"""
+        with span("table.parse", html_chars=len(page_source)):
+            df_heroes_table = self._parse_table_html(page_source)
+        with span("table.clean", rows=len(df_heroes_table)):
+            df_heroes_table = self._clean_data(df_heroes_table)
+        return df_heroes_table
 
-                img = col.find("img", alt=True)
-                if img:
-                    row_data.append(img.get("alt", ""))
-                    continue
-                spans = col.find_all("span")
-                if spans:
-                    row_data.append(" ".join(s.get_text(strip=True) for s in spans) or None)
-                    continue
-                row_data.append(col.get_text(strip=True) or None)
+    def _parse_table_html(self, page_source: str, slice_region: bool = True) -> pd.DataFrame:
+        """
+        Разбор HTML страницы в сырой DataFrame таблицы (без очистки значений)
 
-            if row_data and len(row_data) >= len(headers) - 1:
-                if len(row_data) < len(headers):
-                    row_data.extend([None] * (len(headers) - len(row_data)))
-                data.append(row_data[: len(headers)])
+        Args:
+            page_source: HTML страницы (или уже вырезанной области таблицы)
+            slice_region: Разбирать только область thead/tbody; если в ней не нашлось
+                строк, страница разбирается целиком
+        """
+        if slice_region:
+            region = slice_table_region(page_source)
+            if region is not None:
+                try:
+                    df = self._parse_table_soup(BeautifulSoup(region, self.html_parser))
+                    if not df.empty:
+                        return df
+                except UnknownTableLayoutError:
+                    pass
+                logger.debug("В области таблицы нет строк, разбираем страницу целиком")
+        return self._parse_table_soup(BeautifulSoup(page_source, self.html_parser))
+
+    def _parse_table_soup(self, soup: BeautifulSoup) -> pd.DataFrame:
+        """
+        Извлечение строк таблицы из дерева BeautifulSoup. Вёрстка определяется один
+        раз за сессию; пока заголовки совпадают, используется готовый извлекатель.
+        Вызывается из рабочих потоков конвейера: определение вёрстки — под
+        _extractor_lock, чтобы роли, разбираемые одновременно, не гонялись за него.
 
-        if not headers:
-            return pd.DataFrame()
-        num_cols = len(headers)
-        if data:
-            df_heroes_table = pd.DataFrame([r[:num_cols] for r in data], columns=headers[:num_cols])
-        else:
-            df_heroes_table = pd.DataFrame(columns=headers)
-        df_heroes_table = df_heroes_table.dropna(how="all")
-        df_heroes_table = self._clean_data(df_heroes_table)
-        return df_heroes_table
+        Raises:
+            UnknownTableLayoutError: если вёрстка таблицы не распознана
+        """
+        thead = soup.find("div", class_=THEAD_CLASS)
+        tbody = soup.find("div", class_=TBODY_CLASS)
+
+        extractor = self._table_extractor
+        if extractor is not None:
+            rows = extractor.rows_for(soup, tbody)
+            if rows and extractor.matches(thead, rows):
+                return extractor.extract(rows)
+
+        with self._extractor_lock:
+            # Пока ждали блокировку, вёрстку мог определить другой поток
+            current = self._table_extractor
+            if current is not None and current is not extractor:
+                rows = current.rows_for(soup, tbody)
+                if rows and current.matches(thead, rows):
+                    return current.extract(rows)
+
+            order = self.selectors.ordered(
+                self._layout, "table_rows", ["tbody_grid", "styled_grid", "legacy_grid"]
+            )
+            layout, rows = detect_table_layout(soup, thead, tbody, order)
+            extractor = TableExtractor(layout)
+            if rows:
+                if current is None or current.layout != layout:
+                    logger.info(
+                        f"Вёрстка таблицы: {layout.fingerprint} (строки: {layout.row_source}, "
+                        f"колонка фасета {'в DOM' if layout.facet_in_dom else 'в колонке героя'})"
+                    )
+                # Запоминаем только вёрстку с данными: пустая таблица могла не догрузиться
+                self._table_extractor = extractor
+                self.selectors.record(self._layout, "table_rows", layout.row_source)
+        return extractor.extract(rows)
 
     def _clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """
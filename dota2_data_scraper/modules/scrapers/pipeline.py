@@ -0,0 +1,83 @@
+"""
+Конвейер "браузер -> разбор": поток браузера только кликает и снимает сырой
+HTML таблиц, а пул рабочих потоков разбирает, чистит и разрешает фасеты
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+class ParsePipeline:
+    """
+    Ограниченная очередь задач + пул рабочих потоков.
+
+    submit() блокирует поток браузера, только если разбор отстает больше чем
+    на max_pending таблиц — так память под сырой HTML остается ограниченной.
+    """
+
+    _STOP = object()
+
+    def __init__(self, workers: int = 2, max_pending: int = 4):
+        """
+        Args:
+            workers: Количество рабочих потоков
+            max_pending: Емкость очереди необработанных задач
+        """
+        self.workers = max(1, workers)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_pending))
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> "ParsePipeline":
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker, name=f"parse-worker-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Ставит задачу в очередь; результат — через Future.result()"""
+        future: Future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def close(self) -> None:
+        """Дожидается разбора всех задач и останавливает рабочие потоки"""
+        for _ in self._threads:
+            self._queue.put(self._STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _worker(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                return
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                logger.debug(f"Ошибка в задаче конвейера разбора: {e}")
+                future.set_exception(e)
+
+    def __enter__(self) -> "ParsePipeline":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+def completed(value: Any) -> Future:
+    """Уже завершенный Future (для таблиц, взятых из кэша)"""
+    future: Future = Future()
+    future.set_result(value)
+    return future
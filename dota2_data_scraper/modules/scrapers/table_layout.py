@@ -0,0 +1,251 @@
+"""
+Определение вёрстки таблицы dota2protracker и извлекатели строк под конкретную вёрстку.
+
+Вёрстка (источник строк, заголовки, колонки героя и фасета) определяется один раз
+за сессию; дальше строки разбираются извлекателем с заранее вычисленными индексами
+колонок. Неизвестная вёрстка — UnknownTableLayoutError, а не молча пустая таблица.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+# Предкомпилированные матчеры классов: BeautifulSoup проверяет регулярку
+# и по каждому классу, и по строке классов целиком
+GRID_ROW_CLASS = re.compile("grid-cols-14")
+THEAD_CLASS = re.compile("thead")
+TBODY_CLASS = re.compile("tbody")
+GROUP_CLASS = re.compile("group")
+FONT_BOLD_CLASS = re.compile("font-bold")
+TRUNCATE_CLASS = re.compile("truncate")
+
+
+class UnknownTableLayoutError(RuntimeError):
+    """Вёрстка таблицы не распознана (нет строк/заголовков или колонки Hero)"""
+
+
+# Источники строк таблицы в порядке по умолчанию: (soup, tbody) -> список строк
+ROW_SOURCES: Dict[str, Callable] = {
+    "tbody_grid": lambda soup, tbody: list(tbody.find_all("div", class_=GRID_ROW_CLASS)) if tbody else [],
+    "styled_grid": lambda soup, tbody: soup.find_all("div", class_=GRID_ROW_CLASS, style=True),
+    "legacy_grid": lambda soup, tbody: soup.find_all("div", class_="grid", style=True),
+}
+
+
+def _not_group_class(c) -> bool:
+    return c != "group" if c else True
+
+
+def read_headers(thead, rows) -> Tuple[Tuple[Optional[str], ...], str]:
+    """
+    Заголовки колонок в порядке DOM
+
+    Returns:
+        (заголовки, источник: "thead" или "first_row"); заголовки пусты, если их нет
+    """
+    if thead:
+        headers = []
+        for col in thead.find_all("div", recursive=False):
+            btn = col.find("button")
+            headers.append((btn.get_text(strip=True) if btn else col.get_text(strip=True)) or None)
+        return tuple(headers), "thead"
+    if rows:
+        return tuple(col.get_text(strip=True) or None for col in rows[0].find_all("div", recursive=False)), "first_row"
+    return (), "first_row"
+
+
+@dataclass(frozen=True)
+class TableLayout:
+    """Структура таблицы: откуда брать строки и где колонки героя/фасета"""
+
+    row_source: str
+    header_source: str  # "thead" или "first_row" (первая строка — заголовок)
+    dom_headers: Tuple[Optional[str], ...]
+    hero_col: int
+    facet_col: int  # Индекс колонки Facet в DOM (-1, если фасет внутри колонки героя)
+    columns: Tuple[Optional[str], ...] = field(default=())
+
+    @property
+    def facet_in_dom(self) -> bool:
+        return self.facet_col != -1
+
+    @property
+    def fingerprint(self) -> str:
+        """Короткий отпечаток вёрстки (источник строк, заголовки, колонка фасета)"""
+        key = f"{self.row_source}|{self.header_source}|{'|'.join(map(str, self.dom_headers))}|{self.facet_col}"
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+    @classmethod
+    def from_headers(cls, row_source: str, header_source: str, dom_headers) -> "TableLayout":
+        headers = list(dom_headers)
+        if "Hero" not in headers:
+            raise UnknownTableLayoutError(
+                f"В заголовках таблицы нет колонки Hero: {headers}"
+            )
+        hero_col = headers.index("Hero")
+        facet_col = headers.index("Facet") if "Facet" in headers else -1
+        columns = list(headers)
+        if facet_col == -1:
+            # Фасет выводится сразу после героя, хотя в DOM он внутри колонки героя
+            columns.insert(hero_col + 1, "Facet")
+        return cls(row_source, header_source, tuple(headers), hero_col, facet_col, tuple(columns))
+
+
+def detect_table_layout(soup, thead, tbody, order: Optional[Sequence[str]] = None):
+    """
+    Определяет вёрстку таблицы
+
+    Args:
+        soup: Дерево BeautifulSoup страницы (или области таблицы)
+        thead, tbody: Найденные контейнеры заголовка/тела (или None)
+        order: Порядок проверки источников строк (по умолчанию ROW_SOURCES)
+
+    Returns:
+        (TableLayout, строки таблицы)
+
+    Raises:
+        UnknownTableLayoutError: если нет ни заголовков, ни строк, или нет колонки Hero
+    """
+    rows: List = []
+    row_source = None
+    for name in order or list(ROW_SOURCES):
+        if name not in ROW_SOURCES:
+            continue
+        rows = ROW_SOURCES[name](soup, tbody)
+        if rows:
+            row_source = name
+            break
+    headers, header_source = read_headers(thead, rows)
+    if not headers:
+        raise UnknownTableLayoutError("Не найдены ни заголовки, ни строки таблицы")
+    layout = TableLayout.from_headers(row_source or "tbody_grid", header_source, headers)
+    return layout, rows
+
+
+def _hero_name(col) -> Optional[str]:
+    hero_name = None
+    hero_img = col.find("img", alt=True)
+    if hero_img and isinstance(hero_img.get("alt"), str):
+        hero_name = hero_img.get("alt").strip()
+    if not hero_name:
+        span = col.find("span", class_=_not_group_class)
+        if span:
+            hero_name = span.get_text(strip=True)
+    if not hero_name:
+        hero_name = col.get_text(strip=True) or None
+    return hero_name if hero_name else None
+
+
+def _facet_in_hero_cell(col, hero_name: Optional[str]) -> Optional[str]:
+    facet_name = None
+    group_div = col.find("div", class_=GROUP_CLASS)
+    if group_div:
+        bold_in_group = group_div.find("div", class_=FONT_BOLD_CLASS)
+        if bold_in_group:
+            facet_name = bold_in_group.get_text(strip=True)
+        if not facet_name:
+            truncate = group_div.find("div", class_=TRUNCATE_CLASS)
+            if truncate:
+                facet_name = truncate.get_text(strip=True)
+        if not facet_name:
+            facet_name = group_div.get_text(strip=True)
+    if not facet_name:
+        for d in col.find_all("div", class_=True):
+            if "font-bold" in (d.get("class") or []):
+                t = d.get_text(strip=True)
+                if t and t != (hero_name or ""):
+                    facet_name = t
+                    break
+    if not facet_name:
+        tip = col.find(attrs={"data-tip": True})
+        if tip and isinstance(tip.get("data-tip"), str):
+            facet_name = tip.get("data-tip").strip()
+    if not facet_name:
+        title_el = col.find(attrs={"title": True})
+        if title_el and isinstance(title_el.get("title"), str):
+            facet_name = title_el.get("title").strip()
+    return facet_name if facet_name else None
+
+
+def _facet_cell(col, out: list) -> None:
+    facet_name = None
+    bold_el = col.find("div", class_=FONT_BOLD_CLASS)
+    if bold_el:
+        facet_name = bold_el.get_text(strip=True)
+    if not facet_name:
+        tip_el = col.find(attrs={"data-tip": True})
+        if tip_el and isinstance(tip_el.get("data-tip"), str):
+            facet_name = tip_el.get("data-tip").strip()
+    if not facet_name:
+        title_el = col.find(attrs={"title": True})
+        if title_el and isinstance(title_el.get("title"), str):
+            facet_name = title_el.get("title").strip()
+    if not facet_name:
+        facet_name = col.get_text(strip=True) or None
+    out.append(facet_name)
+
+
+def _hero_cell(col, out: list) -> None:
+    out.append(_hero_name(col))
+
+
+def _hero_with_facet_cell(col, out: list) -> None:
+    hero_name = _hero_name(col)
+    out.append(hero_name)
+    out.append(_facet_in_hero_cell(col, hero_name))
+
+
+def _generic_cell(col, out: list) -> None:
+    img = col.find("img", alt=True)
+    if img:
+        out.append(img.get("alt", ""))
+        return
+    spans = col.find_all("span")
+    if spans:
+        out.append(" ".join(s.get_text(strip=True) for s in spans) or None)
+        return
+    out.append(col.get_text(strip=True) or None)
+
+
+class TableExtractor:
+    """Извлекатель строк, собранный под конкретную вёрстку (индексы колонок заранее)"""
+
+    def __init__(self, layout: TableLayout):
+        self.layout = layout
+        self._cells: Dict[int, Callable] = {
+            layout.hero_col: _hero_cell if layout.facet_in_dom else _hero_with_facet_cell
+        }
+        if layout.facet_in_dom:
+            self._cells.setdefault(layout.facet_col, _facet_cell)
+        self._start_row = 1 if layout.header_source == "first_row" else 0
+
+    def matches(self, thead, rows) -> bool:
+        """Совпадает ли структура страницы с вёрсткой, под которую собран извлекатель"""
+        headers, header_source = read_headers(thead, rows)
+        return header_source == self.layout.header_source and headers == self.layout.dom_headers
+
+    def rows_for(self, soup, tbody) -> List:
+        return ROW_SOURCES[self.layout.row_source](soup, tbody)
+
+    def extract(self, rows) -> pd.DataFrame:
+        """Сырой DataFrame таблицы (без очистки значений)"""
+        headers = list(self.layout.columns)
+        width = len(headers)
+        cells = self._cells
+        data = []
+        for row in rows[self._start_row:]:
+            row_data: list = []
+            for col_idx, col in enumerate(row.find_all("div", recursive=False)):
+                cells.get(col_idx, _generic_cell)(col, row_data)
+            if row_data and len(row_data) >= width - 1:
+                if len(row_data) < width:
+                    row_data.extend([None] * (width - len(row_data)))
+                data.append(row_data[:width])
+        if data:
+            df = pd.DataFrame(data, columns=headers)
+        else:
+            df = pd.DataFrame(columns=headers)
+        return df.dropna(how="all")
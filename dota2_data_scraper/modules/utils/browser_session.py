@@ -0,0 +1,125 @@
+"""
+Повторное использование Cloudflare clearance Dotabuff между запусками.
+
+Браузер с постоянным профилем (ScrapingManager(profile_dir=...)) проходит
+проверку Cloudflare один раз; его cookies вместе с User-Agent сохраняются
+рядом с профилем и, пока clearance действует, бандл repo-*.js и страницы
+героев загружаются обычным HTTP через пул соединений requests.Session.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Профиль браузера для Dotabuff по умолчанию (--dotabuff-profile без значения)
+DEFAULT_PROFILE_DIR = os.path.join("configs", "browser_profile")
+# Файл с экспортированными cookies внутри каталога профиля
+COOKIE_FILE = "clearance_cookies.json"
+# Cookie, которой Cloudflare подтверждает пройденную проверку
+CLEARANCE_COOKIE = "cf_clearance"
+# Размер пула соединений HTTP-сессии
+SESSION_POOL_SIZE = 8
+
+_COOKIE_FIELDS = ("name", "value", "domain", "path", "expiry", "secure")
+
+
+def build_session(
+    cookies: List[Dict], user_agent: Optional[str], pool_size: int = SESSION_POOL_SIZE
+) -> requests.Session:
+    """
+    HTTP-сессия с пулом соединений и cookies браузера
+
+    Args:
+        cookies: Cookies в формате Selenium (name, value, domain, path, ...)
+        user_agent: User-Agent браузера (clearance привязан к нему)
+        pool_size: Размер пула соединений на хост
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        {
+            "Accept": "text/html,application/json,application/javascript,*/*;q=0.9",
+            "Accept-Language": "en-US,en;q=0.9",
+        }
+    )
+    if user_agent:
+        session.headers["User-Agent"] = user_agent
+    for cookie in cookies:
+        session.cookies.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie.get("domain", ""),
+            path=cookie.get("path", "/"),
+        )
+    return session
+
+
+class ClearanceStore:
+    """Cookies браузерного профиля Dotabuff со сроками действия"""
+
+    def __init__(self, profile_dir: str = DEFAULT_PROFILE_DIR):
+        self.profile_dir = profile_dir
+        self.path = os.path.join(profile_dir, COOKIE_FILE)
+
+    def save(self, cookies: List[Dict], user_agent: Optional[str]) -> None:
+        """Сохраняет cookies браузера (только нужные поля) и его User-Agent"""
+        data = {
+            "saved_at": datetime.now().isoformat(timespec="seconds"),
+            "user_agent": user_agent,
+            "cookies": [
+                {k: c[k] for k in _COOKIE_FIELDS if k in c}
+                for c in cookies
+                if c.get("name") and c.get("value") is not None
+            ],
+        }
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            logger.info(f"Cookies Dotabuff сохранены: {len(data['cookies'])} шт.")
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить cookies Dotabuff: {e}")
+
+    def load(self, now: Optional[float] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Действующие cookies и User-Agent
+
+        Returns:
+            (cookies без истекших, User-Agent); ([], None), если файла нет
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return [], None
+        except Exception as e:
+            logger.warning(f"Не удалось прочитать cookies Dotabuff: {e}")
+            return [], None
+        now = time.time() if now is None else now
+        cookies = [
+            c for c in data.get("cookies", [])
+            if c.get("expiry") is None or c["expiry"] > now
+        ]
+        return cookies, data.get("user_agent")
+
+    def has_clearance(self, now: Optional[float] = None) -> bool:
+        """Есть ли действующая cookie Cloudflare clearance"""
+        cookies, _ = self.load(now)
+        return any(c["name"] == CLEARANCE_COOKIE for c in cookies)
+
+    def session(self, now: Optional[float] = None) -> Optional[requests.Session]:
+        """HTTP-сессия с cookies профиля; None, если clearance истек или его нет"""
+        cookies, user_agent = self.load(now)
+        if not any(c["name"] == CLEARANCE_COOKIE for c in cookies):
+            return None
+        return build_session(cookies, user_agent)
@@ -0,0 +1,138 @@
+"""
+Поиск элементов без implicit wait: все селекторы-кандидаты проверяются одним
+JS-вызовом, а ожидание — только явное и ограниченное по времени
+"""
+
+import logging
+import time
+from typing import List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Первый элемент по списку CSS-селекторов (в порядке приоритета).
+# arguments: [селекторы, имя атрибута-фильтра, значение атрибута-фильтра]
+FIND_FIRST_JS = """
+const [selectors, attr, value] = arguments;
+for (let i = 0; i < selectors.length; i++) {
+    let found;
+    try {
+        found = document.querySelectorAll(selectors[i]);
+    } catch (e) {
+        continue;
+    }
+    for (const el of found) {
+        if (!attr || el.getAttribute(attr) === value) return [i, el];
+    }
+}
+return null;
+"""
+
+# То же для XPath-выражений
+FIND_FIRST_XPATH_JS = """
+const [selectors, attr, value] = arguments;
+for (let i = 0; i < selectors.length; i++) {
+    let found;
+    try {
+        found = document.evaluate(selectors[i], document, null,
+                                  XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    } catch (e) {
+        continue;
+    }
+    for (let j = 0; j < found.snapshotLength; j++) {
+        const el = found.snapshotItem(j);
+        if (!attr || el.getAttribute(attr) === value) return [i, el];
+    }
+}
+return null;
+"""
+
+# Все <select> страницы с опциями [value, text, selected] за один вызов
+SELECT_OPTIONS_JS = """
+return Array.from(document.querySelectorAll('select')).map(s => [
+    s, Array.from(s.options).map(o => [o.value, o.text, o.selected])
+]);
+"""
+
+
+def probe_selectors(
+    driver,
+    selectors: Sequence[str],
+    attribute: Optional[Tuple[str, str]] = None,
+    xpath: bool = False,
+) -> Optional[Tuple[int, object]]:
+    """
+    Одна проверка всех селекторов в браузере
+
+    Args:
+        driver: WebDriver instance
+        selectors: CSS-селекторы (или XPath при xpath=True) в порядке приоритета
+        attribute: Фильтр (имя, значение) — элемент должен иметь этот атрибут
+        xpath: Селекторы заданы как XPath
+
+    Returns:
+        (индекс сработавшего селектора, WebElement) или None
+    """
+    attr, value = attribute if attribute else (None, None)
+    try:
+        script = FIND_FIRST_XPATH_JS if xpath else FIND_FIRST_JS
+        result = driver.execute_script(script, list(selectors), attr, value)
+    except Exception as e:
+        logger.debug(f"Проверка селекторов не удалась: {e}")
+        return None
+    if not isinstance(result, (list, tuple)) or len(result) != 2:
+        return None
+    return int(result[0]), result[1]
+
+
+def find_first(
+    driver,
+    selectors: Sequence[str],
+    timeout: float = 0.0,
+    attribute: Optional[Tuple[str, str]] = None,
+    poll: float = 0.25,
+    xpath: bool = False,
+) -> Optional[Tuple[str, object]]:
+    """
+    Первый найденный элемент по списку селекторов с явным ограниченным ожиданием
+
+    Args:
+        driver: WebDriver instance
+        selectors: CSS-селекторы в порядке приоритета
+        timeout: Сколько ждать появления элемента, секунды (0 — одна проверка)
+        attribute: Фильтр (имя, значение) для найденных элементов
+        poll: Интервал повторных проверок
+        xpath: Селекторы заданы как XPath
+
+    Returns:
+        (сработавший селектор, WebElement) или None
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        found = probe_selectors(driver, selectors, attribute, xpath=xpath)
+        if found is not None:
+            index, element = found
+            return selectors[index], element
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(poll)
+
+
+def select_options(driver, timeout: float = 0.0, poll: float = 0.25) -> List[tuple]:
+    """
+    Все селекторы страницы с опциями одним вызовом
+
+    Returns:
+        Список (WebElement select, [(value, text, selected), ...])
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            result = driver.execute_script(SELECT_OPTIONS_JS)
+        except Exception as e:
+            logger.debug(f"Не удалось получить селекторы страницы: {e}")
+            result = None
+        if isinstance(result, list) and result:
+            return [(el, [tuple(o) for o in options]) for el, options in result]
+        if time.monotonic() >= deadline:
+            return []
+        time.sleep(poll)
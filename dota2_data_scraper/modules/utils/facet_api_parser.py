@@ -5,27 +5,103 @@
 import logging
 import re
 import os
+import threading
+import time
 import requests
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Dict, List, Optional, Tuple
 
-from ..core.scraping_manager import ScrapingManager
-from bs4 import BeautifulSoup
+from .browser_session import ClearanceStore, build_session
+from .facet_index import FacetMatch, FacetNameIndex
+from .facet_scanner import extract_facets
+from .facet_snapshots import FacetSnapshotStore, bundle_key
+from .http_cache import ConditionalCache
+from .tracing import span
 import json
 from urllib.parse import quote
 
 
+# Страница героя, на которой подключается repo-*.js с фасетами
+DOTABUFF_HERO_URL = "https://www.dotabuff.com/heroes/natures-prophet"
+# Сколько ждать прохождения Cloudflare challenge и загрузки repo скрипта, секунды
+CLEARANCE_TIMEOUT = 15.0
+# Страницы героев для поиска repo-*.js по HTTP (запрашиваются с хеджированием)
+DOTABUFF_DISCOVERY_URLS = [
+    "https://www.dotabuff.com/heroes/juggernaut",
+    "https://www.dotabuff.com/heroes/anti-mage",
+    "https://www.dotabuff.com/heroes/pudge",
+]
+# Через сколько секунд без ответа отправлять запрос к следующей странице
+HEDGE_DELAY = 0.5
+# Сколько доверять найденному URL бандла без повторного поиска, секунды.
+# Имя repo-<хеш>.js меняется при выкладке, поэтому новый бандл ищется не реже этого.
+REPO_URL_TTL = 3600.0
+# Как часто долгоживущий процесс обновляет маппинг в фоне, секунды
+REFRESH_TTL = 3600.0
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/124 Safari/537.36"
+)
+
+
 class FacetAPIParser:
     # Общий кеш для всех экземпляров класса
     _shared_cache: Dict[str, Dict[str, int]] = {}
+    # Алиасы фасетов из описаний {герой: {алиас: номер}} для индекса имен
+    _shared_aliases: Dict[str, Dict[str, int]] = {}
+    # Ключ бандла, из которого получен текущий общий маппинг
+    _shared_key: Optional[str] = None
+    # Фоновое обновление маппинга — не больше одного одновременно на процесс
+    _refresh_thread: Optional[threading.Thread] = None
+    _refresh_lock = threading.Lock()
+    # Когда маппинг последний раз получен с Dotabuff или обновлялся (time.monotonic)
+    _refreshed_at: Optional[float] = None
     
-    def __init__(self):
+    def __init__(
+        self,
+        profile_dir: Optional[str] = None,
+        http_cache: Optional[ConditionalCache] = None,
+        snapshot_store: Optional[FacetSnapshotStore] = None,
+        background_refresh: bool = True,
+    ):
+        """
+        Args:
+            profile_dir: Постоянный профиль браузера для Dotabuff (None — временный).
+                Cookies профиля позволяют загружать фасеты по HTTP без браузера.
+            http_cache: Кеш условных запросов к repo-*.js (по умолчанию configs/cache/)
+            snapshot_store: Снимки маппинга по бандлу (по умолчанию configs/facet_snapshots/)
+            background_refresh: Обновлять маппинг в фоне, если он взят из снимка
+                или получен больше REFRESH_TTL секунд назад
+        """
         self.logger = logging.getLogger(__name__)
         # Используем общий кеш для всех экземпляров
         self.hero_facets_cache = FacetAPIParser._shared_cache
+        self.profile_dir = profile_dir
+        self.clearance = ClearanceStore(profile_dir) if profile_dir else None
+        self.http_cache = http_cache or ConditionalCache()
+        # Индекс имен строится один раз на загруженный маппинг (см. facet_index)
+        self._index: Optional[FacetNameIndex] = None
+        self._index_source: Optional[Dict[str, Dict[str, int]]] = None
+        self.snapshots = snapshot_store or FacetSnapshotStore()
+        self.background_refresh = background_refresh
+        # URL бандла, из которого получен последний живой маппинг
+        self._last_repo_url: Optional[str] = None
 
     def get_hero_facets_mapping(
-        self, debug_dotabuff: bool = False, manager=None
+        self, debug_dotabuff: bool = False, manager=None, allow_browser: bool = True
     ) -> Dict[str, Dict[str, int]]:
+        """
+        Маппинг {герой: {фасет: номер}}: общий кеш, снимок или Dotabuff
+
+        Поставляемый снимок (configs/facets_bundled.json) неполон и берется,
+        только если Dotabuff недоступен ни по HTTP, ни через браузер.
+
+        Args:
+            debug_dotabuff: Не используется (совместимость)
+            manager: Запущенный ScrapingManager — если HTTP не сработал, Dotabuff
+                открывается во второй вкладке этого браузера, а не в отдельном
+            allow_browser: Можно ли запускать отдельный браузер, если HTTP не сработал
+                (False — только снимок/HTTP; так же и для фонового обновления)
+        """
         # Проверяем общий кеш перед загрузкой из Dotabuff
         if FacetAPIParser._shared_cache and len(FacetAPIParser._shared_cache) > 0:
             self.logger.info(
@@ -33,19 +109,78 @@ class FacetAPIParser:
             )
             # Обновляем локальную ссылку на кеш
             self.hero_facets_cache = FacetAPIParser._shared_cache
+            refreshed_at = FacetAPIParser._refreshed_at
+            if (
+                self.background_refresh
+                and refreshed_at is not None
+                and time.monotonic() - refreshed_at >= REFRESH_TTL
+            ):
+                # Долгоживущий процесс (--daemon) подхватывает новый бандл
+                self.refresh_in_background(allow_browser=allow_browser)
             return FacetAPIParser._shared_cache
         
-        # Всегда используем только Dotabuff
+        # Свежайший локальный снимок с Dotabuff — сразу, обновление в фоне
+        snapshot = self.snapshots.latest() if manager is None else None
+        if snapshot is not None:
+            self.logger.info(
+                f"✅ Маппинг фасетов из снимка {snapshot.key} ({snapshot.source}, "
+                f"{snapshot.created_at}) для {len(snapshot.mapping)} героев"
+            )
+            self._publish(snapshot.mapping, snapshot.aliases, snapshot.key)
+            if self.background_refresh:
+                self.refresh_in_background(allow_browser=allow_browser)
+            return snapshot.mapping
+
+        try:
+            return self.fetch_live_mapping(manager, allow_browser)
+        except Exception:
+            fallback = self.snapshots.latest() or self.snapshots.bundled()
+            if fallback is None:
+                raise
+        self.logger.warning(
+            f"Dotabuff недоступен — маппинг фасетов из снимка {fallback.key} "
+            f"({fallback.source}, {fallback.created_at}) для {len(fallback.mapping)} героев"
+        )
+        self._publish(fallback.mapping, fallback.aliases, fallback.key)
+        FacetAPIParser._refreshed_at = time.monotonic()
+        return fallback.mapping
+
+    def fetch_live_mapping(
+        self, manager=None, allow_browser: bool = True, http: bool = True
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Маппинг с Dotabuff: HTTP (условный запрос бандла), затем браузер.
+        Результат сохраняется снимком и становится общим маппингом.
+
+        Args:
+            manager: Запущенный ScrapingManager — браузер открывает вкладку в нем
+            allow_browser: Можно ли запускать отдельный браузер (без manager)
+            http: Пробовать ли сначала HTTP (False — он уже не сработал)
+
+        Raises:
+            RuntimeError: если Dotabuff не вернул данные
+        """
         self.logger.info("Получение фасетов через Dotabuff...")
         try:
-            mapping = self._try_dotabuff_facets(manager)
+            with span("facets.fetch", source="dotabuff"):
+                mapping = self._try_dotabuff_facets_http() if http else {}
+                if not mapping and manager is not None:
+                    # Вторая вкладка уже запущенного браузера
+                    with manager.in_tab():
+                        mapping = self._try_dotabuff_facets(manager)
+                elif not mapping:
+                    if not allow_browser:
+                        raise RuntimeError("HTTP не сработал, а отдельный браузер запрещен")
+                    mapping = self._try_dotabuff_facets()
             if mapping:
                 self.logger.info(
                     f"✅ Получены фасеты через Dotabuff для {len(mapping)} героев"
                 )
+                key = bundle_key(self._last_repo_url, mapping)
+                self.snapshots.save(key, mapping, FacetAPIParser._shared_aliases)
                 # Сохраняем в общий кеш
-                FacetAPIParser._shared_cache = mapping
-                self.hero_facets_cache = FacetAPIParser._shared_cache
+                self._publish(mapping, FacetAPIParser._shared_aliases, key)
+                FacetAPIParser._refreshed_at = time.monotonic()
                 return mapping
             else:
                 raise RuntimeError("Dotabuff не вернул данные")
@@ -53,30 +188,103 @@ class FacetAPIParser:
             self.logger.error(f"Ошибка при получении фасетов через Dotabuff: {e}")
             raise
 
-    def _discover_dotabuff_repo_js_http(self) -> str:
-        # Пробуем сначала страницу героя (более надежно)
-        hero_urls = [
-            "https://www.dotabuff.com/heroes/juggernaut",
-            "https://www.dotabuff.com/heroes/anti-mage", 
-            "https://www.dotabuff.com/heroes/pudge"
-        ]
+    def _publish(
+        self,
+        mapping: Dict[str, Dict[str, int]],
+        aliases: Dict[str, Dict[str, int]],
+        key: Optional[str],
+    ) -> None:
+        """Делает маппинг общим для всех экземпляров (замена ссылок атомарна)"""
+        FacetAPIParser._shared_aliases = aliases or {}
+        FacetAPIParser._shared_key = key
+        FacetAPIParser._shared_cache = mapping
+        self.hero_facets_cache = mapping
+
+    def refresh_in_background(self, allow_browser: bool = True) -> threading.Thread:
+        """
+        Запускает фоновое обновление маппинга с Dotabuff (не больше одного
+        одновременно). Новый бандл сохраняется снимком и заменяет общий маппинг.
+
+        Args:
+            allow_browser: Можно ли обновлять через отдельный браузер, если HTTP не сработал
+
+        Returns:
+            Поток обновления (уже идущий, если он есть)
+        """
+        with FacetAPIParser._refresh_lock:
+            thread = FacetAPIParser._refresh_thread
+            if thread is not None:
+                return thread
+            thread = threading.Thread(
+                target=self._refresh_mapping,
+                args=(allow_browser,),
+                name="facet-refresh",
+                daemon=True,
+            )
+            FacetAPIParser._refresh_thread = thread
+        thread.start()
+        return thread
 
-        for hero_url in hero_urls:
-            try:
-                html = self._fetch_url(hero_url, referer="https://www.dotabuff.com/")
-                repo_url = self._extract_repo_js_url_from_html(html)
-                if repo_url:
-                    return repo_url
-            except Exception as e:
-                self.logger.debug(f"Не удалось получить repo с {hero_url}: {e}")
-                continue
+    def _refresh_mapping(self, allow_browser: bool = True) -> None:
+        previous = FacetAPIParser._shared_key
+        try:
+            with span("facets.refresh"):
+                self.fetch_live_mapping(allow_browser=allow_browser)
+        except Exception as e:
+            self.logger.warning(f"Фоновое обновление фасетов не удалось, используется снимок: {e}")
+            return
+        finally:
+            with FacetAPIParser._refresh_lock:
+                # Следующее обновление — не раньше чем через REFRESH_TTL
+                FacetAPIParser._refreshed_at = time.monotonic()
+                FacetAPIParser._refresh_thread = None
+        if FacetAPIParser._shared_key != previous:
+            self.logger.info(
+                f"Маппинг фасетов обновлен: {previous} -> {FacetAPIParser._shared_key}"
+            )
+
+    def _discover_dotabuff_repo_js_http(
+        self, session=None, hedge_delay: float = HEDGE_DELAY
+    ) -> str:
+        """
+        URL repo-*.js со страниц героев по HTTP
+
+        Запросы хеджируются: если страница не ответила за hedge_delay секунд,
+        параллельно запрашивается следующая; используется первый успешный ответ.
+        """
+        pool = ThreadPoolExecutor(
+            max_workers=len(DOTABUFF_DISCOVERY_URLS), thread_name_prefix="dotabuff-discovery"
+        )
+        try:
+            pending = set()
+            queue = list(DOTABUFF_DISCOVERY_URLS)
+            while queue or pending:
+                if queue:
+                    pending.add(pool.submit(self._repo_url_from_page, queue.pop(0), session))
+                done, pending = wait(
+                    pending,
+                    timeout=hedge_delay if queue else None,
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    try:
+                        return future.result()
+                    except Exception as e:
+                        self.logger.debug(f"Не удалось получить repo со страницы героя: {e}")
+        finally:
+            # Оставшиеся запросы не ждем — их результат уже не нужен
+            pool.shutdown(wait=False, cancel_futures=True)
 
         # Фолбек на главную
-        root_url = "https://www.dotabuff.com/"
-        html = self._fetch_url(root_url, referer="https://www.dotabuff.com/")
+        return self._repo_url_from_page("https://www.dotabuff.com/", session)
+
+    def _repo_url_from_page(self, url: str, session=None) -> str:
+        html = self._fetch_url(url, referer="https://www.dotabuff.com/", session=session)
         return self._extract_repo_js_url_from_html(html)
 
     def _extract_repo_js_url_from_html(self, html: str) -> str:
+        from bs4 import BeautifulSoup
+
         soup = BeautifulSoup(html, "html.parser")
         for script in soup.find_all("script", src=True):
             src = script["src"]
@@ -103,16 +311,13 @@ class FacetAPIParser:
         raise RuntimeError("Не удалось найти ссылку на repo-*.js на главной Dotabuff")
 
     def _fetch_repo_js_via_selenium(self) -> Tuple[str, str]:
+        # Selenium импортируется лениво: режим --config использует только кеш/HTTP
+        from ..core.scraping_manager import ScrapingManager
+
         with ScrapingManager(headless=True) as manager:
             # 1) идем на страницу героя (более надежно)
-            hero_urls = [
-                "https://www.dotabuff.com/heroes/juggernaut",
-                "https://www.dotabuff.com/heroes/anti-mage",
-                "https://www.dotabuff.com/heroes/pudge"
-            ]
-
             repo_js_url = None
-            for hero_url in hero_urls:
+            for hero_url in DOTABUFF_DISCOVERY_URLS:
                 try:
                     self.logger.debug(f"Переходим на {hero_url}")
                     manager.navigate_to_page_basic(hero_url)
@@ -194,10 +399,21 @@ class FacetAPIParser:
             return repo_js_url, js_text
 
     def _fetch_url(
-        self, url: str, referer: Optional[str] = None, timeout: int = 15
+        self,
+        url: str,
+        referer: Optional[str] = None,
+        timeout: int = 15,
+        session=None,
     ) -> str:
+        if session is not None:
+            # Заголовки и cookies (clearance) уже в сессии
+            resp = session.get(
+                url, headers={"Referer": referer} if referer else None, timeout=timeout
+            )
+            resp.raise_for_status()
+            return resp.text
         headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/124 Safari/537.36",
+            "User-Agent": DEFAULT_USER_AGENT,
             "Accept": "text/html,application/json,application/javascript,*/*;q=0.9",
             "Accept-Language": "en-US,en;q=0.9",
             "Connection": "keep-alive",
@@ -209,66 +425,16 @@ class FacetAPIParser:
         return resp.text
 
     def _extract_facets_from_repo(self, js_text: str) -> List[dict]:
-        # Более гибкие паттерны для поиска JSON с фасетами
-        patterns = [
-            r"const\s+f\s*=\s*JSON\.parse\(`(\[.*?\])`\)",
-            r"JSON\.parse\(`(\[.*?\])`\)",
-            r"const\s+\w+\s*=\s*(\[.*?\])",
-            r"facets?\s*:\s*(\[.*?\])",
-            r"f\s*=\s*(\[.*?\])"
-        ]
-
-        for pattern in patterns:
-            matches = re.findall(pattern, js_text, re.DOTALL)
-            for match in matches:
-                try:
-                    import json
-                    facets = json.loads(match)
-                    if isinstance(facets, list) and len(facets) > 0:
-                        valid = [x for x in facets if not x.get("deprecated")]
-                        if valid:
-                            self.logger.debug(f"Найдено {len(valid)} фасетов через паттерн: {pattern[:50]}...")
-                            return valid
-                except (json.JSONDecodeError, TypeError) as e:
-                    self.logger.debug(f"Ошибка парсинга JSON для паттерна {pattern[:30]}: {e}")
-                    continue
+        # Один проход по бандлу: якорь + балансировка скобок + проверка схемы
+        with span("facets.extract", chars=len(js_text)):
+            facets = extract_facets(js_text)
+        if facets:
+            self.logger.debug(f"Найдено {len(facets)} фасетов в бандле")
+            return facets
 
         self.logger.warning("Не удалось найти валидные фасеты в JS")
         return []
 
-    def _build_mapping(
-        self, facets: List[dict], hero_id_to_name: Dict[int, str]
-    ) -> Dict[str, Dict[str, int]]:
-        # Группируем по hero_id, сортируем по hero_variant и id, нумеруем 1..n
-        by_hero: Dict[int, List[dict]] = {}
-        for f in facets:
-            hid = f.get("hero_id")
-            if not isinstance(hid, int):
-                continue
-            by_hero.setdefault(hid, []).append(f)
-        result: Dict[str, Dict[str, int]] = {}
-        for hid, lst in by_hero.items():
-            lst.sort(key=lambda x: (x.get("hero_variant", 9999), x.get("id", 999999)))
-            hero_name = hero_id_to_name.get(hid)
-            if not hero_name:
-                # Фолбек по слагу героя (anti-mage-1-..., до первой -<цифра>-)
-                hero_name = (
-                    self._name_from_slug(lst[0].get("slug", "")) or f"Hero {hid}"
-                )
-            name_to_order: Dict[str, int] = {}
-            order = 1
-            for fac in lst:
-                name = fac.get("name")
-                if not isinstance(name, str) or not name.strip():
-                    # последний фолбек — короткий алиас из description
-                    alias = self._alias_from_description(fac.get("description"))
-                    name = alias or f"Facet {order}"
-                if name not in name_to_order:
-                    name_to_order[name] = order
-                    order += 1
-            result[hero_name] = name_to_order
-        return result
-
     def _name_from_slug(self, slug: str) -> Optional[str]:
         # slug вида: "anti-mage-1-magebanes-mirror" → hero part: "anti-mage"
         m = re.match(r"^([a-z0-9-]+)-\d+-", slug or "")
@@ -406,9 +572,15 @@ class FacetAPIParser:
         return {}
 
     def _build_mapping_from_facets(
-        self, facets: List[dict]
+        self, facets: List[dict], aliases: Optional[Dict[str, Dict[str, int]]] = None
     ) -> Dict[str, Dict[str, int]]:
-        """Строит маппинг напрямую из фасетов Dotabuff"""
+        """
+        Строит маппинг напрямую из фасетов Dotabuff
+
+        Args:
+            facets: Фасеты из repo-*.js
+            aliases: Если передан, заполняется алиасами из описаний {герой: {алиас: номер}}
+        """
         # Группируем по hero_id, сортируем по hero_variant и id, нумеруем 1..n
         by_hero: Dict[int, List[dict]] = {}
         for f in facets:
@@ -441,22 +613,38 @@ class FacetAPIParser:
                 if name not in name_to_order:
                     name_to_order[name] = order
                     order += 1
+                if aliases is not None:
+                    alias = self._alias_from_description(fac.get("description"))
+                    if alias and alias != name:
+                        aliases.setdefault(hero_name, {}).setdefault(alias, name_to_order[name])
             result[hero_name] = name_to_order
         return result
 
-    def get_facet_number_for_hero(self, hero_name: str, facet_name: str) -> int:
+    @property
+    def facet_index(self) -> FacetNameIndex:
+        """Индекс имен для текущего маппинга (перестраивается при смене маппинга)"""
+        mapping = self.hero_facets_cache
+        if self._index is None or self._index_source is not mapping:
+            self._index = FacetNameIndex(mapping, FacetAPIParser._shared_aliases)
+            self._index_source = mapping
+        return self._index
+
+    def match_facet(
+        self, hero_name: str, facet_name: str, min_confidence: float = 0.0
+    ) -> Optional[FacetMatch]:
+        """
+        Фасет героя по имени: точное, нормализованное, алиас, "Facet N" или нечеткое совпадение
+
+        Returns:
+            FacetMatch (имя из маппинга, номер, уровень, уверенность) или None
+        """
         if not self.hero_facets_cache:
             self.hero_facets_cache = self.get_hero_facets_mapping()
-        hero_facets = self.hero_facets_cache.get(hero_name, {})
-        if facet_name in hero_facets:
-            return hero_facets[facet_name]
-        for known, num in hero_facets.items():
-            if (
-                facet_name.lower() in known.lower()
-                or known.lower() in facet_name.lower()
-            ):
-                return num
-        return 1
+        return self.facet_index.lookup(hero_name, facet_name, min_confidence)
+
+    def get_facet_number_for_hero(self, hero_name: str, facet_name: str) -> int:
+        match = self.match_facet(hero_name, facet_name)
+        return match.number if match else 1
 
     def _try_dotabuff_facets(self, manager=None) -> Dict[str, Dict[str, int]]:
         """Получение фасетов через Dotabuff - только одна страница Nature's Prophet"""
@@ -465,48 +653,25 @@ class FacetAPIParser:
         if manager is None:
             self.logger.info("Запуск Selenium для Dotabuff...")
             # Используем minimize_window=True для скрытия окна (headless не работает с Dotabuff)
-            with ScrapingManager(headless=False, minimize_window=True) as manager:
+            with ScrapingManager(
+                headless=False, minimize_window=True, profile_dir=self.profile_dir
+            ) as manager:
                 return self._try_dotabuff_facets(manager)
         else:
             # Используем переданный manager
             # Прямо идем на страницу Nature's Prophet
-            hero_url = "https://www.dotabuff.com/heroes/natures-prophet"
-            self.logger.info(f"Переход на страницу героя: {hero_url}")
-            manager.navigate_to_page_basic(hero_url)
-
-            # Ждем загрузки страницы и всех ресурсов
-            import time
+            self.logger.info(f"Переход на страницу героя: {DOTABUFF_HERO_URL}")
+            manager.navigate_to_page_basic(DOTABUFF_HERO_URL)
 
-            time.sleep(5)
-
-            # Проверяем, прошли ли мы Cloudflare challenge
-            if (
-                "Just a moment" in manager.driver.title
-                or "Checking your browser" in manager.get_page_source()
-            ):
-                self.logger.info("Обнаружен Cloudflare challenge, ждем...")
-                time.sleep(10)
-
-                if "Just a moment" in manager.driver.title:
-                    raise RuntimeError("Не удалось пройти Cloudflare challenge")
-
-            # Получаем все загруженные ресурсы через JavaScript
+            # Ждем прохождения Cloudflare challenge и загрузки repo скрипта
             self.logger.info("Поиск repo скрипта...")
-            all_resources = manager.driver.execute_script(
-                """
-                return performance.getEntriesByType('resource')
-                    .map(r => r.name)
-                    .filter(name => name.includes('/static/') && name.endsWith('.js'));
-            """
-            )
-
-            self.logger.info(f"Найдено {len(all_resources)} JS файлов в /static/")
-
-            # Ищем repo файлы
-            repo_resources = [r for r in all_resources if "/static/repo-" in r]
+            repo_resources = self._wait_for_repo_resources(manager)
             if not repo_resources:
                 raise RuntimeError("Repo скрипт не найден в Network запросах")
 
+            if self.clearance is not None:
+                self.clearance.save(*manager.export_cookies())
+
             repo_js_url = repo_resources[0]
             self.logger.info(f"Найден repo скрипт: {repo_js_url}")
 
@@ -518,13 +683,111 @@ class FacetAPIParser:
             js_content = manager.get_page_source()
             self.logger.info(f"Получен JS контент размером {len(js_content)} символов")
 
-            # Парсим фасеты из JS
-            facets = self._extract_facets_from_repo(js_content)
-            if not facets:
-                raise RuntimeError("Не удалось извлечь фасеты из JS")
-
-            self.logger.info(f"Найдено {len(facets)} фасетов в JS")
+            mapping = self._mapping_from_repo_js(js_content)
+            self._last_repo_url = repo_js_url
+            # Следующий запуск проверит этот бандл условным HTTP-запросом
+            self.http_cache.remember("repo_url", repo_js_url)
+            self.http_cache.store(repo_js_url, None, self._cache_payload(mapping))
+            return mapping
 
-            # Строим маппинг напрямую из фасетов
-            mapping = self._build_mapping_from_facets(facets)
+    def _wait_for_repo_resources(
+        self, manager, timeout: float = CLEARANCE_TIMEOUT, poll: float = 0.5
+    ) -> List[str]:
+        """
+        Ждет, пока страница пройдет Cloudflare challenge и загрузит repo-*.js
+
+        Returns:
+            URL repo скриптов из Performance API (пустой список — не дождались)
+
+        Raises:
+            RuntimeError: если к концу ожидания страница все еще на challenge
+        """
+        import time
+
+        deadline = time.monotonic() + timeout
+        challenge_logged = False
+        while True:
+            if "Just a moment" in (manager.driver.title or ""):
+                if not challenge_logged:
+                    self.logger.info("Обнаружен Cloudflare challenge, ждем...")
+                    challenge_logged = True
+                if time.monotonic() >= deadline:
+                    raise RuntimeError("Не удалось пройти Cloudflare challenge")
+            else:
+                all_resources = manager.driver.execute_script(
+                    """
+                    return performance.getEntriesByType('resource')
+                        .map(r => r.name)
+                        .filter(name => name.includes('/static/') && name.endsWith('.js'));
+                """
+                ) or []
+                repo_resources = [r for r in all_resources if "/static/repo-" in r]
+                if repo_resources or time.monotonic() >= deadline:
+                    self.logger.info(f"Найдено {len(all_resources)} JS файлов в /static/")
+                    return repo_resources
+            time.sleep(poll)
+
+    def _http_session(self):
+        """Пул соединений: с cookies постоянного профиля, если clearance действует"""
+        session = self.clearance.session() if self.clearance is not None else None
+        return session or build_session([], DEFAULT_USER_AGENT)
+
+    def _try_dotabuff_facets_http(self) -> Dict[str, Dict[str, int]]:
+        """
+        Фасеты по HTTP без браузера
+
+        URL бандла берется из кеша (не старше REPO_URL_TTL) или ищется на
+        страницах героев; сам repo-*.js запрашивается условно (ETag /
+        If-Modified-Since), и при 304 маппинг берется из кеша без разбора.
+
+        Returns:
+            Маппинг или {}, если Cloudflare не пропустил запрос или бандл не разобран
+        """
+        try:
+            with self._http_session() as session, span("facets.http", source="dotabuff"):
+                repo_js_url = self.http_cache.recall("repo_url", REPO_URL_TTL)
+                if not repo_js_url:
+                    repo_js_url = self._discover_dotabuff_repo_js_http(session)
+                    self.http_cache.remember("repo_url", repo_js_url)
+                mapping = self._fetch_repo_mapping(session, repo_js_url)
+                self._last_repo_url = repo_js_url
             return mapping
+        except Exception as e:
+            self.logger.info(f"Фасеты по HTTP не получены, нужен браузер: {e}")
+            return {}
+
+    def _fetch_repo_mapping(self, session, repo_js_url: str) -> Dict[str, Dict[str, int]]:
+        """Условная загрузка repo-*.js и маппинг из него (или из кеша при 304)"""
+        cached = self.http_cache.payload(repo_js_url)
+        headers = {"Referer": DOTABUFF_HERO_URL}
+        if cached:
+            headers.update(self.http_cache.validators(repo_js_url))
+        resp = session.get(repo_js_url, headers=headers, timeout=15)
+        if resp.status_code == 304 and cached:
+            self.logger.info("Бандл repo-*.js не изменился — маппинг фасетов из кеша")
+            FacetAPIParser._shared_aliases = cached.get("aliases") or {}
+            return cached["mapping"]
+        resp.raise_for_status()
+        mapping = self._mapping_from_repo_js(resp.text)
+        self.http_cache.store(repo_js_url, resp.headers, self._cache_payload(mapping))
+        self.logger.info("Фасеты Dotabuff получены по HTTP")
+        return mapping
+
+    def _mapping_from_repo_js(self, js_content: str) -> Dict[str, Dict[str, int]]:
+        """Маппинг {герой: {фасет: номер}} из содержимого repo-*.js"""
+        # Парсим фасеты из JS
+        facets = self._extract_facets_from_repo(js_content)
+        if not facets:
+            raise RuntimeError("Не удалось извлечь фасеты из JS")
+
+        self.logger.info(f"Найдено {len(facets)} фасетов в JS")
+
+        # Строим маппинг напрямую из фасетов (и алиасы для индекса имен)
+        aliases: Dict[str, Dict[str, int]] = {}
+        mapping = self._build_mapping_from_facets(facets, aliases)
+        FacetAPIParser._shared_aliases = aliases
+        return mapping
+
+    def _cache_payload(self, mapping: Dict[str, Dict[str, int]]) -> dict:
+        """Что сохраняется в HTTP-кеше для бандла: маппинг и алиасы"""
+        return {"mapping": mapping, "aliases": FacetAPIParser._shared_aliases}
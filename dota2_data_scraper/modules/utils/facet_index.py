@@ -0,0 +1,137 @@
+"""
+Индекс имен фасетов для сопоставления названий с dota2protracker и Dotabuff.
+
+Строится один раз на загруженный маппинг {герой: {фасет: номер}} и отвечает
+на запрос уровнями по убыванию уверенности: точное имя, нормализованное имя
+(регистр, пунктуация, диакритика), алиас из описания, "Facet N", вхождение
+подстроки и нечеткое сравнение по триграммам.
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+# Уверенность для каждого уровня (у нечеткого — мера сходства, не больше FUZZY_CAP)
+TIER_CONFIDENCE = {
+    "exact": 1.0,
+    "normalized": 0.95,
+    "alias": 0.9,
+    "ordinal": 0.85,
+    "substring": 0.8,
+}
+FUZZY_CAP = 0.75
+# Минимальное сходство триграмм (коэффициент Дайса) для нечеткого совпадения
+FUZZY_THRESHOLD = 0.5
+
+_NON_WORD = re.compile(r"[^\w]+")
+_ORDINAL = re.compile(r"^facet\s*(\d+)\+?$")
+
+
+class FacetMatch(NamedTuple):
+    """Найденный фасет: имя из маппинга, номер, уровень и уверенность"""
+
+    name: str
+    number: int
+    tier: str
+    confidence: float
+
+
+def normalize_name(value: str) -> str:
+    """Имя без регистра, диакритики и пунктуации: "Nature's Prophet" -> "natures prophet\""""
+    value = unicodedata.normalize("NFKD", value)
+    value = "".join(ch for ch in value if not unicodedata.combining(ch))
+    value = value.casefold().replace("'", "").replace("’", "")
+    return " ".join(_NON_WORD.sub(" ", value).replace("_", " ").split())
+
+
+def trigrams(normalized: str) -> Set[str]:
+    """Триграммы нормализованного имени (с границами слова)"""
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _HeroEntry:
+    __slots__ = ("exact", "normalized", "aliases", "signatures", "numbers")
+
+    def __init__(self):
+        self.exact: Dict[str, int] = {}
+        self.normalized: Dict[str, Tuple[str, int]] = {}
+        self.aliases: Dict[str, Tuple[str, int]] = {}
+        self.signatures: List[Tuple[str, str, int, Set[str]]] = []
+        self.numbers: Dict[int, str] = {}
+
+
+class FacetNameIndex:
+    """Предрассчитанный индекс имен фасетов по героям"""
+
+    def __init__(
+        self,
+        mapping: Dict[str, Dict[str, int]],
+        aliases: Optional[Dict[str, Dict[str, int]]] = None,
+    ):
+        """
+        Args:
+            mapping: {герой: {имя фасета: номер}}
+            aliases: {герой: {алиас: номер}} — например, из описаний фасетов
+        """
+        self._heroes: Dict[str, _HeroEntry] = {}
+        for hero, names in mapping.items():
+            entry = _HeroEntry()
+            for name, number in names.items():
+                norm = normalize_name(name)
+                entry.exact[name] = number
+                entry.normalized.setdefault(norm, (name, number))
+                entry.signatures.append((norm, name, number, trigrams(norm)))
+                entry.numbers.setdefault(number, name)
+            for alias, number in ((aliases or {}).get(hero) or {}).items():
+                name = entry.numbers.get(number)
+                if name is not None:
+                    entry.aliases.setdefault(normalize_name(alias), (name, number))
+            self._heroes[normalize_name(hero)] = entry
+
+    def __len__(self) -> int:
+        return len(self._heroes)
+
+    def lookup(
+        self, hero: str, facet_name: str, min_confidence: float = 0.0
+    ) -> Optional[FacetMatch]:
+        """
+        Фасет героя по имени
+
+        Returns:
+            FacetMatch с уверенностью не ниже min_confidence или None
+        """
+        entry = self._heroes.get(normalize_name(hero)) if isinstance(hero, str) else None
+        if entry is None or not isinstance(facet_name, str) or not facet_name.strip():
+            return None
+        match = self._lookup(entry, facet_name)
+        if match is None or match.confidence < min_confidence:
+            return None
+        return match
+
+    def _lookup(self, entry: _HeroEntry, facet_name: str) -> Optional[FacetMatch]:
+        if facet_name in entry.exact:
+            return FacetMatch(facet_name, entry.exact[facet_name], "exact", TIER_CONFIDENCE["exact"])
+        norm = normalize_name(facet_name)
+        if not norm:
+            return None
+        for tier, table in (("normalized", entry.normalized), ("alias", entry.aliases)):
+            if norm in table:
+                name, number = table[norm]
+                return FacetMatch(name, number, tier, TIER_CONFIDENCE[tier])
+        ordinal = _ORDINAL.match(norm)
+        if ordinal:
+            number = int(ordinal.group(1))
+            if number in entry.numbers:
+                return FacetMatch(entry.numbers[number], number, "ordinal", TIER_CONFIDENCE["ordinal"])
+            return None
+        for known, name, number, _ in entry.signatures:
+            if norm in known or known in norm:
+                return FacetMatch(name, number, "substring", TIER_CONFIDENCE["substring"])
+        grams = trigrams(norm)
+        best: Optional[FacetMatch] = None
+        for _, name, number, signature in entry.signatures:
+            score = 2 * len(grams & signature) / (len(grams) + len(signature))
+            if score >= FUZZY_THRESHOLD and (best is None or score * FUZZY_CAP > best.confidence):
+                best = FacetMatch(name, number, "fuzzy", round(score * FUZZY_CAP, 3))
+        return best
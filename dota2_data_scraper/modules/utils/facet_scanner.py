@@ -0,0 +1,199 @@
+"""
+Однопроходный поиск массива фасетов в бандле Dotabuff repo-*.js.
+
+Вместо нескольких нежадных регулярок с re.DOTALL по всему бандлу якорем
+служит ключ "hero_id": для него берется охватывающий литерал JSON.parse(`...`)
+(граница — по неэкранированной кавычке, экранирование литерала снимается как
+в JS) или охватывающий массив (граница — балансировкой скобок с учетом строк).
+Найденный фрагмент декодируется json.loads один раз и проверяется по схеме
+фасета (hero_id, name, hero_variant, deprecated).
+"""
+
+import json
+import logging
+import re
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Вызов JSON.parse со строковым литералом — основное место фасетов в бандле
+PARSE_ANCHOR = "JSON.parse("
+# Ключ, по которому ищется массив фасетов
+HERO_ID_KEY = '"hero_id"'
+# Сколько ближайших '[' перед ключом hero_id проверять как начало массива
+MAX_ARRAY_STARTS = 8
+# Доля записей, подходящих по схеме, чтобы массив считался массивом фасетов
+MIN_VALID_SHARE = 0.9
+
+# Символы, меняющие состояние сканера: скобки, кавычки и экранирование
+_TOKEN = re.compile(r'[\[\]"\\]')
+# Конец строкового литерала JS для каждой кавычки
+_LITERAL_END = {q: re.compile(r"[%s\\]" % q) for q in "`'\""}
+# Escape-последовательности строковых литералов JS
+_JS_ESCAPE = re.compile(r"\\(u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|.)", re.DOTALL)
+_JS_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "0": "\0"}
+
+
+def balanced_array_end(text: str, start: int) -> int:
+    """
+    Индекс за закрывающей ']' массива JSON, начинающегося в text[start] == '['
+
+    Скобки внутри строк не учитываются; между значимыми символами сканер
+    перескакивает регуляркой, поэтому проход линейный и без возвратов.
+
+    Returns:
+        Индекс после ']' или -1, если массив не закрыт
+    """
+    depth = 0
+    in_string = False
+    pos = start
+    while True:
+        m = _TOKEN.search(text, pos)
+        if m is None:
+            return -1
+        ch = m.group()
+        pos = m.end()
+        if in_string:
+            if ch == "\\":
+                pos += 1  # Экранированный символ пропускаем
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "[":
+            depth += 1
+        elif ch == "]":
+            depth -= 1
+            if depth == 0:
+                return pos
+
+
+def _is_facet(item) -> bool:
+    if not isinstance(item, dict):
+        return False
+    if not isinstance(item.get("hero_id"), int) or isinstance(item.get("hero_id"), bool):
+        return False
+    if item.get("name") is not None and not isinstance(item.get("name"), str):
+        return False
+    if "hero_variant" in item and not isinstance(item["hero_variant"], int):
+        return False
+    if item.get("deprecated") not in (None, True, False, 0, 1):
+        return False
+    return True
+
+
+def validate_facets(items) -> Optional[List[dict]]:
+    """
+    Проверка массива по схеме фасета
+
+    Returns:
+        Действующие (не deprecated) фасеты или None, если это не массив фасетов
+    """
+    if not isinstance(items, list) or not items:
+        return None
+    valid = [x for x in items if _is_facet(x)]
+    if len(valid) < len(items) * MIN_VALID_SHARE:
+        return None
+    if len(valid) != len(items):
+        logger.debug(f"Пропущено {len(items) - len(valid)} записей фасетов, не подходящих по схеме")
+    active = [x for x in valid if not x.get("deprecated")]
+    return active or None
+
+
+def _unescape_js(raw: str) -> str:
+    """Снимает экранирование строкового литерала JS (то, что сделал бы движок)"""
+    if "\\" not in raw:
+        return raw
+
+    def repl(m):
+        seq = m.group(1)
+        if len(seq) > 1:
+            return chr(int(seq[1:], 16))
+        return _JS_ESCAPES.get(seq, seq)
+
+    return _JS_ESCAPE.sub(repl, raw)
+
+
+def literal_end(text: str, start: int, quote: str) -> int:
+    """Индекс закрывающей кавычки литерала, тело которого начинается в start (-1 — не закрыт)"""
+    pattern = _LITERAL_END[quote]
+    pos = start
+    while True:
+        m = pattern.search(text, pos)
+        if m is None:
+            return -1
+        if m.group() == quote:
+            return m.start()
+        pos = m.end() + 1  # Экранированный символ пропускаем
+
+
+def _decode_json(fragment: str, where: int) -> Optional[List[dict]]:
+    try:
+        return validate_facets(json.loads(fragment))
+    except (json.JSONDecodeError, TypeError) as e:
+        logger.debug(f"Фрагмент у позиции {where} не является JSON: {e}")
+        return None
+
+
+def _decode_parse_literal(text: str, anchor: int) -> Tuple[Optional[List[dict]], int]:
+    """Литерал JSON.parse(...) с позиции anchor; (фасеты или None, конец литерала)"""
+    body = anchor + len(PARSE_ANCHOR)
+    quote = text[body:body + 1]
+    if quote not in _LITERAL_END:
+        return None, -1
+    end = literal_end(text, body + 1, quote)
+    if end == -1:
+        return None, -1
+    content = _unescape_js(text[body + 1:end])
+    if not content.lstrip().startswith("["):
+        return None, end
+    return _decode_json(content, anchor), end
+
+
+def _decode_array(text: str, start: int) -> Tuple[Optional[List[dict]], int]:
+    """Массив JSON с позиции start; (фасеты или None, конец массива)"""
+    end = balanced_array_end(text, start)
+    if end == -1:
+        return None, -1
+    return _decode_json(text[start:end], start), end
+
+
+def extract_facets(js_text: str) -> List[dict]:
+    """
+    Фасеты из текста бандла repo-*.js
+
+    Returns:
+        Список действующих фасетов (пустой, если массив не найден)
+    """
+    tried = set()
+    key = js_text.find(HERO_ID_KEY)
+    while key != -1:
+        resume = key + len(HERO_ID_KEY)
+        # 1) Литерал JSON.parse(`[...]`), охватывающий ключ
+        anchor = js_text.rfind(PARSE_ANCHOR, 0, key)
+        if anchor != -1 and anchor not in tried:
+            tried.add(anchor)
+            facets, end = _decode_parse_literal(js_text, anchor)
+            if facets:
+                return facets
+            if end > key:
+                # Литерал не подошел — ключи внутри него уже проверены
+                key = js_text.find(HERO_ID_KEY, end)
+                continue
+        # 2) Ближайший массив, охватывающий ключ
+        start = key
+        for _ in range(MAX_ARRAY_STARTS):
+            start = js_text.rfind("[", 0, start)
+            if start == -1:
+                break
+            if start in tried:
+                continue
+            tried.add(start)
+            facets, end = _decode_array(js_text, start)
+            if facets:
+                return facets
+            if end > key:
+                resume = max(resume, end)
+                break
+        key = js_text.find(HERO_ID_KEY, resume)
+    return []
@@ -0,0 +1,163 @@
+"""
+Снимки маппинга фасетов по версии бандла Dotabuff.
+
+Каждый успешно полученный маппинг сохраняется под ключом бандла
+(repo-<хеш> из имени repo-*.js) в configs/facet_snapshots/. При старте
+берется самый свежий локальный снимок. Поставляемый с репозиторием снимок
+(configs/facets_bundled.json) собран из обработанных данных приложения, а не
+из бандла Dotabuff, и неполон (у части героев известен один фасет), поэтому
+он используется, только когда Dotabuff недоступен.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_DIR = os.path.join("configs", "facet_snapshots")
+BUNDLED_SNAPSHOT_PATH = os.path.join("configs", "facets_bundled.json")
+# Сколько последних снимков хранить
+MAX_SNAPSHOTS = 5
+
+_BUNDLE_KEY = re.compile(r"(repo-[A-Za-z0-9_-]+)\.js")
+_SAFE_KEY = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+@dataclass
+class FacetSnapshot:
+    """Маппинг фасетов с ключом бандла и источником"""
+
+    key: str
+    created_at: str
+    source: str
+    mapping: Dict[str, Dict[str, int]]
+    aliases: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    path: Optional[str] = None
+
+    @property
+    def bundled(self) -> bool:
+        return self.source == "bundled"
+
+
+def bundle_key(repo_url: Optional[str], mapping: Optional[Dict] = None) -> str:
+    """
+    Ключ снимка: repo-<хеш> из URL бандла или хеш самого маппинга
+
+    Args:
+        repo_url: URL repo-*.js (None — неизвестен)
+        mapping: Маппинг, из которого строится ключ, если URL неизвестен
+    """
+    m = _BUNDLE_KEY.search(repo_url or "")
+    if m:
+        return m.group(1)
+    digest = hashlib.sha1(
+        json.dumps(mapping or {}, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()[:12]
+    return f"mapping-{digest}"
+
+
+def _read_snapshot(path: str) -> Optional[FacetSnapshot]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data.get("mapping"), dict) or not data["mapping"]:
+            return None
+        return FacetSnapshot(
+            key=data.get("key", ""),
+            created_at=data.get("created_at", ""),
+            source=data.get("source", ""),
+            mapping=data["mapping"],
+            aliases=data.get("aliases") or {},
+            path=path,
+        )
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Не удалось прочитать снимок фасетов {path}: {e}")
+        return None
+
+
+class FacetSnapshotStore:
+    """Локальные снимки маппинга фасетов + поставляемый снимок"""
+
+    def __init__(
+        self,
+        root: str = DEFAULT_SNAPSHOT_DIR,
+        bundled_path: Optional[str] = BUNDLED_SNAPSHOT_PATH,
+    ):
+        self.root = root
+        self.bundled_path = bundled_path
+        self._lock = threading.Lock()
+
+    def _paths(self) -> List[str]:
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        return [
+            os.path.join(self.root, n)
+            for n in names
+            if n.startswith("facets_") and n.endswith(".json")
+        ]
+
+    def snapshots(self) -> List[FacetSnapshot]:
+        """Локальные снимки, от новых к старым"""
+        found = [s for s in map(_read_snapshot, self._paths()) if s is not None]
+        return sorted(found, key=lambda s: s.created_at, reverse=True)
+
+    def latest(self) -> Optional[FacetSnapshot]:
+        """Самый свежий локальный снимок с Dotabuff; None — их нет"""
+        local = self.snapshots()
+        return local[0] if local else None
+
+    def bundled(self) -> Optional[FacetSnapshot]:
+        """Поставляемый снимок — последний вариант, когда Dotabuff недоступен"""
+        return _read_snapshot(self.bundled_path) if self.bundled_path else None
+
+    def save(
+        self,
+        key: str,
+        mapping: Dict[str, Dict[str, int]],
+        aliases: Optional[Dict[str, Dict[str, int]]] = None,
+        source: str = "dotabuff",
+    ) -> Optional[FacetSnapshot]:
+        """Сохраняет снимок под ключом бандла (атомарно) и удаляет самые старые"""
+        snapshot = FacetSnapshot(
+            key=key,
+            created_at=datetime.now().isoformat(timespec="seconds"),
+            source=source,
+            mapping=mapping,
+            aliases=aliases or {},
+            path=os.path.join(self.root, f"facets_{_SAFE_KEY.sub('_', key)}.json"),
+        )
+        data = {
+            "key": snapshot.key,
+            "created_at": snapshot.created_at,
+            "source": snapshot.source,
+            "mapping": snapshot.mapping,
+            "aliases": snapshot.aliases,
+        }
+        with self._lock:
+            try:
+                os.makedirs(self.root, exist_ok=True)
+                tmp_path = f"{snapshot.path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, snapshot.path)
+            except Exception as e:
+                logger.warning(f"Не удалось сохранить снимок фасетов: {e}")
+                return None
+            for old in self.snapshots()[MAX_SNAPSHOTS:]:
+                try:
+                    os.remove(old.path)
+                except OSError:
+                    pass
+        logger.info(f"Снимок маппинга фасетов сохранен: {key} ({len(mapping)} героев)")
+        return snapshot
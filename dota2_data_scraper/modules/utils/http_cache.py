@@ -0,0 +1,95 @@
+"""
+Кеш HTTP-ответов с валидаторами (ETag / Last-Modified) для условных запросов.
+
+Для каждого URL хранятся валидаторы ответа и уже обработанный результат
+(например, маппинг фасетов из repo-*.js): при 304 Not Modified результат
+берется из кеша без загрузки и разбора тела. Отдельно хранятся значения с
+ограниченным сроком жизни (найденный URL бандла).
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join("configs", "cache", "dotabuff_http.json")
+
+
+class ConditionalCache:
+    """Сохраняемые между запусками валидаторы и результаты по URL"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self._data: Optional[Dict] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict:
+        if self._data is None:
+            self._data = {"responses": {}, "values": {}}
+            try:
+                if os.path.exists(self.path):
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        loaded = json.load(f)
+                    if isinstance(loaded.get("responses"), dict):
+                        loaded.setdefault("values", {})
+                        self._data = loaded
+            except Exception as e:
+                logger.warning(f"Не удалось прочитать HTTP-кеш: {e}")
+        return self._data
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить HTTP-кеш: {e}")
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """Заголовки условного запроса (If-None-Match / If-Modified-Since) для URL"""
+        with self._lock:
+            entry = self._load()["responses"].get(url) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def payload(self, url: str) -> Any:
+        """Сохраненный результат обработки ответа для URL (None — нет)"""
+        with self._lock:
+            entry = self._load()["responses"].get(url) or {}
+        return entry.get("payload")
+
+    def store(self, url: str, response_headers, payload: Any) -> None:
+        """Сохраняет валидаторы ответа и результат его обработки"""
+        headers = response_headers or {}
+        with self._lock:
+            self._load()["responses"][url] = {
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "stored_at": time.time(),
+                "payload": payload,
+            }
+            self._save()
+
+    def remember(self, name: str, value: Any) -> None:
+        """Сохраняет значение с отметкой времени"""
+        with self._lock:
+            self._load()["values"][name] = {"value": value, "at": time.time()}
+            self._save()
+
+    def recall(self, name: str, max_age: float) -> Any:
+        """Значение, если оно сохранено не раньше max_age секунд назад (иначе None)"""
+        with self._lock:
+            entry = self._load()["values"].get(name)
+        if not entry or time.time() - entry.get("at", 0) > max_age:
+            return None
+        return entry.get("value")
@@ -1,53 +1,106 @@
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
 import time
 import logging
 
+from .element_lookup import select_options
+
 logger = logging.getLogger(__name__)
 
+# Сколько ждать появления селекторов на странице, секунды
+SELECT_WAIT_TIMEOUT = 5.0
 
-def select_period_8_days(driver):
-    """
-    Выбирает период "8 days" на странице dota2protracker.com
 
-    Args:
-        driver: WebDriver instance
+def _find_select_with_option(driver, matches):
+    """
+    Ищет <select>, в котором есть опция, удовлетворяющая matches(value, text).
+    Все селекторы и опции читаются одним JS-вызовом.
 
     Returns:
-        bool: True если период успешно выбран, False в противном случае
+        tuple: (элемент select, value найденной опции, value выбранной опции)
+            или (None, None, None)
+    """
+    for select, options in select_options(driver, timeout=SELECT_WAIT_TIMEOUT):
+        selected = next((o[0] for o in options if o[2]), None)
+        for value, text, _ in options:
+            if matches(value or "", text or ""):
+                return select, value, selected
+    return None, None, None
+
+
+def _select_value(driver, matches, label: str) -> bool:
+    """
+    Выбирает опцию в первом подходящем селекторе. Если опция уже выбрана,
+    селектор не трогаем — страница не перезагружает данные.
     """
     try:
-        logger.info("Выбираем период '8 days'...")
-
-        # Ждем появления селектора периода (4-й селектор с опциями периода)
-        wait = WebDriverWait(driver, 10)
-        selects = driver.find_elements(By.CSS_SELECTOR, "select")
-
-        # Ищем селектор с опцией "8 days"
-        period_select = None
-        for select in selects:
-            options = select.find_elements(By.TAG_NAME, "option")
-            for option in options:
-                if option.get_attribute("value") == "8" and "8 days" in option.text:
-                    period_select = select
-                    break
-            if period_select:
-                break
+        logger.info(f"Выбираем {label}...")
 
+        period_select, value, current = _find_select_with_option(driver, matches)
         if not period_select:
-            logger.info("Селектор периода (8 days) не найден на странице — продолжаем без смены периода")
+            logger.info(f"Селектор ({label}) не найден на странице — продолжаем без изменений")
             return False
 
-        # Находим опцию "8 days" и выбираем её
-        select = Select(period_select)
-        select.select_by_value("8")
+        if current == value:
+            logger.info(f"{label} уже выбран")
+            return True
+
+        Select(period_select).select_by_value(value)
 
-        logger.info("Период '8 days' выбран")
+        logger.info(f"{label} выбран")
         time.sleep(2)  # Даем время на обновление данных
         return True
 
     except Exception as e:
-        logger.error(f"Ошибка при выборе периода: {e}")
+        logger.error(f"Ошибка при выборе ({label}): {e}")
         return False
+
+
+def select_period(driver, days) -> bool:
+    """
+    Выбирает период на странице dota2protracker.com
+
+    Args:
+        driver: WebDriver instance
+        days: Количество дней периода (value опции, например 8)
+
+    Returns:
+        bool: True если период выбран (или уже был выбран), False в противном случае
+    """
+    wanted = str(days)
+    return _select_value(
+        driver,
+        lambda value, text: value == wanted and "day" in text.lower(),
+        f"период '{wanted} days'",
+    )
+
+
+def select_bracket(driver, bracket: str) -> bool:
+    """
+    Выбирает фильтр по рангу (bracket) на странице dota2protracker.com
+
+    Args:
+        driver: WebDriver instance
+        bracket: value опции или ее текст (без учета регистра)
+
+    Returns:
+        bool: True если фильтр выбран (или уже был выбран), False в противном случае
+    """
+    wanted = str(bracket).strip().lower()
+    return _select_value(
+        driver,
+        lambda value, text: value.lower() == wanted or text.strip().lower() == wanted,
+        f"ранг '{bracket}'",
+    )
+
+
+def select_period_8_days(driver):
+    """
+    Выбирает период "8 days" на странице dota2protracker.com
+
+    Args:
+        driver: WebDriver instance
+
+    Returns:
+        bool: True если период успешно выбран, False в противном случае
+    """
+    return select_period(driver, 8)
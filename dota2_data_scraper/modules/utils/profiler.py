@@ -0,0 +1,181 @@
+"""
+Профилирование запуска: cProfile (pstats), сэмплированные стеки для flamegraph и tracemalloc
+"""
+
+import cProfile
+import hashlib
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def file_digest(path: str, length: int = 8) -> Optional[str]:
+    """Короткий sha1 содержимого файла или None, если файла нет"""
+    if not os.path.exists(path):
+        return None
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:length]
+
+
+class _StackSampler(threading.Thread):
+    """
+    Периодически снимает стек целевого потока и копит его в формате
+    collapsed stacks (frame;frame;frame count) — его понимают flamegraph.pl и speedscope.
+    """
+
+    def __init__(self, target_thread_id: int, interval: float = 0.005):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.target_thread_id = target_thread_id
+        self.interval = interval
+        self.samples: Dict[str, int] = {}
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target_thread_id)
+            if frame is None:
+                continue
+            stack: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+                )
+                frame = frame.f_back
+            key = ";".join(reversed(stack))
+            self.samples[key] = self.samples.get(key, 0) + 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join(timeout=1)
+
+
+class RunProfiler:
+    """
+    Контекстный менеджер профилирования одного режима CLI.
+
+    Пишет в output_dir файлы с меткой <mode>_<hash входов>_<время>:
+      .pstats      - cProfile (snakeviz, gprof2dot, flameprof)
+      .folded      - сэмплированные стеки для flamegraph
+      _cpu.txt     - топ функций по cumulative time
+      _memory.txt  - топ-N мест аллокаций tracemalloc и пиковая память
+      .json        - метаданные запуска (режим, хэши входов, argv)
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        input_paths: Optional[List[str]] = None,
+        output_dir: str = os.path.join("configs", "profiles"),
+        top_n: int = 25,
+    ):
+        self.mode = mode
+        self.input_paths = input_paths or []
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.input_hashes = {p: file_digest(p) for p in self.input_paths}
+        self.label = self._make_label()
+        self.output_files: List[str] = []
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[_StackSampler] = None
+        self._started = 0.0
+
+    def _make_label(self) -> str:
+        """Метка файлов: режим + общий хэш входов (файлы и аргументы) + время"""
+        h = hashlib.sha1()
+        h.update(" ".join(sys.argv[1:]).encode("utf-8"))
+        for path, digest in sorted(self.input_hashes.items()):
+            h.update(f"{path}={digest}".encode("utf-8"))
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return f"{self.mode}_{h.hexdigest()[:8]}_{timestamp}"
+
+    def __enter__(self):
+        logger.info(f"Профилирование включено: {self.label}")
+        tracemalloc.start(25)
+        self._sampler = _StackSampler(threading.get_ident())
+        self._sampler.start()
+        self._profile = cProfile.Profile()
+        self._started = time.perf_counter()
+        self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._profile.disable()
+        elapsed = time.perf_counter() - self._started
+        self._sampler.stop()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        try:
+            self._write_reports(snapshot, current, peak, elapsed)
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить результаты профилирования: {e}")
+        return False
+
+    def _path(self, suffix: str) -> str:
+        path = os.path.join(self.output_dir, f"{self.label}{suffix}")
+        self.output_files.append(path)
+        return path
+
+    def _write_reports(
+        self, snapshot: tracemalloc.Snapshot, current: int, peak: int, elapsed: float
+    ) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        self._profile.dump_stats(self._path(".pstats"))
+
+        with open(self._path(".folded"), "w", encoding="utf-8") as f:
+            for stack, count in sorted(self._sampler.samples.items()):
+                f.write(f"{stack} {count}\n")
+
+        buf = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=buf)
+        stats.sort_stats("cumulative").print_stats(self.top_n)
+        with open(self._path("_cpu.txt"), "w", encoding="utf-8") as f:
+            f.write(buf.getvalue())
+
+        snapshot = snapshot.filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            )
+        )
+        top_stats = snapshot.statistics("lineno")[: self.top_n]
+        with open(self._path("_memory.txt"), "w", encoding="utf-8") as f:
+            f.write(f"Текущая память: {current / 1024:.1f} KiB\n")
+            f.write(f"Пиковая память: {peak / 1024:.1f} KiB\n")
+            f.write(f"Топ-{self.top_n} мест аллокаций:\n")
+            for i, stat in enumerate(top_stats, 1):
+                frame = stat.traceback[0]
+                f.write(
+                    f"{i:>3}. {frame.filename}:{frame.lineno}: "
+                    f"{stat.size / 1024:.1f} KiB в {stat.count} блоках\n"
+                )
+
+        meta = {
+            "mode": self.mode,
+            "label": self.label,
+            "argv": sys.argv[1:],
+            "input_hashes": self.input_hashes,
+            "elapsed_s": elapsed,
+            "peak_memory_bytes": peak,
+            "samples": sum(self._sampler.samples.values()),
+        }
+        with open(self._path(".json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+
+        logger.info(f"Результаты профилирования сохранены в {self.output_dir} ({self.label})")
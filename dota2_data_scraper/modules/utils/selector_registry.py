@@ -0,0 +1,117 @@
+"""
+Реестр сработавших селекторов и эвристик, привязанный к отпечатку вёрстки сайта.
+
+Для каждой вёрстки запоминается, какой селектор (переключатель фасетов,
+кнопки ролей) или эвристика (поиск строк таблицы) сработали, и в следующий
+раз они пробуются первыми. Полный перебор нужен только после смены вёрстки.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Отпечаток вёрстки: набор подключенных бандлов JS/CSS (меняется при выкладке сайта)
+LAYOUT_FINGERPRINT_JS = """
+const urls = Array.from(document.querySelectorAll(
+    'script[src], link[rel="stylesheet"][href], link[rel="modulepreload"][href]'
+)).map(e => (e.src || e.href || '').split('?')[0]).filter(Boolean);
+return Array.from(new Set(urls)).sort().join('|');
+"""
+
+# Сколько последних вёрсток хранить в реестре
+MAX_LAYOUTS = 5
+
+
+def layout_fingerprint(driver) -> Optional[str]:
+    """
+    Отпечаток вёрстки текущей страницы
+
+    Returns:
+        Короткий sha1 или None, если определить вёрстку не удалось
+    """
+    try:
+        assets = driver.execute_script(LAYOUT_FINGERPRINT_JS)
+    except Exception as e:
+        logger.debug(f"Не удалось определить отпечаток вёрстки: {e}")
+        return None
+    if not isinstance(assets, str) or not assets:
+        return None
+    return hashlib.sha1(assets.encode("utf-8")).hexdigest()[:12]
+
+
+class SelectorRegistry:
+    """Сохраняемый между запусками реестр {вёрстка: {элемент: селектор}}"""
+
+    def __init__(self, path: str = os.path.join("configs", "selector_registry.json")):
+        self.path = path
+        self._data: Optional[Dict] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict:
+        if self._data is None:
+            self._data = {"layouts": {}}
+            try:
+                if os.path.exists(self.path):
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        loaded = json.load(f)
+                    if isinstance(loaded.get("layouts"), dict):
+                        self._data = loaded
+            except Exception as e:
+                logger.warning(f"Не удалось прочитать реестр селекторов: {e}")
+        return self._data
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить реестр селекторов: {e}")
+
+    def get(self, layout: Optional[str], element: str) -> Optional[str]:
+        """Запомненный селектор элемента для вёрстки (None — неизвестен)"""
+        if not layout:
+            return None
+        with self._lock:
+            entry = self._load()["layouts"].get(layout, {})
+            return entry.get("elements", {}).get(element)
+
+    def ordered(self, layout: Optional[str], element: str, candidates: List[str]) -> List[str]:
+        """Кандидаты, где запомненный селектор идет первым"""
+        learned = self.get(layout, element)
+        if learned is None:
+            return list(candidates)
+        return [learned] + [c for c in candidates if c != learned]
+
+    def record(self, layout: Optional[str], element: str, selector: str) -> None:
+        """Запоминает сработавший селектор (запись на диск только при изменении)"""
+        if not layout:
+            return
+        with self._lock:
+            layouts = self._load()["layouts"]
+            entry = layouts.setdefault(layout, {"elements": {}})
+            entry["last_seen"] = datetime.now().isoformat(timespec="seconds")
+            if entry["elements"].get(element) == selector:
+                return
+            entry["elements"][element] = selector
+            logger.info(f"Реестр селекторов: {element} -> {selector} (вёрстка {layout})")
+            # Старые вёрстки не нужны — оставляем только последние
+            for old in sorted(layouts, key=lambda k: layouts[k].get("last_seen", ""))[:-MAX_LAYOUTS]:
+                del layouts[old]
+            self._save()
+
+    def forget(self, layout: Optional[str], element: str) -> None:
+        """Удаляет селектор, который перестал работать"""
+        if not layout:
+            return
+        with self._lock:
+            entry = self._load()["layouts"].get(layout, {})
+            if entry.get("elements", {}).pop(element, None) is not None:
+                logger.info(f"Реестр селекторов: {element} больше не срабатывает")
+                self._save()
@@ -0,0 +1,89 @@
+"""
+Архив снимков HTML таблиц ролей для повторного разбора при изменении логики извлечения
+"""
+
+import gzip
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_SUFFIX = ".html.gz"
+
+
+def snapshot_filename(key: str) -> str:
+    """
+    Имя файла снимка по ключу таблицы "[<period>:<bracket>:]<grouping>:<role>"
+
+    Двоеточия заменяются на "__", пробелы — на "-" (например, facets__pos-1.html.gz)
+    """
+    safe = re.sub(r"[^\w.-]", "-", key.replace(" ", "-").replace(":", "__"))
+    return safe + SNAPSHOT_SUFFIX
+
+
+def parse_snapshot_filename(filename: str) -> Dict[str, Optional[str]]:
+    """
+    Обратное преобразование snapshot_filename
+
+    Returns:
+        Словарь с ключами Period, Bracket, Grouping, Role (None, если не заданы)
+    """
+    name = os.path.basename(filename)
+    for suffix in (SNAPSHOT_SUFFIX, ".html"):
+        if name.endswith(suffix):
+            name = name[: -len(suffix)]
+            break
+    parts = name.split("__")
+    role = parts[-1].replace("-", " ") if parts else None
+    grouping = parts[-2] if len(parts) >= 2 else None
+    period = parts[-4] if len(parts) >= 4 and parts[-4] else None
+    bracket = parts[-3] if len(parts) >= 4 and parts[-3] else None
+    return {"Period": period, "Bracket": bracket, "Grouping": grouping, "Role": role}
+
+
+def list_snapshots(directory: str) -> List[str]:
+    """Все снимки (.html.gz и .html) в директории и ее поддиректориях, по порядку"""
+    found = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(SNAPSHOT_SUFFIX) or name.endswith(".html"):
+                found.append(os.path.join(root, name))
+    return sorted(found)
+
+
+def read_snapshot(path: str) -> str:
+    if path.endswith(".gz"):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return f.read()
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class SnapshotArchive:
+    """Сохраняет HTML каждой снятой таблицы в <root>/<run>/<key>.html.gz"""
+
+    def __init__(self, root: str = os.path.join("configs", "snapshots")):
+        self.root = root
+        self.run_dir: Optional[str] = None
+
+    def start_run(self) -> str:
+        """Новая поддиректория для очередного скрапинга"""
+        self.run_dir = os.path.join(self.root, datetime.now().strftime("%Y%m%d_%H%M%S"))
+        return self.run_dir
+
+    def save(self, key: str, page_source: str) -> Optional[str]:
+        """Сохраняет снимок; ошибки записи не прерывают скрапинг"""
+        try:
+            if self.run_dir is None:
+                self.start_run()
+            os.makedirs(self.run_dir, exist_ok=True)
+            path = os.path.join(self.run_dir, snapshot_filename(key))
+            with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as f:
+                f.write(page_source)
+            return path
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить снимок {key}: {e}")
+            return None
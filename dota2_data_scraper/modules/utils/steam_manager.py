@@ -4,17 +4,37 @@
 
 import os
 import json
+import re
 import shutil
+import hashlib
 import logging
-import winreg
-import win32api
-import win32com.client
 from datetime import datetime
 from typing import List, Optional
 
+from .tracing import span
+
 
 logger = logging.getLogger(__name__)
 
+CONFIG_FILE_NAME = "hero_grid_config.json"
+BACKUP_DIR_NAME = "old_grid"
+# Сколько резервных копий хранить в каждой директории конфигурации
+BACKUP_RETENTION = 10
+
+_BACKUP_NAME = re.compile(r"^hero_grid_config_\d{8}_\d{6}(?:_([0-9a-f]{12}))?\.json$")
+
+
+def file_sha256(path: str) -> Optional[str]:
+    """SHA-256 содержимого файла; None — файла нет или он не читается"""
+    try:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except OSError:
+        return None
+
 
 class SteamManager:
     """Класс для работы с Steam директориями и копирования конфигураций"""
@@ -33,6 +53,12 @@ class SteamManager:
         try:
             logger.info("Поиск Steam директории...")
 
+            # Windows-модули импортируются только здесь: win32com заметно
+            # замедляет старт, а нужен лишь для поиска Steam
+            import winreg
+            import win32api
+            import win32com.client
+
             # Метод 1: Через ярлык в Start Menu
             path1 = f"{os.getenv('APPDATA')}\\Microsoft\\Windows\\Start Menu\\Programs\\Steam\\Steam.lnk"
             if os.path.exists(path1):
@@ -92,12 +118,19 @@ class SteamManager:
             logger.error(f"Ошибка при поиске Steam: {e}")
             return None
 
-    def find_config_dirs(self, steam_path: str) -> List[str]:
+    def find_config_dirs(
+        self,
+        steam_path: str,
+        accounts: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+    ) -> List[str]:
         """
         Поиск директорий с конфигурациями Dota 2
 
         Args:
             steam_path: Путь к Steam
+            accounts: Только эти аккаунты (ID папок userdata); None — все
+            exclude: Аккаунты, которые пропускаются
 
         Returns:
             Список путей к директориям конфигураций
@@ -114,6 +147,10 @@ class SteamManager:
 
             # Проходим по всем пользователям
             for user_id in os.listdir(userdata_dir):
+                if accounts and user_id not in accounts:
+                    continue
+                if exclude and user_id in exclude:
+                    continue
                 config_path = os.path.join(
                     userdata_dir, user_id, "570", "remote", "cfg"
                 )
@@ -130,45 +167,135 @@ class SteamManager:
             logger.error(f"Ошибка при поиске директорий конфигураций: {e}")
             return []
 
-    def backup_existing_config(self, config_dir: str):
+    def backup_existing_config(
+        self, config_dir: str, current_hash: Optional[str] = None
+    ) -> Optional[str]:
         """
         Создание резервной копии существующей конфигурации
 
+        Копия с тем же содержимым (по хешу) не создается повторно — у нее
+        обновляется время изменения, а в old_grid остаются только
+        BACKUP_RETENTION последних копий с хешем в имени.
+
         Args:
             config_dir: Директория с конфигурацией
+            current_hash: SHA-256 текущего файла, если уже посчитан
+
+        Returns:
+            Путь к резервной копии (новой или уже существующей) или None
         """
         try:
-            config_file = os.path.join(config_dir, "hero_grid_config.json")
-            if not os.path.exists(config_file):
-                return
+            config_file = os.path.join(config_dir, CONFIG_FILE_NAME)
+            current_hash = current_hash or file_sha256(config_file)
+            if current_hash is None:
+                return None
 
             # Создаем папку для резервных копий
-            old_grid_dir = os.path.join(config_dir, "old_grid")
+            old_grid_dir = os.path.join(config_dir, BACKUP_DIR_NAME)
             os.makedirs(old_grid_dir, exist_ok=True)
 
-            # Создаем имя файла с датой
+            backups = self._list_backups(old_grid_dir)
+            for path in backups:
+                if self._same_content(path, current_hash):
+                    # Копия текущего состояния — самая свежая для очистки по давности
+                    os.utime(path)
+                    logger.debug(f"Резервная копия с тем же содержимым уже есть: {path}")
+                    return path
+
+            # Имя файла с датой и коротким хешем содержимого
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_file = os.path.join(
-                old_grid_dir, f"hero_grid_config_{timestamp}.json"
+                old_grid_dir, f"hero_grid_config_{timestamp}_{current_hash[:12]}.json"
             )
 
             # Копируем файл
             shutil.copy2(config_file, backup_file)
             logger.info(f"Создана резервная копия: {backup_file}")
 
+            self._prune_backups(old_grid_dir)
+            return backup_file
+
         except Exception as e:
             logger.warning(f"Не удалось создать резервную копию в {config_dir}: {e}")
+            return None
 
-    def copy_config_to_steam(self, config_file_path: str) -> bool:
+    @staticmethod
+    def _list_backups(old_grid_dir: str, hashed_only: bool = False) -> List[str]:
+        """
+        Резервные копии в old_grid, от новых к старым (по времени изменения)
+
+        Args:
+            hashed_only: Только копии с хешем содержимого в имени
+        """
+        try:
+            names = os.listdir(old_grid_dir)
+        except FileNotFoundError:
+            return []
+        paths = []
+        for name in names:
+            m = _BACKUP_NAME.match(name)
+            if m and (m.group(1) or not hashed_only):
+                paths.append(os.path.join(old_grid_dir, name))
+        return sorted(paths, key=lambda p: (os.path.getmtime(p), p), reverse=True)
+
+    @staticmethod
+    def _same_content(path: str, content_hash: str) -> bool:
+        """Совпадает ли резервная копия с содержимым: по хешу в имени, у старых копий — по файлу"""
+        m = _BACKUP_NAME.match(os.path.basename(path))
+        if m and m.group(1):
+            return content_hash.startswith(m.group(1))
+        return file_sha256(path) == content_hash
+
+    def _prune_backups(self, old_grid_dir: str) -> None:
+        """
+        Удаляет копии с хешем в имени сверх BACKUP_RETENTION (самые старые);
+        копии прежнего формата без хеша не трогаются
+        """
+        for path in self._list_backups(old_grid_dir, hashed_only=True)[BACKUP_RETENTION:]:
+            try:
+                os.remove(path)
+                logger.debug(f"Удалена старая резервная копия: {path}")
+            except OSError as e:
+                logger.warning(f"Не удалось удалить резервную копию {path}: {e}")
+
+    @staticmethod
+    def _write_atomically(source: str, target: str) -> None:
+        """Копирует source в target через временный файл и os.replace"""
+        tmp_path = f"{target}.tmp"
+        try:
+            shutil.copy2(source, tmp_path)
+            os.replace(tmp_path, target)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def copy_config_to_steam(
+        self,
+        config_file_path: str,
+        accounts: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+    ) -> bool:
         """
         Копирование конфигурации в Steam директории
 
         Args:
             config_file_path: Путь к файлу конфигурации
+            accounts: Только эти аккаунты (ID папок userdata); None — все
+            exclude: Аккаунты, которые пропускаются (закреплены за другим профилем)
 
         Returns:
             True если успешно скопировано
         """
+        with span("steam.copy"):
+            return self._copy_config_to_steam(config_file_path, accounts, exclude)
+
+    def _copy_config_to_steam(
+        self,
+        config_file_path: str,
+        accounts: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+    ) -> bool:
+        """Тело copy_config_to_steam (под спаном steam.copy)"""
         try:
             logger.info("Начало копирования конфигурации в Steam...")
 
@@ -176,37 +303,47 @@ class SteamManager:
                 logger.error(f"Файл конфигурации не найден: {config_file_path}")
                 return False
 
-            # Ищем Steam
-            self.steam_path = self.find_steam_path()
+            # Ищем Steam (один раз на экземпляр — профилей может быть несколько)
+            self.steam_path = self.steam_path or self.find_steam_path()
             if not self.steam_path:
                 logger.error("Steam не найден, пропускаем копирование")
                 return False
 
             # Ищем директории конфигураций
-            self.config_dirs = self.find_config_dirs(self.steam_path)
+            self.config_dirs = self.find_config_dirs(self.steam_path, accounts, exclude)
             if not self.config_dirs:
                 logger.error("Директории конфигураций Dota 2 не найдены")
                 return False
 
-            # Копируем в каждую директорию
+            # Копируем в каждую директорию, где содержимое отличается
+            source_hash = file_sha256(config_file_path)
             success_count = 0
+            unchanged_count = 0
             for config_dir in self.config_dirs:
                 try:
+                    target_file = os.path.join(config_dir, CONFIG_FILE_NAME)
+                    target_hash = file_sha256(target_file)
+                    if target_hash is not None and target_hash == source_hash:
+                        unchanged_count += 1
+                        logger.info(f"Конфигурация не изменилась: {config_dir}")
+                        continue
+
                     # Создаем резервную копию
-                    self.backup_existing_config(config_dir)
+                    if target_hash is not None:
+                        self.backup_existing_config(config_dir, target_hash)
 
-                    # Копируем новую конфигурацию
-                    target_file = os.path.join(config_dir, "hero_grid_config.json")
-                    shutil.copy2(config_file_path, target_file)
+                    # Копируем новую конфигурацию (атомарно)
+                    self._write_atomically(config_file_path, target_file)
                     success_count += 1
                     logger.info(f"Конфигурация скопирована в: {config_dir}")
 
                 except Exception as e:
                     logger.warning(f"Не удалось скопировать в {config_dir}: {e}")
 
-            if success_count > 0:
+            if success_count + unchanged_count > 0:
                 logger.info(
                     f"✅ Конфигурация скопирована в {success_count} директорий Steam"
+                    f" (без изменений: {unchanged_count})"
                 )
                 return True
             else:
@@ -0,0 +1,74 @@
+"""
+Отпечатки таблиц ролей для определения существенных изменений меты
+"""
+
+import hashlib
+import math
+from typing import Dict, List
+
+import pandas as pd
+
+# Шаг округления винрейта (п.п.) и относительный шаг корзины матчей:
+# колебания внутри шага не считаются существенным изменением
+WR_STEP = 0.5
+MATCHES_BUCKET_RATIO = 1.10
+
+
+def _wr_bucket(value) -> str:
+    try:
+        v = float(value)
+    except (TypeError, ValueError):
+        return ""
+    if math.isnan(v):
+        return ""
+    return f"{round(v / WR_STEP) * WR_STEP:.1f}"
+
+
+def _matches_bucket(value) -> str:
+    try:
+        v = float(value)
+    except (TypeError, ValueError):
+        return ""
+    if math.isnan(v) or v <= 0:
+        return "0"
+    return str(int(math.log(v) / math.log(MATCHES_BUCKET_RATIO)))
+
+
+def dataframe_fingerprints(df: pd.DataFrame, grouping: str) -> Dict[str, str]:
+    """
+    Отпечаток каждой таблицы роли: набор (герой, фасет) + округленные WR и матчи.
+
+    Args:
+        df: DataFrame со столбцами Hero, Role и (опционально) Facet, WR, Matches
+        grouping: Тип таблицы ("facets" или "no_facets"), входит в ключ
+
+    Returns:
+        Словарь {"<grouping>:<role>": sha1}
+    """
+    if df is None or df.empty or "Role" not in df.columns or "Hero" not in df.columns:
+        return {}
+    wr_col = "WR" if "WR" in df.columns else ("Win Rate" if "Win Rate" in df.columns else None)
+    result: Dict[str, str] = {}
+    for role, part in df.groupby("Role", sort=True):
+        rows: List[str] = []
+        for _, row in part.iterrows():
+            rows.append(
+                "|".join(
+                    [
+                        str(row.get("Hero", "")),
+                        str(row.get("Facet", "")),
+                        _wr_bucket(row.get(wr_col)) if wr_col else "",
+                        _matches_bucket(row.get("Matches")),
+                    ]
+                )
+            )
+        rows.sort()
+        digest = hashlib.sha1("\n".join(rows).encode("utf-8")).hexdigest()
+        result[f"{grouping}:{role}"] = digest
+    return result
+
+
+def changed_keys(old: Dict[str, str], new: Dict[str, str]) -> List[str]:
+    """Ключи таблиц, отпечаток которых изменился, появился или исчез"""
+    keys = set(old) | set(new)
+    return sorted(k for k in keys if old.get(k) != new.get(k))
@@ -0,0 +1,213 @@
+"""
+Трассировка этапов работы: спаны по стадиям, счётчики WebDriver round-trip и JSON-отчёт
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    """Один замер стадии"""
+
+    name: str
+    start: float  # Смещение от старта трассировки, секунды
+    duration: float = 0.0
+    parent: Optional[str] = None
+    thread: str = ""
+    attrs: Dict[str, Any] = field(default_factory=dict)
+    round_trips: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    error: Optional[str] = None
+
+
+class Tracer:
+    """
+    Сборщик спанов. Стек активных спанов свой у каждого потока, поэтому
+    команды WebDriver приписываются самой вложенной стадии текущего потока.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._t0 = time.perf_counter()
+        self.started_at = datetime.now()
+        self.spans: List[Span] = []
+        self.commands: Dict[str, int] = {}
+        self.unattributed = {"round_trips": 0, "bytes_sent": 0, "bytes_received": 0}
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+        return stack
+
+    @contextmanager
+    def span(self, name: str, **attrs) -> Iterator[Span]:
+        """Замер стадии: with tracer.span("page.navigate", url=url): ..."""
+        stack = self._stack()
+        current = Span(
+            name=name,
+            start=time.perf_counter() - self._t0,
+            parent=stack[-1].name if stack else None,
+            thread=threading.current_thread().name,
+            attrs=attrs,
+        )
+        stack.append(current)
+        started = time.perf_counter()
+        try:
+            yield current
+        except BaseException as e:
+            current.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            current.duration = time.perf_counter() - started
+            stack.pop()
+            with self._lock:
+                self.spans.append(current)
+
+    def record_command(self, command: str, bytes_sent: int, bytes_received: int) -> None:
+        """Учёт одного round-trip к WebDriver в активной стадии текущего потока"""
+        stack = self._stack()
+        with self._lock:
+            self.commands[command] = self.commands.get(command, 0) + 1
+            if stack:
+                target = stack[-1]
+                target.round_trips += 1
+                target.bytes_sent += bytes_sent
+                target.bytes_received += bytes_received
+            else:
+                self.unattributed["round_trips"] += 1
+                self.unattributed["bytes_sent"] += bytes_sent
+                self.unattributed["bytes_received"] += bytes_received
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Агрегаты по имени стадии: количество, суммарное/максимальное время, трафик"""
+        with self._lock:
+            spans = list(self.spans)
+        stages: Dict[str, Dict[str, float]] = {}
+        for s in spans:
+            agg = stages.setdefault(
+                s.name,
+                {
+                    "count": 0,
+                    "total_s": 0.0,
+                    "max_s": 0.0,
+                    "round_trips": 0,
+                    "bytes_sent": 0,
+                    "bytes_received": 0,
+                    "errors": 0,
+                },
+            )
+            agg["count"] += 1
+            agg["total_s"] += s.duration
+            agg["max_s"] = max(agg["max_s"], s.duration)
+            agg["round_trips"] += s.round_trips
+            agg["bytes_sent"] += s.bytes_sent
+            agg["bytes_received"] += s.bytes_received
+            if s.error:
+                agg["errors"] += 1
+        return dict(sorted(stages.items(), key=lambda kv: kv[1]["total_s"], reverse=True))
+
+    def to_report(self) -> Dict[str, Any]:
+        """Полный отчёт в виде словаря (для JSON)"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+            commands = dict(self.commands)
+            unattributed = dict(self.unattributed)
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "wall_time_s": time.perf_counter() - self._t0,
+            "stages": self.summary(),
+            "commands": dict(sorted(commands.items(), key=lambda kv: kv[1], reverse=True)),
+            "unattributed": unattributed,
+            "spans": [asdict(s) for s in spans],
+        }
+
+    def write_report(
+        self, output_dir: str = os.path.join("configs", "timings"), filename: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Сохраняет JSON-отчёт о таймингах
+
+        Returns:
+            Путь к файлу отчёта или None при ошибке
+        """
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            if filename is None:
+                filename = f"timing_{self.started_at.strftime('%Y%m%d_%H%M%S')}.json"
+            path = os.path.join(output_dir, filename)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.to_report(), f, indent=2, ensure_ascii=False, default=str)
+            logger.info(f"Отчёт о таймингах сохранён в {path}")
+            return path
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить отчёт о таймингах: {e}")
+            return None
+
+
+def _payload_size(payload: Any) -> int:
+    """Примерный размер полезной нагрузки команды WebDriver в байтах"""
+    if payload is None:
+        return 0
+    if isinstance(payload, str):
+        return len(payload)
+    try:
+        return len(json.dumps(payload, default=str))
+    except Exception:
+        return 0
+
+
+def instrument_driver(driver, tracer: Optional[Tracer] = None):
+    """
+    Оборачивает command_executor драйвера: каждый вызов execute() считается
+    как round-trip и приписывается активной стадии трассировки.
+    """
+    executor = getattr(driver, "command_executor", None)
+    if executor is None or getattr(executor, "_traced", False) is True:
+        return driver
+    original_execute = executor.execute
+
+    def traced_execute(command, params=None):
+        response = original_execute(command, params)
+        value = response.get("value") if isinstance(response, dict) else response
+        (tracer or get_tracer()).record_command(
+            str(command), _payload_size(params), _payload_size(value)
+        )
+        return response
+
+    executor.execute = traced_execute
+    executor._traced = True
+    return driver
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Текущий трассировщик процесса"""
+    return _tracer
+
+
+def reset_tracer() -> Tracer:
+    """Начинает новую трассировку (вызывается в начале каждого запуска)"""
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def span(name: str, **attrs):
+    """Сокращение для get_tracer().span(...)"""
+    return get_tracer().span(name, **attrs)
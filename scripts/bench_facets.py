@@ -0,0 +1,136 @@
+"""
+Бенчмарк извлечения фасетов из бандла Dotabuff repo-*.js.
+
+Сравнивает прежний перебор регулярок с re.DOTALL и однопроходный сканер
+(modules/utils/facet_scanner.py) по времени и пиковой памяти (tracemalloc).
+Бандл — записанный repo-*.js (--bundle) или синтетический того же вида:
+несколько мегабайт минифицированного JS с JSON.parse(`[...]`) фасетов ближе
+к концу (с экранированием, как в настоящем шаблонном литерале). На синтетическом
+бандле сканер обязан вернуть ровно исходные фасеты, на записанном — то же, что
+прежний перебор регулярок; код возврата 1, если это не так.
+
+    python scripts/bench_facets.py [--bundle repo.js] [--size-mb 4] [--repeats 3]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# Паттерны, которые использовались до однопроходного сканера
+LEGACY_PATTERNS = [
+    r"const\s+f\s*=\s*JSON\.parse\(`(\[.*?\])`\)",
+    r"JSON\.parse\(`(\[.*?\])`\)",
+    r"const\s+\w+\s*=\s*(\[.*?\])",
+    r"facets?\s*:\s*(\[.*?\])",
+    r"f\s*=\s*(\[.*?\])",
+]
+
+
+def legacy_extract(js_text: str) -> list:
+    for pattern in LEGACY_PATTERNS:
+        for match in re.findall(pattern, js_text, re.DOTALL):
+            try:
+                facets = json.loads(match)
+            except (json.JSONDecodeError, TypeError):
+                continue
+            if isinstance(facets, list) and facets:
+                valid = [x for x in facets if not x.get("deprecated")]
+                if valid:
+                    return valid
+    return []
+
+
+def build_bundle(size_mb: float = 4.0, heroes: int = 126):
+    """
+    Синтетический бандл: шум минифицированного JS + массив фасетов
+
+    Returns:
+        (текст бандла, ожидаемые действующие фасеты)
+    """
+    facets = [
+        {
+            "id": hero * 10 + variant,
+            "hero_id": hero,
+            "name": f"Facet [{variant}] \"{hero}\"",
+            "hero_variant": variant,
+            "slug": f"hero-{hero}-facet-{variant}",
+            "deprecated": variant == 3,
+            "description": "Grants {bonus} [x] of `something`",
+        }
+        for hero in range(1, heroes + 1)
+        for variant in range(1, 4)
+    ]
+    chunk = (
+        'function a(e,t){return e.map(n=>[n,t[n]]).filter(([k,v])=>v!=null)}'
+        'const o=[{"k":1,"v":[2,3]},{"k":4}],s={items:[1,2,[3,4]],label:"x]"};'
+        'var u=JSON.parse(`[{"id":1,"kind":"item"}]`);'
+    )
+    noise = chunk * int(size_mb * 1024 * 1024 / len(chunk))
+    payload = json.dumps(facets).replace("\\", "\\\\").replace("`", "\\`")
+    expected = [x for x in facets if not x["deprecated"]]
+    return noise + f"const f=JSON.parse(`{payload}`);" + chunk * 100, expected
+
+
+def _measure(func, text: str, repeats: int):
+    best = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = func(text)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    func(text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def run_benchmark(js_text: str, repeats: int = 3, expected=None) -> dict:
+    from dota2_data_scraper.modules.utils.facet_scanner import extract_facets
+
+    results = {}
+    for name, func in (("legacy_regex", legacy_extract), ("scanner", extract_facets)):
+        facets, seconds, peak = _measure(func, js_text, repeats)
+        results[name] = {"facets": facets, "seconds": seconds, "peak": peak}
+    reference = expected if expected is not None else results["legacy_regex"]["facets"]
+    return {
+        "chars": len(js_text),
+        "results": results,
+        "reference": "исходные фасеты" if expected is not None else "прежний разбор",
+        "identical": results["scanner"]["facets"] == reference,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bundle", default=None, help="Записанный repo-*.js")
+    parser.add_argument("--size-mb", type=float, default=4.0)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    expected = None
+    if args.bundle:
+        with open(args.bundle, "r", encoding="utf-8") as f:
+            js_text = f.read()
+    else:
+        js_text, expected = build_bundle(args.size_mb)
+
+    res = run_benchmark(js_text, args.repeats, expected)
+    print(f"Бандл: {res['chars'] / 1024 / 1024:.1f} МБ")
+    for name, r in res["results"].items():
+        print(
+            f"  {name:<13} {r['seconds'] * 1000:8.1f} мс, пик памяти "
+            f"{r['peak'] / 1024:8.0f} КБ, фасетов {len(r['facets'])}"
+        )
+    print(f"Сканер совпадает с эталоном ({res['reference']}): {res['identical']}")
+    return 0 if res["identical"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
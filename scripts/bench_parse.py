@@ -0,0 +1,100 @@
+"""
+Бенчмарк разбора таблицы роли.
+
+Строит синтетическую страницу в вёрстке dota2protracker (Svelte-страница с
+большим количеством разметки вокруг таблицы thead/tbody, grid-cols-14) и
+сравнивает разбор всей страницы с разбором только области таблицы. Результаты
+обязаны совпадать; код возврата 1, если это не так.
+
+    python scripts/bench_parse.py [--rows 130] [--repeats 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+HEADERS = ["Hero", "Facet", "Matches", "WR", "Pick %", "D2PT Rating", "Lane %",
+           "Lane WR", "Early WR", "Late WR", "Duration", "KDA", "GPM", "XPM"]
+
+
+def _row(i: int) -> str:
+    cells = [
+        f'<div class="flex gap-2"><img alt="Hero {i}" src="/h/{i}.png"/>'
+        f'<span>Hero {i}</span></div>',
+        f'<div class="group relative"><div class="font-bold truncate">Facet {i % 3}</div>'
+        f'<div class="tooltip" data-tip="Facet {i % 3}"></div></div>',
+        f'<div><span>{1000 + i}</span></div>',
+        f'<div><span>{45 + (i % 10) / 2:.1f}%</span></div>',
+    ]
+    cells += [f"<div><span>{i}.{j}</span></div>" for j in range(len(HEADERS) - len(cells))]
+    return (f'<div class="grid grid-cols-14 items-center hover:bg-white/5" '
+            f'style="height: 40px">{"".join(cells)}</div>')
+
+
+def build_page(rows: int = 130, noise_blocks: int = 1500) -> str:
+    """Синтетическая страница: таблица + шум вокруг (навигация, карточки, скрипты)"""
+    header = "".join(
+        f'<div class="flex"><button class="sort svelte-1x2y3z">{h}</button></div>'
+        for h in HEADERS
+    )
+    noise = "".join(
+        f'<div class="card svelte-abc{n}"><div class="title"><span>Item {n}</span></div>'
+        f'<div class="body"><p>Lorem ipsum <a href="/x/{n}">link</a></p>'
+        f'<img alt="icon {n}" src="/i/{n}.png"/></div></div>'
+        for n in range(noise_blocks)
+    )
+    script = "<script>" + ("var x = {a: 1, b: [1, 2, 3]};" * 2000) + "</script>"
+    table = (
+        '<div class="table-wrapper">'
+        f'<div class="thead sticky top-0 grid grid-cols-14">{header}</div>'
+        f'<div class="tbody">{"".join(_row(i) for i in range(rows))}</div>'
+        "</div>"
+    )
+    return (f"<html><head>{script}</head><body><nav>{noise[: len(noise) // 3]}</nav>"
+            f"<main>{table}</main><footer>{noise}</footer></body></html>")
+
+
+def run_benchmark(rows: int = 130, repeats: int = 5) -> dict:
+    from dota2_data_scraper.modules.scrapers.hero_scraper import HeroScraper
+
+    scraper = HeroScraper(parse_workers=0)
+    page = build_page(rows)
+    timings = {}
+    frames = {}
+    for name, slice_region in (("full_page", False), ("table_region", True)):
+        best = None
+        for _ in range(repeats):
+            started = time.perf_counter()
+            frames[name] = scraper._parse_table_html(page, slice_region=slice_region)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+    return {
+        "parser": scraper.html_parser,
+        "page_chars": len(page),
+        "rows": len(frames["table_region"]),
+        "timings": timings,
+        "speedup": timings["full_page"] / timings["table_region"],
+        "identical": frames["full_page"].equals(frames["table_region"]),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=130)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    res = run_benchmark(args.rows, args.repeats)
+    print(f"Бэкенд: {res['parser']}, страница {res['page_chars'] / 1024:.0f} КБ, строк {res['rows']}")
+    for name, seconds in res["timings"].items():
+        print(f"  {name:<13} {seconds * 1000:8.1f} мс")
+    print(f"Ускорение: x{res['speedup']:.1f}, результаты совпадают: {res['identical']}")
+    return 0 if res["identical"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
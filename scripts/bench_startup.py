@@ -0,0 +1,89 @@
+"""
+Бенчмарк холодного старта CLI.
+
+Для каждого режима запускает чистый интерпретатор, замеряет время до готовности
+режима и проверяет, что не подгружены лишние тяжелые модули. Код возврата 1,
+если бюджет времени превышен или режим импортирует то, что ему не нужно.
+
+    python scripts/bench_startup.py
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PKG_DIR = os.path.join(ROOT_DIR, "dota2_data_scraper")
+
+# Бюджет холодного старта для режимов без браузера, секунды
+STARTUP_BUDGET_SECONDS = 1.0
+
+BROWSER_MODULES = ["selenium", "webdriver_manager", "bs4"]
+
+# Режим -> (код запуска, модули, которые не должны быть загружены)
+CASES = {
+    # Разбор аргументов CLI: не должен трогать ни браузер, ни pandas
+    "cli": (
+        "import main; main.SCRAPING_MODES",
+        BROWSER_MODULES + ["pandas"],
+    ),
+    # Режим --config: только pandas/JSON
+    "config": (
+        "import main; from modules.core.config_processor import ConfigProcessor",
+        BROWSER_MODULES + ["win32com"],
+    ),
+}
+
+_PROBE = """
+import sys, json
+sys.path.insert(0, {pkg!r})
+{code}
+print(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}})))
+"""
+
+
+def measure(code: str, repeats: int = 3):
+    """Минимальное время холодного старта и набор загруженных модулей верхнего уровня"""
+    best = None
+    loaded = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(pkg=PKG_DIR, code=code)],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+        loaded = json.loads(out.stdout.strip().splitlines()[-1])
+    return best, loaded
+
+
+def run_benchmark(budget: float = STARTUP_BUDGET_SECONDS) -> dict:
+    """Прогоняет все режимы; возвращает {режим: {seconds, unexpected, ok}}"""
+    results = {}
+    for name, (code, forbidden) in CASES.items():
+        seconds, loaded = measure(code)
+        unexpected = [m for m in forbidden if m in loaded]
+        results[name] = {
+            "seconds": seconds,
+            "unexpected": unexpected,
+            "ok": seconds <= budget and not unexpected,
+        }
+    return results
+
+
+def main() -> int:
+    results = run_benchmark()
+    for name, res in results.items():
+        status = "OK" if res["ok"] else "FAIL"
+        extra = f" лишние модули: {res['unexpected']}" if res["unexpected"] else ""
+        print(f"{status:<5} {name:<8} {res['seconds']:.3f}s (бюджет {STARTUP_BUDGET_SECONDS}s){extra}")
+    return 0 if all(r["ok"] for r in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
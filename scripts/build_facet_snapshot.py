@@ -0,0 +1,63 @@
+"""
+Сборка поставляемого снимка маппинга фасетов (configs/facets_bundled.json).
+
+Снимок строится из последних обработанных данных (configs/processed_heroes.csv:
+Hero, facet_name, facet_number), а не из бандла Dotabuff, поэтому в нем есть
+только фасеты, попавшие в мету (у части героев — один). Он используется, только
+если Dotabuff недоступен ни по HTTP, ни через браузер, и снимков с него еще нет.
+
+    python scripts/build_facet_snapshot.py [--source configs/processed_heroes.csv]
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+
+def build_mapping(df: pd.DataFrame) -> dict:
+    """{герой: {фасет: номер}}; при расхождениях берется самый частый номер"""
+    rows = df.dropna(subset=["Hero", "facet_name", "facet_number"])
+    counts = (
+        rows.groupby(["Hero", "facet_name", "facet_number"]).size().reset_index(name="n")
+        .sort_values(["Hero", "facet_name", "n", "facet_number"], ascending=[True, True, False, True])
+        .drop_duplicates(["Hero", "facet_name"])
+    )
+    mapping: dict = {}
+    for row in counts.itertuples(index=False):
+        mapping.setdefault(row.Hero, {})[row.facet_name] = int(row.facet_number)
+    return mapping
+
+
+def main() -> int:
+    from dota2_data_scraper.modules.utils.facet_snapshots import BUNDLED_SNAPSHOT_PATH, bundle_key
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--source", default=os.path.join("configs", "processed_heroes.csv"))
+    parser.add_argument("--output", default=BUNDLED_SNAPSHOT_PATH)
+    args = parser.parse_args()
+
+    mapping = build_mapping(pd.read_csv(args.source))
+    if not mapping:
+        print(f"В {args.source} нет фасетов")
+        return 1
+    data = {
+        "key": bundle_key(None, mapping),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "source": "bundled",
+        "mapping": mapping,
+        "aliases": {},
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1, ensure_ascii=False, sort_keys=True)
+    print(f"Снимок {data['key']}: {len(mapping)} героев -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
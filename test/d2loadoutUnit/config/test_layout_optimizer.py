@@ -0,0 +1,152 @@
+"""
+Модульные тесты для решателя расположения LayoutOptimizer
+"""
+
+import pytest
+from collections import OrderedDict
+from unittest.mock import patch
+from dota2_data_scraper.modules.config import layout_optimizer
+from dota2_data_scraper.modules.config.layout_optimizer import (
+    CategoryLayout,
+    IconSize,
+    LayoutOptimizer,
+    ScreenDimensions,
+    category_priority,
+    column_key,
+)
+
+
+def _categories(counts):
+    """Категории "POS n F k" с заданным числом героев"""
+    cats = []
+    for pos, per_facet in enumerate(counts, 1):
+        for facet, count in zip(("1", "2", "3+"), per_facet):
+            name = f"POS {pos} F {facet}"
+            cats.append(
+                CategoryLayout(name, 0, 0, 0, 0, hero_count=count, priority=category_priority(name))
+            )
+    return cats
+
+
+def _overlaps(a, b):
+    return (
+        a.x < b.x + b.width and b.x < a.x + a.width
+        and a.y < b.y + b.height and b.y < a.y + a.height
+    )
+
+
+class TestLayoutOptimizer:
+    """Тесты для LayoutOptimizer.solve_layout - границы модуля"""
+
+    @pytest.fixture(autouse=True)
+    def empty_cache(self, monkeypatch):
+        monkeypatch.setattr(LayoutOptimizer, "_solution_cache", OrderedDict())
+
+    def test_column_keys(self):
+        """Тест: фасеты 1/2 и Top по позициям, все 3+ — одна боковая колонка"""
+        assert column_key("POS 2 F 1") == column_key("POS 2 Top D2PT") == "pos 2"
+        assert column_key("POS 4 F 3+") == column_key("POS 1 F 3+") == "rare"
+        assert category_priority("POS 4 F 3+") == 3
+
+    def test_layout_fits_screen_without_overlaps(self):
+        """Тест: категории внутри экрана и не пересекаются, пустые не размещаются"""
+        optimizer = LayoutOptimizer()
+        counts = [(20, 12, 3), (9, 4, 0), (15, 16, 2), (7, 4, 1), (1, 13, 5)]
+        layout = optimizer.solve_layout(_categories(counts))
+
+        assert "POS 2 F 3+" not in {c.name for c in layout}
+        assert len(layout) == 14
+        for i, a in enumerate(layout):
+            assert 0 <= a.x and a.x + a.width <= optimizer.screen.width
+            assert 0 <= a.y and a.y + a.height <= optimizer.screen.height
+            assert all(not _overlaps(a, b) for b in layout[i + 1:])
+
+    def test_all_heroes_visible_when_room(self):
+        """Тест: при достатке места видны все иконки и лишних ячеек нет"""
+        icon = IconSize()
+        layout = LayoutOptimizer().solve_layout(_categories([(6, 4, 2)]), icon=icon)
+        for cat in layout:
+            cells = round(cat.width / icon.width) * round(cat.height / icon.height)
+            assert cat.hero_count <= cells < cat.hero_count + round(cat.width / icon.width)
+
+    def test_priority_gets_space_first(self):
+        """Тест: на тесном экране место получают популярные фасеты"""
+        screen = ScreenDimensions(width=200, height=300)
+        layout = LayoutOptimizer(screen).solve_layout(_categories([(30, 30, 30)]))
+        area = {c.name: c.width * c.height for c in layout}
+        assert area["POS 1 F 1"] > area["POS 1 F 3+"]
+
+    def test_solution_cached_by_signature(self):
+        """Тест: повторный запрос с теми же числами героев не решается заново"""
+        optimizer = LayoutOptimizer()
+        cats = _categories([(5, 3, 1)])
+        with patch.object(optimizer, "_solve", wraps=optimizer._solve) as solve:
+            first = optimizer.solve_layout(cats)
+            first[0].x = -1  # копии: правка результата не портит кеш
+            assert optimizer.solve_layout(cats)[0].x == 0
+            optimizer.solve_layout(_categories([(5, 3, 2)]))
+        assert solve.call_count == 2
+
+    def test_solution_cache_is_bounded(self, monkeypatch):
+        """Тест: кеш решений ограничен и вытесняет давно не использованные сигнатуры"""
+        monkeypatch.setattr(layout_optimizer, "SOLUTION_CACHE_SIZE", 2)
+        optimizer = LayoutOptimizer()
+        first, second, third = (_categories([(n, 3, 1)]) for n in (4, 5, 6))
+        optimizer.solve_layout(first)
+        optimizer.solve_layout(second)
+        optimizer.solve_layout(first)
+        optimizer.solve_layout(third)
+        assert len(LayoutOptimizer._solution_cache) == 2
+        with patch.object(optimizer, "_solve", wraps=optimizer._solve) as solve:
+            optimizer.solve_layout(first)
+            solve.assert_not_called()
+            optimizer.solve_layout(second)
+            solve.assert_called_once()
+
+    def test_time_budget_falls_back_to_proportional(self):
+        """Тест: при исчерпанном бюджете времени результат все равно корректен"""
+        layout = LayoutOptimizer().solve_layout(
+            _categories([(20, 12, 3), (9, 4, 1)]), time_budget=-1
+        )
+        assert len(layout) == 6
+        assert all(c.width > 0 and c.height > 0 for c in layout)
+
+    def test_infeasible_raises(self):
+        """Тест: если категории не помещаются даже по одному ряду — ValueError"""
+        screen = ScreenDimensions(width=1000, height=100)
+        with pytest.raises(ValueError):
+            LayoutOptimizer(screen).solve_layout(_categories([(3, 3, 3)] * 2))
+
+
+class TestLayoutRegistry:
+    """Тесты для реестра шаблонных макетов"""
+
+    @pytest.fixture(autouse=True)
+    def empty_cache(self, monkeypatch):
+        monkeypatch.setattr(LayoutOptimizer, "_layout_cache", {})
+
+    def test_layout_built_on_demand_once(self):
+        """Тест: строится только запрошенный макет и только один раз на экран"""
+        optimizer = LayoutOptimizer()
+        with patch.object(
+            LayoutOptimizer, "_create_classic_optimized_layout",
+            autospec=True, side_effect=LayoutOptimizer._create_classic_optimized_layout,
+        ) as classic, patch.object(LayoutOptimizer, "_create_adaptive_grid_layout") as adaptive:
+            assert len(optimizer.get_layout("classic_optimized")) == 15
+            assert len(LayoutOptimizer().get_layout("classic_optimized")) == 15
+        assert classic.call_count == 1
+        adaptive.assert_not_called()
+        with pytest.raises(KeyError):
+            optimizer.get_layout("unknown")
+
+    def test_precompute_for_several_screens(self):
+        """Тест: пакетный расчет — по макету на каждый экран"""
+        small = ScreenDimensions(width=900, height=400)
+        result = LayoutOptimizer.precompute_layouts(
+            [ScreenDimensions(), small, small], names=["classic_optimized"]
+        )
+        assert list(result) == [ScreenDimensions(), small]
+        assert (small, "classic_optimized") in LayoutOptimizer._layout_cache
+        wide = max(c.x + c.width for c in result[ScreenDimensions()]["classic_optimized"])
+        narrow = max(c.x + c.width for c in result[small]["classic_optimized"])
+        assert narrow < wide
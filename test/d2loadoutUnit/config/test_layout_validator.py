@@ -0,0 +1,93 @@
+"""
+Модульные тесты для проверки расположения категорий
+"""
+
+import pytest
+from dota2_data_scraper.modules.config.layout_optimizer import (
+    CategoryLayout,
+    LayoutOptimizer,
+    ScreenDimensions,
+)
+from dota2_data_scraper.modules.config.layout_validator import (
+    Rect,
+    find_overlaps,
+    union_area,
+    validate_layout,
+)
+
+SCREEN = ScreenDimensions(width=100, height=50)
+
+
+def _category(name, x, y, width, height):
+    return {"category_name": name, "x_position": x, "y_position": y, "width": width, "height": height}
+
+
+class TestLayoutValidator:
+    """Тесты для validate_layout - границы модуля"""
+
+    def test_touching_rects_do_not_overlap(self):
+        """Тест: касание границ — не наложение, площадь объединения точная"""
+        rects = [Rect("a", 0, 0, 10, 10), Rect("b", 10, 0, 10, 10), Rect("c", 5, 5, 10, 10)]
+        overlaps = find_overlaps(rects)
+        assert {frozenset((a.name, b.name)) for a, b, _ in overlaps} == {
+            frozenset("ac"), frozenset("bc")
+        }
+        assert sum(area for _, _, area in overlaps) == 50
+        assert union_area(rects) == 300 - 50
+
+    def test_reports_bounds_overlaps_and_stats(self):
+        """Тест: выход за экран и наложения попадают в отчет, статистика по площади"""
+        report = validate_layout(
+            [
+                _category("POS 1 F 1", 0, 0, 50, 50),
+                _category("POS 1 F 2", 40, 0, 20, 25),
+                _category("POS 1 F 3+", 90, 40, 20, 20),
+            ],
+            SCREEN,
+        )
+        kinds = {(i.kind, i.categories) for i in report.issues}
+        assert kinds == {
+            ("overlap", ("POS 1 F 1", "POS 1 F 2")),
+            ("out_of_bounds", ("POS 1 F 3+",)),
+        }
+        assert not report.ok
+        assert report.stats["overlap_area"] == 250
+        # 2500 + 500 - 250 + видимая часть 10x10 из 5000
+        assert report.stats["total_usage_percent"] == pytest.approx(57.0)
+        assert report.stats["wasted_space_percent"] == pytest.approx(43.0)
+
+    def test_generated_layouts_are_valid(self):
+        """Тест: решатель и классический шаблон дают корректное расположение"""
+        optimizer = LayoutOptimizer()
+        cats = [
+            CategoryLayout(f"POS {p} F {f}", 0, 0, 0, 0, hero_count=c, priority=3 if f == "3+" else 1)
+            for p in range(1, 6)
+            for f, c in (("1", 14), ("2", 9), ("3+", 2))
+        ]
+        assert validate_layout(optimizer.solve_layout(cats), optimizer.screen).ok
+        assert validate_layout(optimizer.get_layout("classic_optimized"), optimizer.screen).ok
+
+    def test_union_area_matches_brute_force(self):
+        """Тест: площадь объединения совпадает с подсчетом по единичным клеткам"""
+        import random
+
+        rng = random.Random(7)
+        rects = [
+            Rect(str(i), rng.randint(0, 30), rng.randint(0, 30), rng.randint(0, 12), rng.randint(1, 12))
+            for i in range(40)
+        ]
+        cells = {
+            (x, y)
+            for r in rects
+            for x in range(int(r.x), int(r.right))
+            for y in range(int(r.y), int(r.bottom))
+        }
+        assert union_area(rects) == len(cells)
+        pairs = {
+            frozenset((a.name, b.name))
+            for i, a in enumerate(rects)
+            for b in rects[i + 1:]
+            if a.area and b.area
+            and min(a.right, b.right) > max(a.x, b.x) and min(a.bottom, b.bottom) > max(a.y, b.y)
+        }
+        assert {frozenset((a.name, b.name)) for a, b, _ in find_overlaps(rects)} == pairs
@@ -0,0 +1,41 @@
+"""
+Модульные тесты для профилей экранов
+"""
+
+import json
+import os
+import pytest
+from dota2_data_scraper.modules.config.screen_profiles import (
+    ScreenProfile,
+    claimed_accounts,
+    load_screen_profiles,
+)
+
+
+class TestScreenProfiles:
+    """Тесты для load_screen_profiles - границы модуля"""
+
+    @pytest.fixture
+    def profiles_path(self, tmp_path):
+        path = tmp_path / "screen_profiles.json"
+        path.write_text(json.dumps({"profiles": [
+            {"name": "default", "accounts": []},
+            {"name": "ultra wide", "width": 1580, "accounts": [123]},
+        ]}), encoding="utf-8")
+        return str(path)
+
+    def test_missing_file_gives_default(self, tmp_path):
+        """Тест: без файла — один профиль по умолчанию с hero_configs.json"""
+        profiles = load_screen_profiles(str(tmp_path / "none.json"))
+        assert [p.name for p in profiles] == ["default"]
+        assert profiles[0].config_path == os.path.join("configs", "hero_configs.json")
+
+    def test_profiles_and_selection(self, profiles_path):
+        """Тест: размеры по умолчанию, отдельный файл и аккаунты профиля, выбор по имени"""
+        default, wide = load_screen_profiles(profiles_path)
+        assert wide.screen.width == 1580 and wide.screen.height == default.screen.height
+        assert wide.config_path == os.path.join("configs", "hero_configs_ultra_wide.json")
+        assert claimed_accounts([default, wide]) == ["123"]
+        assert load_screen_profiles(profiles_path, names=["ultra wide"]) == [wide]
+        with pytest.raises(ValueError):
+            load_screen_profiles(profiles_path, names=["missing"])
@@ -146,3 +146,58 @@ class TestConfigProcessor:
             min_matches=100
         )
         assert config is None
+
+    def test_layout_follows_hero_counts(self, processor):
+        """Тест: размеры категорий рассчитываются по числу героев"""
+        config = {
+            "configs": [
+                {
+                    "config_name": "Test",
+                    "categories": [
+                        {"category_name": "POS 1 F 1", "hero_ids": list(range(12))},
+                        {"category_name": "POS 1 F 2", "hero_ids": [1]},
+                    ],
+                }
+            ]
+        }
+        processor._apply_optimized_layout_to_configs(config)
+        big, small = config["configs"][0]["categories"]
+        assert big["width"] * big["height"] > small["width"] * small["height"]
+        assert small["y_position"] >= big["y_position"] + big["height"]
+
+    def test_deploy_routes_profiles_to_accounts(self, processor):
+        """Тест: профиль без аккаунтов получает все, кроме закрепленных за другими"""
+        from dota2_data_scraper.modules.config.screen_profiles import ScreenProfile
+
+        profiles = [ScreenProfile("default"), ScreenProfile("wide", accounts=["42"])]
+        processor.steam_manager = Mock()
+        processor.steam_manager.copy_config_to_steam.return_value = True
+        assert processor.deploy_to_steam(profiles)
+        calls = processor.steam_manager.copy_config_to_steam.call_args_list
+        assert calls[0].kwargs == {"accounts": None, "exclude": ["42"]}
+        assert calls[1].args[0] == profiles[1].config_path
+        assert calls[1].kwargs == {"accounts": ["42"], "exclude": None}
+
+    def test_save_configs_writes_every_profile(self, processor, temp_dir):
+        """Тест: конфигурации всех профилей сохраняются в свои файлы"""
+        paths = [os.path.join(temp_dir, f"hero_configs_{i}.json") for i in range(3)]
+        assert processor._save_configs([({"version": 3, "n": i}, p) for i, p in enumerate(paths)])
+        assert all(os.path.exists(p) for p in paths)
+
+    def test_deploy_subset_respects_unselected_profiles(self, processor, caplog):
+        """Тест: аккаунты невыбранных профилей не перезаписываются, два профиля без аккаунтов — предупреждение"""
+        from dota2_data_scraper.modules.config.screen_profiles import ScreenProfile
+
+        all_profiles = [ScreenProfile("default"), ScreenProfile("wide", accounts=["42"])]
+        processor.steam_manager = Mock()
+        processor.steam_manager.copy_config_to_steam.return_value = True
+        with patch(
+            "dota2_data_scraper.modules.core.config_processor.load_screen_profiles",
+            return_value=all_profiles,
+        ):
+            assert processor.deploy_to_steam([all_profiles[0]])
+            call = processor.steam_manager.copy_config_to_steam.call_args
+            assert call.kwargs == {"accounts": None, "exclude": ["42"]}
+
+            processor.deploy_to_steam([ScreenProfile("default"), ScreenProfile("laptop")])
+        assert "laptop" in caplog.text
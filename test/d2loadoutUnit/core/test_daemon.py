@@ -0,0 +1,111 @@
+"""
+Модульные тесты для MetaDaemon
+"""
+
+import os
+import tempfile
+import shutil
+import pytest
+import pandas as pd
+from unittest.mock import Mock, patch
+from dota2_data_scraper.modules.core.daemon import MetaDaemon, BackoffPolicy
+
+
+class TestMetaDaemon:
+    """Тесты для MetaDaemon - границы модуля"""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Временная директория для тестов"""
+        temp_path = tempfile.mkdtemp()
+        yield temp_path
+        shutil.rmtree(temp_path, ignore_errors=True)
+
+    @pytest.fixture
+    def heroes_df(self):
+        """Тестовая таблица с фасетами"""
+        return pd.DataFrame({
+            "Hero": ["Juggernaut", "Pudge"],
+            "Facet": ["Bladeform", "Flayer's Hook"],
+            "Role": ["pos 1", "pos 4"],
+            "Matches": [1000, 500],
+            "WR": [52.5, 48.3],
+        })
+
+    @pytest.fixture
+    def daemon(self, temp_dir):
+        """Демон с замоканными браузером, пересборкой и доставкой"""
+        d = MetaDaemon(state_path=os.path.join(temp_dir, "state.json"))
+        d._ensure_browser = Mock()
+        d._rebuild_configs = Mock(return_value=True)
+        d._deploy = Mock(return_value=True)
+        return d
+
+    def test_first_poll_updates(self, daemon, heroes_df):
+        """Тест: первый опрос пересобирает и доставляет конфигурацию"""
+        with patch.object(daemon.scraper, "scrape_both_data_types", return_value=(heroes_df, pd.DataFrame())):
+            assert daemon.poll_once() == MetaDaemon.UPDATED
+        daemon._rebuild_configs.assert_called_once()
+        daemon._deploy.assert_called_once()
+
+    def test_unchanged_meta_skips_rebuild(self, daemon, heroes_df):
+        """Тест: несущественные колебания не вызывают пересборку"""
+        noisy = heroes_df.copy()
+        noisy["WR"] = [52.51, 48.29]
+        noisy["Matches"] = [1003, 501]
+        results = [(heroes_df, pd.DataFrame()), (noisy, pd.DataFrame())]
+        with patch.object(daemon.scraper, "scrape_both_data_types", side_effect=results):
+            daemon.poll_once()
+            assert daemon.poll_once() == MetaDaemon.UNCHANGED
+        assert daemon._rebuild_configs.call_count == 1
+
+    def test_unchanged_browser_tables_short_circuit(self, daemon, heroes_df):
+        """Тест: если скрапер не увидел изменений в браузере, пересборки нет"""
+        with patch.object(daemon.scraper, "scrape_both_data_types", return_value=(heroes_df, pd.DataFrame())):
+            daemon.poll_once()
+            daemon.scraper.table_changes = {"facets:pos 1": False}
+            with patch("dota2_data_scraper.modules.core.daemon.dataframe_fingerprints") as mock_fp:
+                assert daemon.poll_once() == MetaDaemon.UNCHANGED
+                mock_fp.assert_not_called()
+        assert daemon._rebuild_configs.call_count == 1
+
+    def test_failed_deploy_is_retried(self, daemon, heroes_df):
+        """Тест: неудачная доставка повторяется на следующем опросе без пересборки"""
+        daemon._deploy.side_effect = [False, True]
+        with patch.object(daemon.scraper, "scrape_both_data_types", return_value=(heroes_df, pd.DataFrame())):
+            assert daemon.poll_once() == MetaDaemon.FAILED
+            assert daemon.poll_once() == MetaDaemon.UPDATED
+        assert daemon._rebuild_configs.call_count == 1
+        assert daemon._deploy.call_count == 2
+
+    def test_failed_rebuild_is_retried(self, daemon, heroes_df):
+        """Тест: неудачная пересборка повторяется, даже если таблицы взяты из кэша браузера"""
+        daemon._rebuild_configs.side_effect = [False, True]
+        with patch.object(daemon.scraper, "scrape_both_data_types", return_value=(heroes_df, pd.DataFrame())):
+            assert daemon.poll_once() == MetaDaemon.FAILED
+            daemon.scraper.table_changes = {"facets:pos 1": False}
+            assert daemon.poll_once() == MetaDaemon.UPDATED
+            assert daemon.poll_once() == MetaDaemon.UNCHANGED
+        assert daemon._rebuild_configs.call_count == 2
+        assert daemon._deploy.call_count == 1
+
+    def test_scraper_options_forwarded(self, temp_dir):
+        """Тест: профиль Dotabuff, один браузер и архив снимков доходят до HeroScraper"""
+        d = MetaDaemon(
+            state_path=os.path.join(temp_dir, "state.json"),
+            snapshot_dir=os.path.join(temp_dir, "snapshots"),
+            dotabuff_profile=os.path.join(temp_dir, "profile"),
+            single_browser=True,
+        )
+        assert d.scraper.shared_browser is True
+        assert d.scraper.dotabuff_profile == os.path.join(temp_dir, "profile")
+        assert d.scraper.snapshots is not None
+
+    def test_backoff_delay(self, daemon):
+        """Тест экспоненциальной задержки после ошибок"""
+        daemon.backoff = BackoffPolicy(initial=10, factor=2, maximum=25)
+        assert daemon.next_delay(MetaDaemon.FAILED) == 10
+        assert daemon.next_delay(MetaDaemon.FAILED) == 20
+        assert daemon.next_delay(MetaDaemon.FAILED) == 25
+        assert daemon.next_delay(MetaDaemon.UNCHANGED) == daemon.interval
+        assert daemon.failures == 0
@@ -7,7 +7,8 @@ import pandas as pd
 import os
 import tempfile
 import shutil
-from dota2_data_scraper.modules.core.data_manager import DataManager
+from unittest.mock import patch
+from dota2_data_scraper.modules.core.data_manager import DataManager, _columnar_frame
 
 
 class TestDataManager:
@@ -82,6 +83,26 @@ class TestDataManager:
         assert "Facet" in merged.columns
         assert "Role" in merged.columns
 
+    def test_columnar_frame_normalizes_mixed_columns(self):
+        """Тест: словари и смешанные значения в object-колонках приводятся к строкам"""
+        df = pd.DataFrame({
+            "Hero": ["Juggernaut", "Pudge"],
+            "Extra": [{"a": 1}, 3],
+            "Matches": [1000, 500],
+        })
+        out = _columnar_frame(df)
+        assert out["Extra"].tolist() == ['{"a": 1}', "3"]
+        assert out["Matches"].tolist() == [1000, 500]
+        assert df["Extra"].tolist() == [{"a": 1}, 3]
+
+    @pytest.mark.parametrize("error", [ImportError("pyarrow"), TypeError("ArrowTypeError")])
+    def test_save_columnar_falls_back_to_csv(self, data_manager, sample_dataframe, temp_dir, error):
+        """Тест: без движка Parquet или при ошибке преобразования данные сохраняются в CSV"""
+        with patch.object(pd.DataFrame, "to_parquet", side_effect=error):
+            path = data_manager.save_columnar(sample_dataframe, "columnar")
+        assert path == os.path.join(temp_dir, "columnar.csv")
+        assert len(pd.read_csv(path)) == 3
+
     def test_get_file_info_exists(self, data_manager, sample_dataframe):
         """Тест получения информации о существующем файле"""
         data_manager.save_dataframe(sample_dataframe, "test_data.csv")
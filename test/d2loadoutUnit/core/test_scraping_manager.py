@@ -0,0 +1,54 @@
+"""
+Модульные тесты для ScrapingManager (без запуска браузера)
+"""
+
+import logging
+import pytest
+from unittest.mock import Mock, patch
+from dota2_data_scraper.modules.core.scraping_manager import ScrapingManager
+
+
+class TestScrapingManager:
+    """Тесты для ScrapingManager - границы модуля"""
+
+    @pytest.fixture
+    def manager(self):
+        """Менеджер с замоканным драйвером"""
+        m = ScrapingManager(headless=True)
+        m.driver = Mock()
+        yield m
+        m.driver = None
+
+    def test_get_table_html(self, manager):
+        """Тест: HTML таблицы берется через execute_script, а не page_source"""
+        manager.driver.execute_script.return_value = '<div class="thead"></div><div class="tbody"></div>'
+        assert manager.get_table_html().startswith('<div class="thead"')
+        manager.driver.execute_script.return_value = None
+        assert manager.get_table_html() is None
+
+    def test_html_snippet_is_bounded(self, manager):
+        """Тест: лимит фрагмента передается в браузер"""
+        manager.driver.execute_script.return_value = "<html>"
+        assert manager.get_html_snippet(limit=100) == "<html>"
+        assert manager.driver.execute_script.call_args.args[1:] == (None, 100)
+
+    def test_click_error_snippet_is_lazy(self, manager):
+        """Тест: при выключенном логировании фрагмент страницы не запрашивается"""
+        manager.logger = logging.getLogger("test.scraping_manager.lazy")
+        manager.logger.setLevel(logging.CRITICAL)
+        with patch(
+            "dota2_data_scraper.modules.core.scraping_manager.WebDriverWait",
+            side_effect=RuntimeError("timeout"),
+        ):
+            assert manager.click_element_safely("//button") is False
+        manager.driver.execute_script.assert_not_called()
+
+    def test_in_tab_restores_original_window(self, manager):
+        """Тест: новая вкладка закрывается по выходу, активной снова становится исходная"""
+        handles = iter(["main", "tab-2"])
+        type(manager.driver).current_window_handle = property(lambda self: next(handles))
+        with manager.in_tab() as handle:
+            assert handle == "tab-2"
+            manager.driver.switch_to.new_window.assert_called_once_with("tab")
+        manager.driver.close.assert_called_once()
+        manager.driver.switch_to.window.assert_called_once_with("main")
@@ -0,0 +1,67 @@
+"""
+Модульные тесты для повторного разбора снимков
+"""
+
+import os
+import tempfile
+import shutil
+import pytest
+import pandas as pd
+from dota2_data_scraper.modules.core.data_manager import DataManager
+from dota2_data_scraper.modules.core.snapshot_reprocessor import reprocess_snapshots
+from dota2_data_scraper.modules.utils.snapshot_archive import (
+    SnapshotArchive,
+    parse_snapshot_filename,
+    snapshot_filename,
+)
+
+TABLE_HTML = """
+<html><body>
+<div class="grid" style="display: grid;">
+    <div>Hero</div><div>Matches</div><div>WR</div>
+</div>
+<div class="grid" style="display: grid;">
+    <div>Juggernaut</div><div>1000</div><div>52.5%</div>
+</div>
+</body></html>
+"""
+
+
+class TestSnapshotReprocessor:
+    """Тесты для reprocess_snapshots - границы модуля"""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Временная директория для тестов"""
+        temp_path = tempfile.mkdtemp()
+        yield temp_path
+        shutil.rmtree(temp_path, ignore_errors=True)
+
+    def test_snapshot_filename_roundtrip(self):
+        """Тест: метаданные среза восстанавливаются из имени файла"""
+        meta = parse_snapshot_filename(snapshot_filename("8::no_facets:pos 1"))
+        assert meta == {"Period": "8", "Bracket": None, "Grouping": "no_facets", "Role": "pos 1"}
+        meta = parse_snapshot_filename(snapshot_filename("facets:pos 4"))
+        assert meta["Grouping"] == "facets" and meta["Role"] == "pos 4"
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_reprocess_writes_columnar_store(self, temp_dir, workers):
+        """Тест: все снимки разобраны и сохранены одним файлом"""
+        archive = SnapshotArchive(os.path.join(temp_dir, "snapshots"))
+        archive.start_run()
+        archive.save("facets:pos 1", TABLE_HTML)
+        archive.save("no_facets:pos 2", TABLE_HTML)
+
+        out_dir = os.path.join(temp_dir, "out")
+        path = reprocess_snapshots(
+            archive.root, workers=workers, data_manager=DataManager(output_dir=out_dir)
+        )
+
+        assert path is not None and os.path.exists(path)
+        df = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+        assert sorted(df["Role"]) == ["pos 1", "pos 2"]
+        assert df.loc[df["Grouping"] == "no_facets", "Facet"].tolist() == ["No Facet"]
+
+    def test_empty_directory(self, temp_dir):
+        """Тест: без снимков ничего не сохраняется"""
+        assert reprocess_snapshots(temp_dir, workers=1) is None
@@ -5,7 +5,9 @@
 import pytest
 import pandas as pd
 from unittest.mock import Mock, patch, MagicMock
-from dota2_data_scraper.modules.scrapers.hero_scraper import HeroScraper
+from dota2_data_scraper.modules.scrapers.hero_scraper import FACET_TOGGLE_SELECTORS, HeroScraper
+from dota2_data_scraper.modules.scrapers.pipeline import completed
+from dota2_data_scraper.modules.utils.element_lookup import FIND_FIRST_JS
 
 
 class TestHeroScraper:
@@ -104,3 +106,250 @@ class TestHeroScraper:
         })
         cleaned = scraper._clean_data(df)
         assert cleaned["Matches"].dtype == object
+
+    def test_unchanged_table_reuses_parsed_frame(self, scraper):
+        """Тест: при совпадении отпечатка таблица не разбирается повторно"""
+        manager = MagicMock()
+        manager.click_element_safely.return_value = True
+        manager.driver.execute_script.side_effect = [
+            {"rows": 1, "hash": "abc"},
+            {"rows": 1, "hash": "abc"},
+            {"rows": 2, "hash": "def"},
+        ]
+        table = pd.DataFrame({"Hero": ["Juggernaut"], "Matches": [1000]})
+
+        with patch.object(scraper, "_extract_table_data", return_value=table) as mock_extract:
+            first = scraper._collect_role_table(manager, "Carry (pos 1)", "//x", "facets")
+            second = scraper._collect_role_table(manager, "Carry (pos 1)", "//x", "facets")
+            assert mock_extract.call_count == 1
+            assert scraper.table_changes["facets:pos 1"] is False
+            scraper._collect_role_table(manager, "Carry (pos 1)", "//x", "facets")
+            assert mock_extract.call_count == 2
+            assert scraper.table_changes["facets:pos 1"] is True
+
+        pd.testing.assert_frame_equal(first, second)
+        assert second["Role"].tolist() == ["pos 1"]
+
+    def test_matrix_schedule_snakes_periods(self, scraper):
+        """Тест: соседние комбинации матрицы отличаются одним селектором"""
+        schedule = scraper._matrix_schedule([8, 30], ["a", "b"])
+        assert schedule == [("a", 8), ("a", 30), ("b", 30), ("b", 8)]
+
+    def test_scrape_matrix_long_format(self, scraper):
+        """Тест: матрица возвращает длинный формат с ключами среза"""
+        manager = MagicMock()
+        table = pd.DataFrame({"Hero": ["Juggernaut"], "Matches": [1000]})
+
+        def fake_collect(manager, position, xpath, grouping, slice_key=""):
+            df = table.copy()
+            df["Role"] = scraper.role_mapping[position]
+            return df
+
+        with patch("dota2_data_scraper.modules.scrapers.hero_scraper.select_period", return_value=True), \
+                patch.object(scraper, "_facet_grouping_enabled", return_value=False), \
+                patch.object(scraper, "_set_facet_grouping", return_value=True) as mock_toggle, \
+                patch.object(scraper, "_collect_role_table", side_effect=fake_collect), \
+                patch.object(scraper, "_ensure_facet_names_and_numbers", side_effect=lambda df: df):
+            result = scraper.scrape_matrix([8, 30], manager=manager)
+
+        manager.navigate_to_page.assert_called_once()
+        assert list(result.columns[:3]) == ["Period", "Bracket", "Grouping"]
+        assert len(result) == 2 * 2 * 5
+        # Группировка переключается по одному разу на комбинацию "змейкой"
+        assert [c.args[1] for c in mock_toggle.call_args_list] == [False, True, True, False]
+
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_scrape_both_pipelined_matches_sequential(self, workers):
+        """Тест: разбор в пуле потоков дает тот же результат, что и в потоке браузера"""
+        scraper = HeroScraper(headless=True, parse_workers=workers)
+        manager = MagicMock()
+        manager.click_element_safely.return_value = True
+        manager.driver.page_source = "<html></html>"
+        toggle = MagicMock()
+        toggle.get_attribute.side_effect = lambda name: {"role": "switch", "aria-checked": "false"}[name]
+        # Поиск переключателя находит его первым селектором, остальные скрипты — пусто
+        manager.driver.execute_script.side_effect = (
+            lambda script, *args: [0, toggle] if script == FIND_FIRST_JS else None
+        )
+
+        table = pd.DataFrame({"Hero": ["Juggernaut"], "Matches": [1000]})
+        with patch.object(scraper, "_parse_and_clean", side_effect=lambda html: table.copy()), \
+                patch.object(scraper.facet_parser, "fetch_live_mapping", return_value={}), \
+                patch.object(scraper, "_ensure_facet_names_and_numbers", side_effect=lambda df: df), \
+                patch("dota2_data_scraper.modules.scrapers.hero_scraper.time.sleep"):
+            with_facets, no_facets = scraper.scrape_both_data_types(manager=manager)
+
+        assert with_facets["Role"].tolist() == ["pos 1", "pos 2", "pos 3", "pos 4", "pos 5"]
+        assert no_facets["Facet"].unique().tolist() == ["No Facet"]
+        assert len(no_facets) == 5
+
+    def test_facet_toggle_selector_independent_of_state(self, tmp_path):
+        """Тест: запоминается селектор, не зависящий от состояния переключателя"""
+        from dota2_data_scraper.modules.utils.selector_registry import SelectorRegistry
+
+        registry = SelectorRegistry(str(tmp_path / "registry.json"))
+        scraper = HeroScraper(headless=True, selector_registry=registry)
+        scraper._layout = "layout"
+        manager = MagicMock()
+        toggle = MagicMock()
+        manager.driver.execute_script.side_effect = (
+            lambda script, *args: [0, toggle] if script == FIND_FIRST_JS else None
+        )
+        with patch("dota2_data_scraper.modules.utils.element_lookup.time.sleep"):
+            assert scraper._find_facet_toggle(manager) is toggle
+        assert registry.get("layout", "facet_toggle") == 'button[role="switch"]'
+        assert not any("aria-checked" in selector for selector in FACET_TOGGLE_SELECTORS)
+
+    def test_unknown_layout_skips_only_that_role(self):
+        """Тест: нераспознанная таблица одной роли не обрывает сбор остальных"""
+        from dota2_data_scraper.modules.scrapers.table_layout import UnknownTableLayoutError
+
+        scraper = HeroScraper(headless=True, parse_workers=2)
+        manager = MagicMock()
+        manager.click_element_safely.return_value = True
+        manager.driver.execute_script.return_value = None
+        manager.driver.page_source = "<html></html>"
+        table = pd.DataFrame({"Hero": ["Juggernaut"], "Matches": [1000]})
+        calls = []
+
+        def parse(html):
+            calls.append(html)
+            if len(calls) == 2:
+                raise UnknownTableLayoutError("Не найдены ни заголовки, ни строки таблицы")
+            return table.copy()
+
+        with patch.object(scraper, "_parse_and_clean", side_effect=parse), \
+                patch.object(scraper.facet_parser, "fetch_live_mapping", return_value={}), \
+                patch.object(scraper, "_ensure_facet_names_and_numbers", side_effect=lambda df: df), \
+                patch.object(scraper, "_find_facet_toggle", return_value=None), \
+                patch("dota2_data_scraper.modules.scrapers.hero_scraper.time.sleep"):
+            with_facets, _ = scraper.scrape_both_data_types(manager=manager)
+
+        assert len(with_facets) == 4
+
+    def test_tab_fallback_with_single_parse_worker(self):
+        """Тест: при неудачном prefetch вкладка Dotabuff открывается в потоке браузера,
+        а не в рабочем потоке конвейера (один рабочий поток — без взаимоблокировки)"""
+        import threading
+
+        scraper = HeroScraper(headless=True, parse_workers=1)
+        manager = MagicMock()
+        manager.tab_lock = threading.RLock()
+        manager.click_element_safely.return_value = True
+        toggle = MagicMock()
+        toggle.get_attribute.side_effect = lambda name: {"role": "switch", "aria-checked": "false"}[name]
+        manager.driver.execute_script.side_effect = (
+            lambda script, *args: [0, toggle] if script == FIND_FIRST_JS else None
+        )
+        tab_threads = []
+
+        def live(manager=None, **kwargs):
+            if manager is None:
+                raise RuntimeError("HTTP не сработал")
+            # Как in_tab(): вкладка открывается только под tab_lock
+            assert manager.tab_lock.acquire(timeout=5), "tab_lock занят потоком браузера"
+            try:
+                tab_threads.append(threading.current_thread().name)
+                return {"Juggernaut": {"Bladestorm": 1}}
+            finally:
+                manager.tab_lock.release()
+
+        table = pd.DataFrame({"Hero": ["Juggernaut"], "Facet": ["Bladestorm"], "Matches": [1000]})
+        with patch.object(scraper, "_parse_and_clean", side_effect=lambda html: table.copy()), \
+                patch.object(scraper.facet_parser, "fetch_live_mapping", side_effect=live), \
+                patch.object(scraper.facet_parser, "get_hero_facets_mapping",
+                             return_value={"Juggernaut": {"Bladestorm": 1}}), \
+                patch("dota2_data_scraper.modules.scrapers.hero_scraper.time.sleep"):
+            with_facets, no_facets = scraper.scrape_both_data_types(manager=manager)
+
+        assert tab_threads == [threading.current_thread().name]
+        assert with_facets["facet_number"].tolist() == [1] * 5
+        assert len(no_facets) == 5
+
+    def test_facet_mapping_prefetched_before_navigation(self, scraper):
+        """Тест: маппинг фасетов запрашивается в фоне до сбора таблиц и ожидается при разрешении фасетов"""
+        import threading
+
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_mapping(**kwargs):
+            calls.append(threading.current_thread().name)
+            started.set()
+            release.wait(5)
+            return {"Juggernaut": {"Bladestorm": 1}}
+
+        def navigate(manager, url):
+            # Запрос Dotabuff уже идет, пока открывается dota2protracker
+            assert started.wait(5)
+            release.set()
+
+        df = pd.DataFrame({"Hero": ["Juggernaut"], "Role": ["pos 1"], "Facet": ["Bladestorm"]})
+        with patch.object(scraper.facet_parser, "fetch_live_mapping", side_effect=slow_mapping), \
+                patch.object(scraper.facet_parser, "get_hero_facets_mapping",
+                             return_value={"Juggernaut": {"Bladestorm": 1}}), \
+                patch.object(scraper, "_navigate", side_effect=navigate), \
+                patch.object(scraper, "_submit_role_table", side_effect=lambda *a, **kw: completed(df.copy())), \
+                patch.object(scraper, "_find_facet_toggle", return_value=None):
+            with_facets, _ = scraper.scrape_both_data_types(manager=MagicMock())
+
+        assert calls[0].startswith("facet-prefetch")
+        assert with_facets["facet_number"].tolist() == [1] * 5
+
+    def test_finished_prefetch_is_replaced(self, scraper):
+        """Тест: завершенный, но не использованный prefetch не переходит в следующий цикл"""
+        stale = completed({"Old": {"A": 1}})
+        scraper._mapping_future = stale
+        scraper._resolved_facets = pd.DataFrame({"Hero": ["Juggernaut"]})
+        scraper.table_changes = {f"facets:pos {i}": False for i in range(1, 6)}
+        scraper._combine_facet_tables([completed(pd.DataFrame())])
+        assert scraper._mapping_future is None
+
+        scraper._mapping_future = stale
+        with patch.object(scraper.facet_parser, "fetch_live_mapping", return_value={}):
+            scraper._prefetch_facet_mapping()
+            assert scraper._mapping_future is not stale
+            scraper._mapping_future.result(timeout=5)
+
+    def test_facets_fall_back_to_tab_of_active_browser(self, scraper):
+        """Тест: если фоновый запрос по HTTP не удался, Dotabuff открывается в браузере
+        скрапинга, даже когда есть снимок"""
+        from concurrent.futures import Future
+
+        failed = Future()
+        failed.set_exception(RuntimeError("HTTP не сработал"))
+        scraper._mapping_future = failed
+        scraper._active_manager = manager = MagicMock()
+
+        with patch.object(scraper.facet_parser, "fetch_live_mapping",
+                          return_value={"Juggernaut": {"Bladestorm": 1}}) as live, \
+                patch.object(scraper.facet_parser, "get_hero_facets_mapping") as snapshot:
+            assert scraper._facet_mapping() == {"Juggernaut": {"Bladestorm": 1}}
+        live.assert_called_once_with(manager=manager, http=False)
+        snapshot.assert_not_called()
+
+    def test_snapshot_used_when_dotabuff_unavailable(self, scraper):
+        """Тест: снимок берется, только если не сработали ни HTTP, ни вкладка браузера"""
+        from concurrent.futures import Future
+
+        failed = Future()
+        failed.set_exception(RuntimeError("HTTP не сработал"))
+        scraper._mapping_future = failed
+        scraper._active_manager = MagicMock()
+
+        with patch.object(scraper.facet_parser, "fetch_live_mapping",
+                          side_effect=RuntimeError("cloudflare")), \
+                patch.object(scraper.facet_parser, "get_hero_facets_mapping",
+                             return_value={"Juggernaut": {"Bladestorm": 1}}) as snapshot:
+            assert scraper._facet_mapping() == {"Juggernaut": {"Bladestorm": 1}}
+        assert snapshot.call_args.kwargs["manager"] is None
+        assert snapshot.call_args.kwargs["allow_browser"] is False
+
+    def test_capture_uses_table_html(self, scraper):
+        """Тест: при наличии tbody весь page_source не запрашивается"""
+        driver = MagicMock()
+        driver.execute_script.return_value = '<div class="thead"></div><div class="tbody"></div>'
+        type(driver).page_source = property(lambda self: pytest.fail("page_source запрошен"))
+        with patch("dota2_data_scraper.modules.scrapers.hero_scraper.time.sleep"):
+            assert scraper._capture_table_html(driver).endswith('<div class="tbody"></div>')
@@ -0,0 +1,49 @@
+"""
+Модульные тесты для ParsePipeline
+"""
+
+import threading
+import pytest
+from dota2_data_scraper.modules.scrapers.pipeline import ParsePipeline, completed
+
+
+class TestParsePipeline:
+    """Тесты для ParsePipeline - границы модуля"""
+
+    def test_results_are_returned_in_submit_order(self):
+        """Тест: Future каждой задачи возвращает ее результат"""
+        with ParsePipeline(workers=3, max_pending=2) as pipeline:
+            futures = [pipeline.submit(lambda x: x * 2, i) for i in range(10)]
+        assert [f.result() for f in futures] == [i * 2 for i in range(10)]
+
+    def test_worker_exception_is_propagated(self):
+        """Тест: ошибка разбора пробрасывается из Future.result()"""
+        def fail():
+            raise ValueError("bad html")
+
+        with ParsePipeline(workers=1) as pipeline:
+            future = pipeline.submit(fail)
+        with pytest.raises(ValueError):
+            future.result()
+
+    def test_submit_blocks_when_queue_is_full(self):
+        """Тест: очередь ограничена — submit ждет, пока рабочие потоки не освободятся"""
+        release = threading.Event()
+        pipeline = ParsePipeline(workers=1, max_pending=1).start()
+        pipeline.submit(release.wait)  # Занимает единственный рабочий поток
+        pipeline.submit(lambda: None)  # Заполняет очередь
+
+        submitted = threading.Event()
+        producer = threading.Thread(
+            target=lambda: (pipeline.submit(lambda: None), submitted.set())
+        )
+        producer.start()
+        assert not submitted.wait(0.2)
+        release.set()
+        assert submitted.wait(2)
+        producer.join()
+        pipeline.close()
+
+    def test_completed_future(self):
+        """Тест: completed() возвращает уже готовый Future"""
+        assert completed(5).result(timeout=0) == 5
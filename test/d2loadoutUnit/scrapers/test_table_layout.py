@@ -0,0 +1,96 @@
+"""
+Модульные тесты для определения вёрстки таблицы
+"""
+
+import pytest
+from bs4 import BeautifulSoup
+from unittest.mock import patch
+from dota2_data_scraper.modules.scrapers.hero_scraper import HeroScraper
+from dota2_data_scraper.modules.scrapers.table_layout import (
+    TBODY_CLASS,
+    THEAD_CLASS,
+    UnknownTableLayoutError,
+    detect_table_layout,
+)
+
+NEW_LAYOUT = """
+<div class="thead"><div><button>Hero</button></div><div><button>Matches</button></div></div>
+<div class="tbody">
+    <div class="grid grid-cols-14"><div><img alt="Lina"/><div class="group"><div class="font-bold">Supercharge</div></div></div><div>77</div></div>
+</div>
+"""
+
+FACET_COLUMN_LAYOUT = """
+<div class="thead"><div><button>Hero</button></div><div><button>Facet</button></div><div>Matches</div></div>
+<div class="tbody">
+    <div class="grid grid-cols-14"><div><img alt="Lion"/></div><div title="Fist">y</div><div>5</div></div>
+</div>
+"""
+
+
+def _detect(html):
+    soup = BeautifulSoup(html, "html.parser")
+    return detect_table_layout(
+        soup, soup.find("div", class_=THEAD_CLASS), soup.find("div", class_=TBODY_CLASS)
+    )
+
+
+class TestTableLayout:
+    """Тесты для TableLayout - границы модуля"""
+
+    def test_detects_facet_inside_hero_column(self):
+        """Тест: фасет в колонке героя выводится отдельной колонкой после Hero"""
+        layout, rows = _detect(NEW_LAYOUT)
+        assert layout.row_source == "tbody_grid"
+        assert not layout.facet_in_dom
+        assert layout.columns == ("Hero", "Facet", "Matches")
+        assert len(rows) == 1
+
+    def test_detects_facet_column_in_dom(self):
+        """Тест: отдельная колонка Facet меняет вёрстку и ее отпечаток"""
+        layout, _ = _detect(FACET_COLUMN_LAYOUT)
+        assert layout.facet_in_dom and layout.facet_col == 1
+        assert layout.fingerprint != _detect(NEW_LAYOUT)[0].fingerprint
+
+    def test_unknown_layout_raises(self):
+        """Тест: без таблицы или без колонки Hero — явная ошибка"""
+        with pytest.raises(UnknownTableLayoutError):
+            _detect("<div><p>maintenance</p></div>")
+        with pytest.raises(UnknownTableLayoutError):
+            _detect(NEW_LAYOUT.replace("Hero", "Name"))
+
+    def test_layout_detected_once_per_session(self):
+        """Тест: повторный разбор той же вёрстки не определяет ее заново"""
+        scraper = HeroScraper(parse_workers=0)
+        with patch(
+            "dota2_data_scraper.modules.scrapers.hero_scraper.detect_table_layout",
+            wraps=detect_table_layout,
+        ) as mock_detect:
+            first = scraper._parse_table_html(NEW_LAYOUT)
+            second = scraper._parse_table_html(NEW_LAYOUT)
+            assert mock_detect.call_count == 1
+            scraper._parse_table_html(FACET_COLUMN_LAYOUT)
+            assert mock_detect.call_count == 2
+        assert first.equals(second)
+        assert first.loc[0, "Facet"] == "Supercharge"
+
+    def test_concurrent_parses_detect_layout_once(self):
+        """Тест: роли, разбираемые одновременно, определяют вёрстку один раз"""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        scraper = HeroScraper(parse_workers=0)
+        barrier = threading.Barrier(4)
+
+        def parse(_):
+            barrier.wait(5)
+            return scraper._parse_table_html(NEW_LAYOUT)
+
+        with patch(
+            "dota2_data_scraper.modules.scrapers.hero_scraper.detect_table_layout",
+            wraps=detect_table_layout,
+        ) as mock_detect:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                frames = list(pool.map(parse, range(4)))
+        assert mock_detect.call_count == 1
+        assert all(f.loc[0, "Facet"] == "Supercharge" for f in frames)
@@ -0,0 +1,67 @@
+"""
+Золотые тесты разбора таблицы: разбор области таблицы совпадает с разбором страницы
+"""
+
+import os
+import importlib.util
+import pytest
+import pandas as pd
+from dota2_data_scraper.modules.scrapers.hero_scraper import HeroScraper, slice_table_region
+
+SCRIPT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+    "scripts",
+    "bench_parse.py",
+)
+
+
+@pytest.fixture(scope="module")
+def bench():
+    """Модуль бенчмарка разбора (генератор синтетической страницы)"""
+    spec = importlib.util.spec_from_file_location("bench_parse", SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestTableParsing:
+    """Тесты разбора таблицы - границы модуля"""
+
+    @pytest.fixture
+    def scraper(self):
+        """Экземпляр HeroScraper"""
+        return HeroScraper(headless=True, parse_workers=0)
+
+    def test_region_parse_identical_to_full_page(self, scraper, bench):
+        """Тест: вырезанная область дает тот же DataFrame, что и вся страница"""
+        page = bench.build_page(rows=20, noise_blocks=50)
+        full = scraper._parse_table_html(page, slice_region=False)
+        region = scraper._parse_table_html(page)
+        assert len(full) == 20
+        assert full.loc[0, "Hero"] == "Hero 0"
+        pd.testing.assert_frame_equal(full, region)
+        assert scraper._clean_data(full).equals(scraper._clean_data(region))
+
+    def test_slice_contains_only_table(self, bench):
+        """Тест: из страницы вырезаются только thead и tbody"""
+        page = bench.build_page(rows=3, noise_blocks=50)
+        region = slice_table_region(page)
+        assert region.startswith('<div class="thead')
+        assert region.endswith("</div>")
+        assert "card" not in region and "<script" not in region
+
+    def test_legacy_layout_falls_back_to_full_page(self, scraper):
+        """Тест: без tbody область не вырезается и разбирается вся страница"""
+        page = """
+        <html><body>
+        <div class="grid" style="display: grid;">
+            <div>Hero</div><div>Matches</div><div>WR</div>
+        </div>
+        <div class="grid" style="display: grid;">
+            <div>Juggernaut</div><div>1000</div><div>52.5%</div>
+        </div>
+        </body></html>
+        """
+        assert slice_table_region(page) is None
+        df = scraper._parse_table_html(page)
+        assert df["Hero"].tolist() == ["Juggernaut"]
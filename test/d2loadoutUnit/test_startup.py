@@ -0,0 +1,39 @@
+"""
+Тест бюджета холодного старта CLI (scripts/bench_startup.py)
+"""
+
+import os
+import importlib.util
+import pytest
+
+SCRIPT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "scripts",
+    "bench_startup.py",
+)
+
+
+@pytest.fixture(scope="module")
+def bench():
+    """Модуль бенчмарка старта"""
+    spec = importlib.util.spec_from_file_location("bench_startup", SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.slow
+class TestStartup:
+    """Тесты холодного старта режимов без браузера"""
+
+    def test_modes_do_not_import_browser_stack(self, bench):
+        """Тест: режимы без браузера не импортируют selenium/bs4"""
+        results = bench.run_benchmark(budget=float("inf"))
+        for name, res in results.items():
+            assert res["unexpected"] == [], f"{name}: {res['unexpected']}"
+
+    def test_startup_budget(self, bench):
+        """Тест бюджета времени холодного старта"""
+        results = bench.run_benchmark()
+        for name, res in results.items():
+            assert res["seconds"] <= bench.STARTUP_BUDGET_SECONDS, f"{name}: {res['seconds']:.3f}s"
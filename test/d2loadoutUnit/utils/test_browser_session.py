@@ -0,0 +1,54 @@
+"""
+Модульные тесты для повторного использования clearance Dotabuff
+"""
+
+from dota2_data_scraper.modules.core.scraping_manager import ScrapingManager
+from dota2_data_scraper.modules.utils.browser_session import ClearanceStore
+from dota2_data_scraper.modules.utils.facet_api_parser import FacetAPIParser
+
+NOW = 1_700_000_000
+
+
+def _cookies(expiry):
+    return [
+        {"name": "cf_clearance", "value": "abc", "domain": ".dotabuff.com", "path": "/",
+         "expiry": expiry, "httpOnly": True, "sameSite": "None"},
+        {"name": "_session", "value": "s", "domain": "www.dotabuff.com", "path": "/"},
+    ]
+
+
+class TestClearanceStore:
+    """Тесты для ClearanceStore - границы модуля"""
+
+    def test_expired_clearance_is_dropped(self, tmp_path):
+        """Тест: истекшая cookie не считается clearance, сессия не создается"""
+        store = ClearanceStore(str(tmp_path))
+        store.save(_cookies(NOW + 60), "UA/1.0")
+        assert store.has_clearance(now=NOW)
+        assert not store.has_clearance(now=NOW + 61)
+        assert store.session(now=NOW + 61) is None
+        assert ClearanceStore(str(tmp_path / "missing")).session() is None
+
+    def test_session_carries_cookies_and_user_agent(self, tmp_path):
+        """Тест: сессия получает cookies и User-Agent браузера"""
+        store = ClearanceStore(str(tmp_path))
+        store.save(_cookies(NOW + 60), "UA/1.0")
+        session = store.session(now=NOW)
+        assert session.headers["User-Agent"] == "UA/1.0"
+        assert session.cookies.get("cf_clearance", domain=".dotabuff.com") == "abc"
+        assert session.get_adapter("https://www.dotabuff.com")._pool_maxsize >= 2
+
+    def test_persistent_profile_disables_incognito(self, tmp_path):
+        """Тест: постоянный профиль без --incognito, временный — с ним"""
+        args = ScrapingManager(profile_dir=str(tmp_path))._create_chrome_options().arguments
+        assert "--incognito" not in args
+        assert f"--user-data-dir={tmp_path}" in args
+        assert "--incognito" in ScrapingManager()._create_chrome_options().arguments
+
+    def test_http_session_uses_profile_cookies(self, tmp_path):
+        """Тест: HTTP-запросы парсера идут с cookies профиля, если clearance действует"""
+        ClearanceStore(str(tmp_path)).save(_cookies(4_000_000_000), "UA/1.0")
+        session = FacetAPIParser(profile_dir=str(tmp_path))._http_session()
+        assert session.headers["User-Agent"] == "UA/1.0"
+        assert session.cookies.get("cf_clearance", domain=".dotabuff.com") == "abc"
+        assert "cf_clearance" not in FacetAPIParser()._http_session().cookies
@@ -0,0 +1,63 @@
+"""
+Модульные тесты для element_lookup и выбора периода
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+from dota2_data_scraper.modules.utils.element_lookup import find_first, probe_selectors
+from dota2_data_scraper.modules.utils.period_selector import select_period
+
+
+class TestElementLookup:
+    """Тесты для element_lookup - границы модуля"""
+
+    def test_probe_uses_single_script_call(self):
+        """Тест: все селекторы проверяются одним вызовом execute_script"""
+        driver = Mock()
+        element = Mock()
+        driver.execute_script.return_value = [2, element]
+        assert probe_selectors(driver, ["a", "b", "c"], ("role", "switch")) == (2, element)
+        assert driver.execute_script.call_count == 1
+        driver.find_elements.assert_not_called()
+
+    def test_find_first_returns_matched_selector(self):
+        """Тест: возвращается сработавший селектор и элемент"""
+        driver = Mock()
+        element = Mock()
+        driver.execute_script.return_value = [1, element]
+        assert find_first(driver, ["a", "b"]) == ("b", element)
+
+    def test_find_first_waits_until_timeout(self):
+        """Тест: явное ожидание ограничено timeout"""
+        driver = Mock()
+        driver.execute_script.side_effect = [None, None, [0, "el"]]
+        with patch("dota2_data_scraper.modules.utils.element_lookup.time.sleep"):
+            assert find_first(driver, ["a"], timeout=10) == ("a", "el")
+        assert driver.execute_script.call_count == 3
+
+        driver.execute_script.side_effect = None
+        driver.execute_script.return_value = None
+        assert find_first(driver, ["a"], timeout=0) is None
+
+
+class TestPeriodSelector:
+    """Тесты выбора периода"""
+
+    @patch("dota2_data_scraper.modules.utils.period_selector.time.sleep")
+    @patch("dota2_data_scraper.modules.utils.period_selector.Select")
+    def test_select_period(self, mock_select, _sleep):
+        """Тест: период выбирается по value, уже выбранный не переключается"""
+        driver = Mock()
+        period_el = Mock()
+        driver.execute_script.return_value = [
+            [Mock(), [["all", "All ranks", True]]],
+            [period_el, [["8", "8 days", True], ["30", "30 days", False]]],
+        ]
+        assert select_period(driver, 30) is True
+        mock_select.assert_called_once_with(period_el)
+        mock_select.return_value.select_by_value.assert_called_once_with("30")
+
+        mock_select.reset_mock()
+        assert select_period(driver, 8) is True
+        mock_select.assert_not_called()
+        driver.find_elements.assert_not_called()
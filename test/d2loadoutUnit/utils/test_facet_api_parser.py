@@ -4,17 +4,26 @@
 
 import pytest
 import json
+import time
 from unittest.mock import Mock, patch, MagicMock
-from dota2_data_scraper.modules.utils.facet_api_parser import FacetAPIParser
+from dota2_data_scraper.modules.utils.facet_api_parser import (
+    DOTABUFF_DISCOVERY_URLS,
+    FacetAPIParser,
+)
+from dota2_data_scraper.modules.utils.facet_snapshots import FacetSnapshotStore
+from dota2_data_scraper.modules.utils.http_cache import ConditionalCache
 
 
 class TestFacetAPIParser:
     """Тесты для FacetAPIParser - границы модуля"""
 
     @pytest.fixture
-    def parser(self):
-        """Экземпляр FacetAPIParser"""
-        return FacetAPIParser()
+    def parser(self, tmp_path):
+        """Экземпляр FacetAPIParser без снимков и HTTP-кеша на диске проекта"""
+        return FacetAPIParser(
+            http_cache=ConditionalCache(str(tmp_path / "http.json")),
+            snapshot_store=FacetSnapshotStore(str(tmp_path / "snapshots"), bundled_path=None),
+        )
 
     def test_parser_initialization(self, parser):
         """Тест инициализации парсера"""
@@ -85,3 +94,86 @@ class TestFacetAPIParser:
         result = parser._fetch_url("https://example.com")
         assert result == "<html>test</html>"
         mock_get.assert_called_once()
+
+    def test_discovery_is_hedged(self, parser):
+        """Тест: медленная первая страница не задерживает поиск бандла"""
+        def page(url, session=None):
+            if url == DOTABUFF_DISCOVERY_URLS[0]:
+                time.sleep(1.0)
+                return "https://www.dotabuff.com/static/repo-slow.js"
+            return "https://www.dotabuff.com/static/repo-fast.js"
+
+        with patch.object(parser, "_repo_url_from_page", side_effect=page):
+            started = time.monotonic()
+            url = parser._discover_dotabuff_repo_js_http(hedge_delay=0.05)
+        assert url.endswith("repo-fast.js")
+        assert time.monotonic() - started < 0.9
+
+    def test_unchanged_bundle_served_from_cache(self, tmp_path):
+        """Тест: при 304 маппинг берется из кеша без разбора бандла"""
+        parser = FacetAPIParser(http_cache=ConditionalCache(str(tmp_path / "http.json")))
+        url = "https://www.dotabuff.com/static/repo-1.js"
+        session = Mock()
+        session.get.side_effect = [
+            Mock(status_code=200, text="js", headers={"ETag": '"v1"'}),
+            Mock(status_code=304, text="", headers={}),
+        ]
+        with patch.object(parser, "_mapping_from_repo_js", return_value={"Lina": {"A": 1}}) as parse:
+            assert parser._fetch_repo_mapping(session, url) == {"Lina": {"A": 1}}
+            # Новый экземпляр кеша читает валидаторы с диска
+            parser.http_cache = ConditionalCache(str(tmp_path / "http.json"))
+            assert parser._fetch_repo_mapping(session, url) == {"Lina": {"A": 1}}
+        parse.assert_called_once()
+        assert session.get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+
+    def test_selenium_is_last_resort(self, parser, monkeypatch, tmp_path):
+        """Тест: Selenium запускается, только если HTTP не дал маппинга"""
+        monkeypatch.setattr(FacetAPIParser, "_shared_cache", {})
+        with patch.object(parser, "_try_dotabuff_facets_http", return_value={"Lina": {"A": 1}}), \
+                patch.object(parser, "_try_dotabuff_facets") as selenium:
+            assert parser.get_hero_facets_mapping() == {"Lina": {"A": 1}}
+        selenium.assert_not_called()
+
+        monkeypatch.setattr(FacetAPIParser, "_shared_cache", {})
+        parser.snapshots = FacetSnapshotStore(str(tmp_path / "empty"), bundled_path=None)
+        with patch.object(parser, "_try_dotabuff_facets_http", return_value={}), \
+                patch.object(parser, "_try_dotabuff_facets", return_value={"Lion": {"B": 1}}):
+            assert parser.get_hero_facets_mapping() == {"Lion": {"B": 1}}
+
+        # Без разрешения на отдельный браузер — ошибка, а не запуск Chrome
+        monkeypatch.setattr(FacetAPIParser, "_shared_cache", {})
+        parser.snapshots = FacetSnapshotStore(str(tmp_path / "none"), bundled_path=None)
+        with patch.object(parser, "_try_dotabuff_facets_http", return_value={}), \
+                patch.object(parser, "_try_dotabuff_facets") as selenium:
+            with pytest.raises(RuntimeError):
+                parser.get_hero_facets_mapping(allow_browser=False)
+        selenium.assert_not_called()
+
+    def test_manager_fetch_runs_in_tab(self, parser, monkeypatch):
+        """Тест: с запущенным браузером Dotabuff открывается в его второй вкладке, если HTTP не сработал"""
+        monkeypatch.setattr(FacetAPIParser, "_shared_cache", {})
+        manager = MagicMock()
+        with patch.object(parser, "_try_dotabuff_facets_http", return_value={}) as http, \
+                patch.object(parser, "_try_dotabuff_facets", return_value={"Lion": {"B": 1}}) as selenium:
+            assert parser.get_hero_facets_mapping(manager=manager) == {"Lion": {"B": 1}}
+        http.assert_called_once_with()
+        manager.in_tab.assert_called_once_with()
+        selenium.assert_called_once_with(manager)
+        # Полученный во вкладке маппинг сохранен снимком и стал общим
+        assert parser.snapshots.latest().mapping == {"Lion": {"B": 1}}
+        assert FacetAPIParser._shared_cache == {"Lion": {"B": 1}}
+
+    def test_bundled_snapshot_only_when_dotabuff_unavailable(self, parser, monkeypatch, tmp_path):
+        """Тест: поставляемый снимок не заслоняет Dotabuff и берется, только если тот недоступен"""
+        monkeypatch.setattr(FacetAPIParser, "_shared_cache", {})
+        bundled = tmp_path / "bundled.json"
+        bundled.write_text(json.dumps({"key": "b", "source": "bundled", "mapping": {"Lina": {"A": 1}}}))
+        parser.snapshots.bundled_path = str(bundled)
+        with patch.object(parser, "_try_dotabuff_facets_http", return_value={"Lion": {"B": 1}}):
+            assert parser.get_hero_facets_mapping() == {"Lion": {"B": 1}}
+
+        monkeypatch.setattr(FacetAPIParser, "_shared_cache", {})
+        parser.snapshots.root = str(tmp_path / "empty")
+        with patch.object(parser, "_try_dotabuff_facets_http", return_value={}), \
+                patch.object(parser, "_try_dotabuff_facets", side_effect=RuntimeError("cloudflare")):
+            assert parser.get_hero_facets_mapping() == {"Lina": {"A": 1}}
@@ -0,0 +1,62 @@
+"""
+Модульные тесты для индекса имен фасетов
+"""
+
+import pytest
+from dota2_data_scraper.modules.utils.facet_index import FacetNameIndex, normalize_name
+from dota2_data_scraper.modules.utils.facet_api_parser import FacetAPIParser
+
+MAPPING = {
+    "Nature's Prophet": {"Curse of the Oldwood": 1, "Ironwood Treant": 2},
+    "Juggernaut": {"Bladestorm": 1, "Agigantism": 2},
+}
+
+
+class TestFacetNameIndex:
+    """Тесты для FacetNameIndex - границы модуля"""
+
+    @pytest.fixture
+    def index(self):
+        return FacetNameIndex(MAPPING, aliases={"Juggernaut": {"Spinning Blade": 1}})
+
+    def test_normalize_name(self):
+        """Тест нормализации: регистр, апостроф, пунктуация, диакритика"""
+        assert normalize_name("Nature's  Prophet!") == "natures prophet"
+        assert normalize_name("Ironwood-Tréant") == "ironwood treant"
+
+    @pytest.mark.parametrize(
+        "hero, facet, tier, number",
+        [
+            ("Juggernaut", "Bladestorm", "exact", 1),
+            ("natures prophet", "IRONWOOD treant.", "normalized", 2),
+            ("Juggernaut", "spinning blade", "alias", 1),
+            ("Juggernaut", "Facet 2", "ordinal", 2),
+            ("Juggernaut", "gigantism", "substring", 2),
+            ("Nature's Prophet", "Curse of Oldwood", "fuzzy", 1),
+        ],
+    )
+    def test_lookup_tiers(self, index, hero, facet, tier, number):
+        """Тест уровней поиска и номера фасета"""
+        match = index.lookup(hero, facet)
+        assert (match.tier, match.number) == (tier, number)
+
+    def test_confidence_decreases_and_filters(self, index):
+        """Тест: уверенность падает по уровням, нижний порог отсекает совпадение"""
+        exact = index.lookup("Juggernaut", "Bladestorm")
+        fuzzy = index.lookup("Nature's Prophet", "Curse of Oldwood")
+        assert exact.confidence > fuzzy.confidence
+        assert index.lookup("Nature's Prophet", "Curse of Oldwood", min_confidence=0.99) is None
+        assert index.lookup("Juggernaut", "Facet 3") is None
+        assert index.lookup("Juggernaut", "Zzz") is None
+        assert index.lookup("Unknown", "Bladestorm") is None
+
+    def test_parser_builds_index_once_per_mapping(self):
+        """Тест: индекс парсера строится один раз и перестраивается при смене маппинга"""
+        parser = FacetAPIParser()
+        parser.hero_facets_cache = MAPPING
+        first = parser.facet_index
+        assert parser.facet_index is first
+        assert parser.get_facet_number_for_hero("Juggernaut", "agigantism") == 2
+        parser.hero_facets_cache = {"Lina": {"Supercharge": 1}}
+        assert parser.facet_index is not first
+        assert parser.get_facet_number_for_hero("Lina", "Super charge") == 1
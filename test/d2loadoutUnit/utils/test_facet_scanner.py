@@ -0,0 +1,51 @@
+"""
+Модульные тесты для однопроходного поиска фасетов в repo-*.js
+"""
+
+import json
+from dota2_data_scraper.modules.utils.facet_scanner import (
+    balanced_array_end,
+    extract_facets,
+)
+
+FACETS = [
+    {"id": 1, "hero_id": 8, "name": 'Blade "Dance" [x]', "hero_variant": 1},
+    {"id": 2, "hero_id": 8, "name": "Old", "hero_variant": 2, "deprecated": True},
+    {"id": 3, "hero_id": 9, "name": "Spin `fast`", "hero_variant": 1},
+]
+
+
+def _template_literal(items):
+    payload = json.dumps(items).replace("\\", "\\\\").replace("`", "\\`")
+    return f"JSON.parse(`{payload}`)"
+
+
+class TestFacetScanner:
+    """Тесты для facet_scanner - границы модуля"""
+
+    def test_balanced_end_ignores_brackets_in_strings(self):
+        """Тест: скобки и экранированные кавычки внутри строк не сбивают баланс"""
+        text = 'x=[1,"a]\\"b",[2,[3]]];'
+        assert text[2:balanced_array_end(text, 2)] == '[1,"a]\\"b",[2,[3]]]'
+        assert balanced_array_end("[1,[2]", 0) == -1
+
+    def test_template_literal_is_unescaped_and_validated(self):
+        """Тест: фасеты из экранированного литерала, deprecated отброшены, чужие массивы пропущены"""
+        bundle = (
+            'var u=JSON.parse(`[{"id":1,"kind":"item"}]`),s=[{"hero_id":"x"}];'
+            f"const f={_template_literal(FACETS)};function z(){{return[1]}}"
+        )
+        facets = extract_facets(bundle)
+        assert [f["id"] for f in facets] == [1, 3]
+        assert facets[0]["name"] == 'Blade "Dance" [x]'
+        assert facets[1]["name"] == "Spin `fast`"
+
+    def test_plain_array_without_json_parse(self):
+        """Тест: массив фасетов в обычном JS-литерале находится по ключу hero_id"""
+        bundle = f'var a=[1,[2]];const facets={json.dumps(FACETS)};'
+        assert [f["id"] for f in extract_facets(bundle)] == [1, 3]
+
+    def test_no_facets(self):
+        """Тест: без массива фасетов — пустой список"""
+        assert extract_facets('var a=[1,2];JSON.parse(`[{"id":1}]`);') == []
+        assert extract_facets('x={"hero_id":1}') == []
@@ -0,0 +1,108 @@
+"""
+Модульные тесты для снимков маппинга фасетов
+"""
+
+import json
+import pytest
+from unittest.mock import patch
+from dota2_data_scraper.modules.utils import facet_snapshots
+from dota2_data_scraper.modules.utils.facet_api_parser import FacetAPIParser
+from dota2_data_scraper.modules.utils.facet_snapshots import FacetSnapshotStore, bundle_key
+
+OLD = {"Lina": {"Supercharge": 1}}
+NEW = {"Lina": {"Supercharge": 1, "Slow Burn": 2}}
+
+
+@pytest.fixture
+def shared_state(monkeypatch):
+    """Изолированное общее состояние парсера"""
+    monkeypatch.setattr(FacetAPIParser, "_shared_cache", {})
+    monkeypatch.setattr(FacetAPIParser, "_shared_aliases", {})
+    monkeypatch.setattr(FacetAPIParser, "_shared_key", None)
+    monkeypatch.setattr(FacetAPIParser, "_refresh_thread", None)
+    monkeypatch.setattr(FacetAPIParser, "_refreshed_at", None)
+
+
+def join_refresh():
+    """Дожидается фонового обновления (поток сбрасывает ссылку на себя по завершении)"""
+    thread = FacetAPIParser._refresh_thread
+    if thread is not None:
+        thread.join(timeout=5)
+
+
+class TestFacetSnapshotStore:
+    """Тесты для FacetSnapshotStore - границы модуля"""
+
+    def test_bundle_key(self):
+        """Тест: ключ из имени бандла, иначе из содержимого маппинга"""
+        assert bundle_key("https://www.dotabuff.com/static/repo-ab12_x.js") == "repo-ab12_x"
+        assert bundle_key(None, OLD) == bundle_key(None, dict(OLD))
+        assert bundle_key(None, OLD) != bundle_key(None, NEW)
+
+    def test_latest_is_local_only(self, tmp_path, monkeypatch):
+        """Тест: latest — только снимки с Dotabuff, поставляемый отдельно; старые удаляются"""
+        bundled = tmp_path / "bundled.json"
+        bundled.write_text(json.dumps({"key": "b", "source": "bundled", "mapping": OLD}))
+        store = FacetSnapshotStore(str(tmp_path / "local"), bundled_path=str(bundled))
+        assert store.latest() is None
+        assert store.bundled().bundled
+
+        monkeypatch.setattr(facet_snapshots, "MAX_SNAPSHOTS", 2)
+        for i, key in enumerate(["repo-1", "repo-2", "repo-3"]):
+            with patch.object(facet_snapshots, "datetime") as dt:
+                dt.now.return_value.isoformat.return_value = f"2026-01-0{i + 1}T00:00:00"
+                store.save(key, NEW)
+        assert [s.key for s in store.snapshots()] == ["repo-3", "repo-2"]
+        assert store.latest().mapping == NEW
+
+    def test_snapshot_served_instantly_and_refreshed(self, tmp_path, shared_state):
+        """Тест: маппинг берется из снимка, фоновое обновление подменяет его новым бандлом"""
+        store = FacetSnapshotStore(str(tmp_path), bundled_path=None)
+        store.save("repo-old", OLD)
+        parser = FacetAPIParser(snapshot_store=store)
+
+        def live():
+            parser._last_repo_url = "https://www.dotabuff.com/static/repo-new.js"
+            return NEW
+
+        with patch.object(parser, "_try_dotabuff_facets_http", side_effect=live):
+            assert parser.get_hero_facets_mapping() == OLD
+            join_refresh()
+        assert FacetAPIParser._shared_cache == NEW
+        assert FacetAPIParser._shared_key == "repo-new"
+        assert store.latest().key == "repo-new"
+
+    def test_failed_refresh_keeps_snapshot(self, tmp_path, shared_state):
+        """Тест: ошибка фонового обновления не трогает маппинг из снимка"""
+        store = FacetSnapshotStore(str(tmp_path), bundled_path=None)
+        store.save("repo-old", OLD)
+        parser = FacetAPIParser(snapshot_store=store)
+        with patch.object(parser, "_try_dotabuff_facets_http", return_value={}), \
+                patch.object(parser, "_try_dotabuff_facets", side_effect=RuntimeError("cloudflare")):
+            assert parser.get_hero_facets_mapping() == OLD
+            join_refresh()
+        assert FacetAPIParser._shared_cache == OLD
+
+    def test_refresh_repeats_after_ttl(self, tmp_path, shared_state, monkeypatch):
+        """Тест: обновление не одноразовое — после REFRESH_TTL общий кеш обновляется снова"""
+        from dota2_data_scraper.modules.utils import facet_api_parser
+
+        store = FacetSnapshotStore(str(tmp_path), bundled_path=None)
+        store.save("repo-old", OLD)
+        parser = FacetAPIParser(snapshot_store=store)
+        with patch.object(parser, "_try_dotabuff_facets_http", return_value={}), \
+                patch.object(parser, "_try_dotabuff_facets", side_effect=RuntimeError("cloudflare")):
+            assert parser.get_hero_facets_mapping() == OLD
+            join_refresh()
+        assert FacetAPIParser._refresh_thread is None
+
+        with patch.object(parser, "_try_dotabuff_facets_http", return_value=NEW) as http:
+            # В пределах TTL — общий кеш без запроса
+            assert parser.get_hero_facets_mapping() == OLD
+            join_refresh()
+            http.assert_not_called()
+
+            monkeypatch.setattr(facet_api_parser, "REFRESH_TTL", 0.0)
+            parser.get_hero_facets_mapping()
+            join_refresh()
+        assert FacetAPIParser._shared_cache == NEW
@@ -0,0 +1,49 @@
+"""
+Модульные тесты для профилировщика запусков
+"""
+
+import json
+import os
+import tempfile
+import shutil
+import pytest
+from dota2_data_scraper.modules.utils.profiler import RunProfiler, file_digest
+
+
+class TestRunProfiler:
+    """Тесты для RunProfiler - границы модуля"""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Временная директория для тестов"""
+        temp_path = tempfile.mkdtemp()
+        yield temp_path
+        shutil.rmtree(temp_path, ignore_errors=True)
+
+    def test_file_digest(self, temp_dir):
+        """Тест хэша входного файла"""
+        path = os.path.join(temp_dir, "heroes_data.csv")
+        with open(path, "w") as f:
+            f.write("Hero,Matches\nPudge,100\n")
+        assert len(file_digest(path)) == 8
+        assert file_digest(os.path.join(temp_dir, "missing.csv")) is None
+
+    def test_profile_writes_reports(self, temp_dir):
+        """Тест сохранения pstats, flamegraph-стеков и отчета аллокаций"""
+        input_path = os.path.join(temp_dir, "heroes_data.csv")
+        with open(input_path, "w") as f:
+            f.write("Hero\nPudge\n")
+        out_dir = os.path.join(temp_dir, "profiles")
+
+        with RunProfiler("config", input_paths=[input_path], output_dir=out_dir, top_n=5) as profiler:
+            data = [str(i) * 10 for i in range(20000)]
+            assert data
+
+        assert profiler.label.startswith("config_")
+        suffixes = {".pstats", ".folded", "_cpu.txt", "_memory.txt", ".json"}
+        for suffix in suffixes:
+            assert os.path.exists(os.path.join(out_dir, profiler.label + suffix))
+        with open(os.path.join(out_dir, profiler.label + ".json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        assert meta["mode"] == "config"
+        assert meta["input_hashes"][input_path] == file_digest(input_path)
@@ -0,0 +1,73 @@
+"""
+Модульные тесты для SelectorRegistry
+"""
+
+import os
+import json
+import tempfile
+import shutil
+import pytest
+from unittest.mock import MagicMock, patch
+from dota2_data_scraper.modules.utils.selector_registry import SelectorRegistry, layout_fingerprint
+from dota2_data_scraper.modules.scrapers.hero_scraper import HeroScraper
+
+
+class TestSelectorRegistry:
+    """Тесты для SelectorRegistry - границы модуля"""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Временная директория для тестов"""
+        temp_path = tempfile.mkdtemp()
+        yield temp_path
+        shutil.rmtree(temp_path, ignore_errors=True)
+
+    @pytest.fixture
+    def registry(self, temp_dir):
+        """Реестр во временной директории"""
+        return SelectorRegistry(os.path.join(temp_dir, "registry.json"))
+
+    def test_learned_selector_is_persisted_and_tried_first(self, registry):
+        """Тест: сработавший селектор переживает перезапуск и идет первым"""
+        registry.record("layout-a", "facet_toggle", "[role=switch]")
+        reloaded = SelectorRegistry(registry.path)
+        assert reloaded.get("layout-a", "facet_toggle") == "[role=switch]"
+        assert reloaded.ordered("layout-a", "facet_toggle", ["a", "[role=switch]"]) == ["[role=switch]", "a"]
+        # Другая вёрстка — полный перебор в исходном порядке
+        assert reloaded.ordered("layout-b", "facet_toggle", ["a", "b"]) == ["a", "b"]
+
+    def test_forget_and_unknown_layout(self, registry):
+        """Тест: забытый селектор удаляется, неизвестная вёрстка не записывается"""
+        registry.record("layout-a", "role:Mid", "//button")
+        registry.forget("layout-a", "role:Mid")
+        assert registry.get("layout-a", "role:Mid") is None
+        registry.record(None, "role:Mid", "//button")
+        with open(registry.path, encoding="utf-8") as f:
+            assert list(json.load(f)["layouts"]) == ["layout-a"]
+
+    def test_layout_fingerprint(self):
+        """Тест: отпечаток зависит от набора бандлов страницы"""
+        driver = MagicMock()
+        driver.execute_script.return_value = "https://x/app.1.js|https://x/app.css"
+        first = layout_fingerprint(driver)
+        driver.execute_script.return_value = "https://x/app.2.js|https://x/app.css"
+        assert first != layout_fingerprint(driver)
+        driver.execute_script.return_value = None
+        assert layout_fingerprint(driver) is None
+
+    def test_role_click_uses_learned_xpath(self, registry):
+        """Тест: для известной вёрстки кнопка роли кликается без перебора"""
+        scraper = HeroScraper(selector_registry=registry)
+        scraper._layout = "layout-a"
+        manager = MagicMock()
+        manager.click_element_safely.return_value = True
+        position = "Mid (pos 2)"
+        fallback = scraper._role_xpath_candidates(position, scraper.positions[position])[1]
+
+        with patch("dota2_data_scraper.modules.scrapers.hero_scraper.find_first",
+                   return_value=(fallback, MagicMock())) as mock_find:
+            assert scraper._click_role(manager, position, scraper.positions[position])
+            assert scraper._click_role(manager, position, scraper.positions[position])
+        assert mock_find.call_count == 1
+        assert registry.get("layout-a", f"role:{position}") == fallback
+        assert manager.click_element_safely.call_args.args[0] == fallback
@@ -0,0 +1,78 @@
+"""
+Модульные тесты для SteamManager (копирование без реального Steam)
+"""
+
+import os
+import pytest
+from unittest.mock import patch
+from dota2_data_scraper.modules.utils import steam_manager
+from dota2_data_scraper.modules.utils.steam_manager import SteamManager
+
+
+class TestSteamManager:
+    """Тесты для SteamManager.copy_config_to_steam - границы модуля"""
+
+    @pytest.fixture
+    def steam(self, tmp_path):
+        """Steam с двумя аккаунтами Dota 2"""
+        for account in ("111", "222"):
+            (tmp_path / "userdata" / account / "570" / "remote" / "cfg").mkdir(parents=True)
+        manager = SteamManager()
+        with patch.object(manager, "find_steam_path", return_value=str(tmp_path)):
+            yield manager
+
+    def _cfg(self, steam_root, account):
+        return os.path.join(steam_root, "userdata", account, "570", "remote", "cfg")
+
+    def _source(self, tmp_path, text):
+        path = tmp_path / "hero_configs.json"
+        path.write_text(text, encoding="utf-8")
+        return str(path)
+
+    def test_unchanged_targets_are_skipped(self, steam, tmp_path):
+        """Тест: одинаковый файл не перезаписывается и не порождает резервную копию"""
+        source = self._source(tmp_path, '{"version": 3}')
+        assert steam.copy_config_to_steam(source)
+        target = os.path.join(self._cfg(str(tmp_path), "111"), "hero_grid_config.json")
+        mtime = os.stat(target).st_mtime_ns
+
+        with patch.object(steam, "backup_existing_config") as backup:
+            assert steam.copy_config_to_steam(source)
+        backup.assert_not_called()
+        assert os.stat(target).st_mtime_ns == mtime
+
+    def test_backups_deduplicated_and_pruned(self, steam, tmp_path, monkeypatch):
+        """Тест: одинаковое содержимое копируется в old_grid один раз, старые копии удаляются"""
+        import time
+
+        monkeypatch.setattr(steam_manager, "BACKUP_RETENTION", 2)
+        cfg = self._cfg(str(tmp_path), "222")
+        old_grid = os.path.join(cfg, "old_grid")
+        os.makedirs(old_grid)
+        legacy = "hero_grid_config_20240101_000000.json"
+        # Старая копия без хеша в имени с тем же содержимым, что и текущий файл
+        with open(os.path.join(old_grid, legacy), "w") as f:
+            f.write("v1")
+        with open(os.path.join(cfg, "hero_grid_config.json"), "w") as f:
+            f.write("v1")
+
+        assert steam.copy_config_to_steam(self._source(tmp_path, "v2"), accounts=["222"])
+        assert os.listdir(old_grid) == [legacy]
+
+        # v3 и v2 дают копии v2 и v3; при возврате к v2 копия v2 становится
+        # самой свежей, поэтому очистка после v5 удаляет копию v3
+        with patch.object(steam_manager, "datetime") as clock:
+            for i, text in enumerate(["v3", "v2", "v4", "v5"]):
+                time.sleep(0.01)
+                clock.now.return_value.strftime.return_value = f"2025010{i + 1}_000000"
+                assert steam.copy_config_to_steam(self._source(tmp_path, text), accounts=["222"])
+
+        contents = {}
+        for name in os.listdir(old_grid):
+            with open(os.path.join(old_grid, name)) as f:
+                contents[name] = f.read()
+        assert contents.pop(legacy) == "v1"
+        assert sorted(contents.values()) == ["v2", "v4"]
+        with open(os.path.join(cfg, "hero_grid_config.json")) as f:
+            assert f.read() == "v5"
+        assert not any(n.endswith(".tmp") for n in os.listdir(cfg))
@@ -0,0 +1,72 @@
+"""
+Модульные тесты для трассировки этапов
+"""
+
+import json
+import os
+import tempfile
+import shutil
+import pytest
+from unittest.mock import Mock
+from dota2_data_scraper.modules.utils.tracing import Tracer, instrument_driver
+
+
+class TestTracer:
+    """Тесты для Tracer - границы модуля"""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Временная директория для тестов"""
+        temp_path = tempfile.mkdtemp()
+        yield temp_path
+        shutil.rmtree(temp_path, ignore_errors=True)
+
+    def test_span_records_nested_stages(self):
+        """Тест записи вложенных спанов"""
+        tracer = Tracer()
+        with tracer.span("run"):
+            with tracer.span("role.click", role="pos 1"):
+                pass
+        names = {s.name: s for s in tracer.spans}
+        assert set(names) == {"run", "role.click"}
+        assert names["role.click"].parent == "run"
+        assert names["role.click"].attrs["role"] == "pos 1"
+
+    def test_span_records_error(self):
+        """Тест фиксации ошибки в спане"""
+        tracer = Tracer()
+        with pytest.raises(ValueError):
+            with tracer.span("table.parse"):
+                raise ValueError("boom")
+        assert tracer.spans[0].error == "ValueError: boom"
+        assert tracer.summary()["table.parse"]["errors"] == 1
+
+    def test_instrumented_driver_counts_round_trips(self):
+        """Тест подсчета round-trip команд WebDriver по активной стадии"""
+        tracer = Tracer()
+        driver = Mock()
+        driver.command_executor.execute = Mock(return_value={"value": "<html></html>"})
+        instrument_driver(driver, tracer)
+
+        with tracer.span("page.source"):
+            driver.command_executor.execute("getPageSource", {})
+            driver.command_executor.execute("getPageSource", {})
+        driver.command_executor.execute("quit", None)
+
+        stage = tracer.summary()["page.source"]
+        assert stage["round_trips"] == 2
+        assert stage["bytes_received"] == 2 * len("<html></html>")
+        assert tracer.unattributed["round_trips"] == 1
+        assert tracer.commands["getPageSource"] == 2
+
+    def test_write_report(self, temp_dir):
+        """Тест сохранения JSON-отчета"""
+        tracer = Tracer()
+        with tracer.span("config.build"):
+            pass
+        path = tracer.write_report(output_dir=temp_dir)
+        assert path is not None and os.path.exists(path)
+        with open(path, encoding="utf-8") as f:
+            report = json.load(f)
+        assert "config.build" in report["stages"]
+        assert report["spans"][0]["name"] == "config.build"